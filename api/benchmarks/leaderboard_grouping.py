@@ -0,0 +1,89 @@
+"""Times helpers.leaderboard_results against growing meet sizes
+
+Compares placing entries with WeightClassBoundaries' binary search against
+the linear walk that unsorted class lists fall back to.
+
+Run from the api directory:
+
+    python -m benchmarks.leaderboard_grouping [--entries 100,1000,10000]
+"""
+import argparse
+import logging
+import random
+import timeit
+
+from swagger_server.controllers import helpers
+
+weightClassesKgMen = [52, 56, 60, 67.5, 75, 82.5, 90, 100, 110, 125, 140]
+weightClassesKgWomen = [44, 48, 52, 56, 60, 67.5, 75, 82.5, 90, 100]
+weightClassesKgMx = [52, 60, 67.5, 75, 82.5, 90, 100, 110]
+
+
+def make_data(count, in_kg, seed=0):
+    generator = random.Random(seed)
+    return {
+        'meetData': {
+            'inKg': in_kg,
+            'weightClassesKgMen': weightClassesKgMen,
+            'weightClassesKgWomen': weightClassesKgWomen,
+            'weightClassesKgMx': weightClassesKgMx,
+        },
+        'entries': [{
+            'id': index,
+            'sex': generator.choice(['M', 'F', 'Mx']),
+            'bodyweightKg': round(generator.uniform(40, 160), 1),
+            'points': round(generator.uniform(100, 600), 2),
+        } for index in range(count)]
+    }
+
+
+def linear_placement(entries, meet_data):
+    """The per-entry class walk the grouping used before bisecting"""
+    classesBySex = {
+        'M': meet_data['weightClassesKgMen'],
+        'F': meet_data['weightClassesKgWomen'],
+        'Mx': meet_data['weightClassesKgMx']
+    }
+    return [helpers.find_weight_class_index(entry['bodyweightKg'], classesBySex[entry['sex']], meet_data['inKg'])
+            for entry in entries]
+
+
+def bisect_placement(entries, meet_data):
+    boundaries = helpers.meet_boundaries(meet_data)
+    return [boundaries[entry['sex']].index(entry['bodyweightKg'])
+            for entry in entries]
+
+
+def best_of(statement, repeat):
+    return min(timeit.repeat(statement, number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--entries', default="100,1000,5000,20000",
+                        help="Comma separated meet sizes to time")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    print(f"{'unit':<5} {'entries':>8} {'linear ms':>10} {'bisect ms':>10} "
+          f"{'class ms':>9} {'points ms':>10}")
+    for in_kg in (True, False):
+        for count in [int(size) for size in args.entries.split(",")]:
+            data = make_data(count, in_kg)
+            assert linear_placement(data['entries'], data['meetData']) == \
+                bisect_placement(data['entries'], data['meetData'])
+            linear = best_of(lambda: linear_placement(
+                data['entries'], data['meetData']), args.repeat)
+            bisected = best_of(lambda: bisect_placement(
+                data['entries'], data['meetData']), args.repeat)
+            byClass = best_of(
+                lambda: helpers.leaderboard_results(data, "class"), args.repeat)
+            byPoints = best_of(
+                lambda: helpers.leaderboard_results(data, "points"), args.repeat)
+            print(f"{'kg' if in_kg else 'lbs':<5} {count:>8} {linear * 1000:>10.2f} "
+                  f"{bisected * 1000:>10.2f} {byClass * 1000:>9.2f} {byPoints * 1000:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
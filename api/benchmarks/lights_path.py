@@ -0,0 +1,80 @@
+"""Times the lights proxy against the local stand-in lights service
+
+Starts benchmarks.lights_server in process with the given latency and
+error rate, has --readers threads read --codes lights codes through a
+LightsProxy for --seconds, and prints the read latency percentiles, how
+many reads failed and how many requests reached the stand-in.
+
+Run from the api directory:
+
+    python -m benchmarks.lights_path [--latency 200] [--error-rate 0.2] [--ttl 1]
+"""
+import argparse
+import logging
+import threading
+import time
+
+from benchmarks.lights_server import LightsServer, fixturesPath
+from swagger_server.exceptions import LightsUnavailable
+from swagger_server.lights_proxy import LightsProxy, pooled_session
+
+
+def percentile(values, share):
+    return values[min(int(len(values) * share), len(values) - 1)]
+
+
+def read_lights(proxy, codes, until, latencies, failures):
+    index = 0
+    while time.monotonic() < until:
+        started = time.perf_counter()
+        try:
+            proxy.get(codes[index % len(codes)])
+        except LightsUnavailable:
+            failures.append(1)
+        latencies.append(time.perf_counter() - started)
+        index += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency', type=float, default=50, help="Milliseconds the stand-in adds")
+    parser.add_argument('--jitter', type=float, default=50)
+    parser.add_argument('--error-rate', type=float, default=0)
+    parser.add_argument('--ttl', type=float, default=1)
+    parser.add_argument('--stale-ttl', type=float, default=30)
+    parser.add_argument('--connect-timeout', type=float, default=1)
+    parser.add_argument('--read-timeout', type=float, default=2)
+    parser.add_argument('--readers', type=int, default=20)
+    parser.add_argument('--codes', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=10)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    server = LightsServer(("127.0.0.1", 0), fixturesPath,
+                          args.latency, args.jitter, args.error_rate, seed=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/api/meet_status"
+    proxy = LightsProxy(url, pooled_session(args.readers), args.ttl, args.stale_ttl,
+                        (args.connect_timeout, args.read_timeout))
+    codes = ["flight"] + [f"code{index}" for index in range(1, args.codes)]
+    latencies = []
+    failures = []
+    until = time.monotonic() + args.seconds
+    readers = [threading.Thread(target=read_lights, args=(proxy, codes, until, latencies, failures))
+               for _ in range(args.readers)]
+    for reader in readers:
+        reader.start()
+    for reader in readers:
+        reader.join()
+    server.shutdown()
+
+    latencies.sort()
+    print(f"{'reads':>8} {'failed':>7} {'upstream':>9} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'max ms':>8}")
+    print(f"{len(latencies):>8} {len(failures):>7} {server.requests:>9} "
+          f"{percentile(latencies, 0.5) * 1000:>8.2f} {percentile(latencies, 0.95) * 1000:>8.2f} "
+          f"{percentile(latencies, 0.99) * 1000:>8.2f} {latencies[-1] * 1000:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
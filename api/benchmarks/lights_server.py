@@ -0,0 +1,184 @@
+"""Local stand-in for the lights service, for testing the lights path offline
+
+Serves GET /api/meet_status/<code> in the format of
+lights.barbelltracker.com. A code with a fixture in --fixtures (named
+<code>.json) replays its recorded frames, any other code gets a scripted
+sequence of random decisions seeded by the code. Every response can be
+delayed by --latency plus up to --jitter milliseconds, and --error-rate of
+them fail with a 503 so the proxy's stale fallback can be exercised.
+
+Run from the api directory and point the API at it:
+
+    python -m benchmarks.lights_server [--port 8081] [--latency 50] [--error-rate 0.1]
+    LIGHTS_URL=http://localhost:8081/api/meet_status python3 -m swagger_server
+
+Record a fixture from the real service with
+
+    python -m benchmarks.lights_server record <code> [--seconds 120]
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+fixturesPath = os.path.join(os.path.dirname(__file__), "fixtures", "lights")
+statusPath = "/api/meet_status/"
+refereeNames = ["left", "centre", "right"]
+
+
+def referees(statuses):
+    return [{'name': name, 'status': status} for name, status in zip(refereeNames, statuses)]
+
+
+def scripted_sequence(code, attempts=20, shown=8, cleared=12):
+    """Returns looping frames of random decisions, the same for the same code"""
+    generator = random.Random(code)
+    frames = []
+    dts = 1666000000000
+    for _ in range(attempts):
+        dts += (shown + cleared) * 1000
+        decision = referees([generator.choice(["good lift", "good lift", "no lift"])
+                             for _ in refereeNames])
+        last = [{'dts': dts, 'referees': decision}]
+        frames.append({'seconds': shown, 'status': {'referees': decision, 'last': last}})
+        frames.append({'seconds': cleared, 'status': {
+            'referees': referees(["clear"] * len(refereeNames)), 'last': last}})
+    return {'loop': True, 'frames': frames}
+
+
+def load_sequence(fixtures, code):
+    path = os.path.join(fixtures, f"{os.path.basename(code)}.json")
+    if os.path.isfile(path):
+        with open(path) as fixture:
+            return json.load(fixture)
+    return scripted_sequence(code)
+
+
+def frame_at(sequence, elapsed):
+    """Returns the status shown elapsed seconds into sequence"""
+    frames = sequence['frames']
+    duration = sum(frame['seconds'] for frame in frames)
+    if sequence.get('loop', True) and duration > 0:
+        elapsed %= duration
+    for frame in frames:
+        if elapsed < frame['seconds']:
+            return frame['status']
+        elapsed -= frame['seconds']
+    return frames[-1]['status']
+
+
+class LightsServer(ThreadingHTTPServer):
+    """Replays a lights sequence per code, with injected latency and errors"""
+
+    daemon_threads = True
+
+    def __init__(self, address, fixtures, latency, jitter, error_rate, seed=None):
+        super().__init__(address, LightsHandler)
+        self.fixtures = fixtures
+        self.latency = latency
+        self.jitter = jitter
+        self.errorRate = error_rate
+        self.started = time.monotonic()
+        self.sequences = {}
+        self.requests = 0
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def sequence(self, code):
+        with self.lock:
+            self.requests += 1
+            if code not in self.sequences:
+                self.sequences[code] = load_sequence(self.fixtures, code)
+            return self.sequences[code]
+
+    def delay(self):
+        with self.lock:
+            return (self.latency + self.random.uniform(0, self.jitter)) / 1000, \
+                self.random.random() < self.errorRate
+
+
+class LightsHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if not self.path.startswith(statusPath) or len(self.path) == len(statusPath):
+            self.send_json(404, {'error': "Unknown meet"})
+            return
+        code = self.path[len(statusPath):]
+        sequence = self.server.sequence(code)
+        delay, failed = self.server.delay()
+        time.sleep(delay)
+        if failed:
+            self.send_json(503, {'error': "Injected failure"})
+            return
+        self.send_json(200, frame_at(sequence, time.monotonic() - self.server.started))
+
+    def send_json(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def record(code, url, seconds, interval, output):
+    """Polls the real service for code and writes what it showed as a fixture"""
+    import requests
+
+    frames = []
+    started = time.monotonic()
+    while time.monotonic() - started < seconds:
+        polled = time.monotonic()
+        status = requests.get(f"{url}/{code}", timeout=5).json()
+        if len(frames) > 0 and frames[-1]['status'] == status:
+            frames[-1]['seconds'] += interval
+        else:
+            frames.append({'seconds': interval, 'status': status})
+        time.sleep(max(interval - (time.monotonic() - polled), 0))
+    with open(output, "w") as fixture:
+        json.dump({'description': f"Recorded from {url}/{code}", 'loop': True, 'frames': frames},
+                  fixture, indent=2)
+    print(f"Recorded {len(frames)} frames to {output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subcommands = parser.add_subparsers(dest="command")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--fixtures', default=fixturesPath,
+                        help="Directory of <code>.json sequences to replay")
+    parser.add_argument('--latency', type=float, default=0, help="Milliseconds added to every response")
+    parser.add_argument('--jitter', type=float, default=0, help="Up to this many more random milliseconds")
+    parser.add_argument('--error-rate', type=float, default=0, help="Share of responses that fail, 0 to 1")
+    parser.add_argument('--seed', type=int, default=None)
+    recorder = subcommands.add_parser("record", help="Record a fixture from the real service")
+    recorder.add_argument('code')
+    recorder.add_argument('--url', default="https://lights.barbelltracker.com/api/meet_status")
+    recorder.add_argument('--seconds', type=float, default=120)
+    recorder.add_argument('--interval', type=float, default=1)
+    recorder.add_argument('--output', default=None)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record(args.code, args.url, args.seconds, args.interval,
+               args.output or os.path.join(args.fixtures, f"{args.code}.json"))
+        return
+    server = LightsServer((args.host, args.port), args.fixtures,
+                          args.latency, args.jitter, args.error_rate, args.seed)
+    print(f"Serving lights on http://{args.host}:{args.port}{statusPath.rstrip('/')}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,18 @@
 #!/usr/bin/env python3
 
-from swagger_server.exceptions import NotFoundException
+from swagger_server import startup
+import argparse
+import os
+import signal
+import sys
+import threading
+from swagger_server.exceptions import ConflictException, NotFoundException, UpstreamException
 import connexion
 from flask_cors import CORS
-from swagger_server import encoder
+from swagger_server import encoder, request_metrics
+from swagger_server.controllers import websocket_controller
 from swagger_server.config import Config, logger
+from swagger_server import logs, migrations
 
 
 def not_found_handler(error):
@@ -15,20 +23,73 @@ def not_found_handler(error):
     }, 404
 
 
-def main():
+def conflict_handler(error):
+    return {
+        "detail": str(error),
+        "status": 409,
+        "title": "Conflict",
+        "version": getattr(error, "version", None),
+    }, 409
+
+
+def upstream_handler(error):
+    return {
+        "detail": str(error),
+        "status": 502,
+        "title": "Bad Gateway",
+    }, 502
+
+
+def main(profile_startup=False):
+    config = Config()
+    with startup.phase("specification"):
+        specification = startup.load_specification(
+            os.path.join(os.path.dirname(__file__), "swagger", "swagger.yaml"),
+            {'title': 'Openlifter API'}, config.specCachePath)
     app = connexion.App(__name__, specification_dir='./swagger/')
     app.app.json_encoder = encoder.JSONEncoder
-    app.add_api('swagger.yaml', arguments={'title': 'Openlifter API'}, pythonic_params=True)
+    with startup.phase("api and controllers"):
+        api = app.add_api(specification, pythonic_params=True,
+                          options={'swagger_ui': config.swaggerUi})
+    websocket_controller.register(app.app, api.base_path)
+    request_metrics.register(app.app)
 
     # Handle NotFoundException
     app.add_error_handler(
         NotFoundException, not_found_handler)
+    # Handle ConflictException
+    app.add_error_handler(
+        ConflictException, conflict_handler)
+    # Handle UpstreamException
+    app.add_error_handler(
+        UpstreamException, upstream_handler)
 
     CORS(app.app)
+    if profile_startup:
+        print(startup.report())
+        return
+    logger.info(f"Started in {startup.elapsed():.3f} seconds")
+    # Exit cleanly on SIGTERM so buffered writes are flushed on shutdown
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
     app.run(port=8080)
 
 
 if __name__ == '__main__':
+    startup.record("imports", startup.elapsed())
+    parser = argparse.ArgumentParser(prog="python3 -m swagger_server", description="Runs the Openlifter API")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="start up, print how long every phase took and exit without serving")
+    arguments = parser.parse_args()
     config = Config()
     logger.setLevel(config.logLevel)
-    main()
+    with startup.phase("logging"):
+        logs.configure(logger, config)
+    with startup.phase("migrations"):
+        if arguments.profile_startup:
+            migrations.migrate_on_startup()
+        else:
+            # Nothing waits on the indexes, so a slow or unreachable database
+            # doesn't hold up serving
+            threading.Thread(target=migrations.migrate_on_startup,
+                             name="migrations", daemon=True).start()
+    main(arguments.profile_startup)
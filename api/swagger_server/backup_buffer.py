@@ -0,0 +1,74 @@
+import atexit
+import threading
+import time
+
+from swagger_server.config import logger
+from swagger_server import metrics
+
+
+class BackupWriteBehind:
+    """Write-behind buffer for meet backups
+
+    Only the latest state per meet is kept. A background thread flushes the
+    pending states every interval seconds and once more on shutdown, so a
+    burst of posts for one meet turns into a single MongoDB write.
+    """
+
+    def __init__(self, write, interval):
+        self._write = write
+        self._interval = interval
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="backup-write-behind", daemon=True)
+            self._thread.start()
+        atexit.register(self.stop)
+        logger.info(
+            f"Backup write-behind started with a flush interval of {self._interval}s")
+
+    def submit(self, meet, backup):
+        """Queues backup as the latest backup for meet"""
+        with self._lock:
+            if meet in self._pending:
+                metrics.coalescedWrites.inc(collection="backup")
+            self._pending[meet] = backup
+
+    def pending(self, meet):
+        """Returns the backup waiting to be flushed for meet, if any"""
+        with self._lock:
+            return self._pending.get(meet)
+
+    def flush(self):
+        with self._lock:
+            pending = self._pending
+            self._pending = {}
+        for meet, backup in pending.items():
+            started = time.perf_counter()
+            try:
+                self._write(meet, backup)
+            except Exception as e:
+                logger.error(f"Failed to flush backup for meet: {meet}: {e}")
+                with self._lock:
+                    # Retry on the next flush unless a newer state arrived.
+                    self._pending.setdefault(meet, backup)
+                continue
+            metrics.flushLatency.observe(
+                time.perf_counter() - started, collection="backup")
+            logger.info(f"Flushed buffered backup for meet: {meet}")
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(self._interval + 1)
+        self.flush()
+
+    def _run(self):
+        while not self._stopped.wait(self._interval):
+            self.flush()
@@ -0,0 +1,204 @@
+import json
+import threading
+import time
+import zlib
+
+from bson import Binary
+from pymongo import ASCENDING, DESCENDING
+
+from swagger_server import storage
+from swagger_server.config import Config, logger
+from swagger_server.exceptions import DocumentNotFound
+
+config = Config()
+
+
+def compute_delta(old, new, path=()):
+    """Returns the operations that turn old into new
+
+    Dicts and equal length lists are compared element by element, anything
+    else is replaced wholesale. Each operation is either ["set", path, value]
+    or ["del", path] where path is a list of keys and list indexes.
+
+    :rtype: list
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        operations = []
+        for key in old:
+            if key not in new:
+                operations.append(["del", list(path) + [key]])
+        for key, value in new.items():
+            if key not in old:
+                operations.append(["set", list(path) + [key], value])
+            else:
+                operations.extend(compute_delta(old[key], value, path + (key,)))
+        return operations
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        operations = []
+        for index in range(len(new)):
+            operations.extend(compute_delta(old[index], new[index], path + (index,)))
+        return operations
+    if old == new and type(old) == type(new):
+        return []
+    return [["set", list(path), new]]
+
+
+def apply_delta(state, operations):
+    """Applies operations from compute_delta to state in place
+
+    :rtype: dict
+    """
+    for operation in operations:
+        path = operation[1]
+        if len(path) == 0:
+            state = operation[2]
+            continue
+        target = state
+        for key in path[:-1]:
+            target = target[key]
+        if operation[0] == "del":
+            del target[path[-1]]
+        else:
+            target[path[-1]] = operation[2]
+    return state
+
+
+def encode(value):
+    return zlib.compress(json.dumps(value, separators=(',', ':')).encode('utf-8'))
+
+
+def decode(data):
+    return json.loads(zlib.decompress(data))
+
+
+class BackupHistory:
+    """Compressed version history of meet backups
+
+    Every stored backup becomes a version. Most versions are stored as a
+    compressed delta against the previous one, with a full snapshot every
+    snapshotInterval versions. Whole snapshot chains older than the
+    retention window are pruned so storage per meet stays bounded.
+    """
+
+    def __init__(self, collection, snapshot_interval, retention_seconds, max_versions):
+        self._collection = collection
+        self._snapshotInterval = snapshot_interval
+        self._retentionSeconds = retention_seconds
+        self._maxVersions = max_versions
+        self._latest = {}
+        self._lock = threading.Lock()
+
+    def record(self, meet, state, last_updated):
+        """Stores state as the next version for meet
+
+        :rtype: int
+        """
+        with self._lock:
+            latest = self._latest.get(meet)
+            if latest is None:
+                previous = self._collection().find_one(
+                    {'id': meet}, {'version': True}, sort=[('version', DESCENDING)])
+                version = previous['version'] + 1 if previous is not None else 1
+                operations = None
+                sinceSnapshot = 0
+            else:
+                version = latest['version'] + 1
+                operations = compute_delta(latest['state'], state)
+                if len(operations) == 0:
+                    return latest['version']
+                sinceSnapshot = latest['sinceSnapshot'] + 1
+
+            if operations is None or sinceSnapshot >= self._snapshotInterval:
+                kind = "snapshot"
+                data = encode(state)
+                sinceSnapshot = 0
+            else:
+                kind = "delta"
+                data = encode(operations)
+            self._collection().insert_one({
+                'id': meet,
+                'version': version,
+                'kind': kind,
+                'createdAt': time.time(),
+                'lastUpdated': last_updated,
+                'storedSize': len(data),
+                'data': Binary(data)
+            })
+            self._latest[meet] = {
+                'version': version,
+                'state': state,
+                'sinceSnapshot': sinceSnapshot
+            }
+            logger.info(
+                f"Stored backup version: {version} for meet: {meet} as a {kind} of {len(data)} bytes")
+            if kind == "snapshot":
+                self.prune(meet, version)
+            return version
+
+    def prune(self, meet, latest_version):
+        """Removes snapshot chains that fall entirely outside the retention policy"""
+        keepFrom = latest_version - self._maxVersions + 1
+        expired = self._collection().find_one(
+            {'id': meet, 'createdAt': {'$lt': time.time() - self._retentionSeconds}},
+            {'version': True}, sort=[('version', DESCENDING)])
+        if expired is not None:
+            keepFrom = max(keepFrom, expired['version'] + 1)
+        base = self._collection().find_one(
+            {'id': meet, 'kind': "snapshot", 'version': {'$lte': keepFrom}},
+            {'version': True}, sort=[('version', DESCENDING)])
+        if base is None:
+            return
+        result = self._collection().delete_many(
+            {'id': meet, 'version': {'$lt': base['version']}})
+        if result.deleted_count > 0:
+            logger.info(
+                f"Pruned {result.deleted_count} backup versions older than: {base['version']} for meet: {meet}")
+
+    def versions(self, meet):
+        """Lists the stored versions for meet, oldest first
+
+        :rtype: list
+        """
+        documents = self._collection().find(
+            {'id': meet}, {'_id': False, 'data': False}, sort=[('version', ASCENDING)])
+        return [{
+            'version': document['version'],
+            'kind': document['kind'],
+            'lastUpdated': document['lastUpdated'],
+            'storedSize': document['storedSize']
+        } for document in documents]
+
+    def restore(self, meet, version):
+        """Rebuilds the state of meet as of version
+
+        :rtype: dict
+        """
+        snapshot = self._collection().find_one(
+            {'id': meet, 'kind': "snapshot", 'version': {'$lte': version}},
+            sort=[('version', DESCENDING)])
+        if snapshot is None:
+            raise DocumentNotFound({'id': meet, 'version': version}, "backup_history")
+        state = decode(snapshot['data'])
+        restored = snapshot['version']
+        deltas = self._collection().find(
+            {'id': meet, 'version': {'$gt': snapshot['version'], '$lte': version}},
+            sort=[('version', ASCENDING)])
+        for delta in deltas:
+            if delta['version'] != restored + 1:
+                break
+            state = apply_delta(state, decode(delta['data']))
+            restored = delta['version']
+        if restored != version:
+            raise DocumentNotFound({'id': meet, 'version': version}, "backup_history")
+        return state
+
+
+def history_collection():
+    return storage.database()["backup_history"]
+
+
+backupHistory = BackupHistory(
+    history_collection,
+    config.backupSnapshotInterval,
+    config.backupHistoryRetentionHours * 3600,
+    config.backupHistoryMaxVersions)
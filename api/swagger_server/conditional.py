@@ -0,0 +1,55 @@
+import threading
+import uuid
+
+import flask
+
+from swagger_server import metrics
+
+# Versions start from zero on every restart, so tags carry a per-process
+# id to keep a tag from a previous process from ever matching.
+processId = uuid.uuid4().hex[:8]
+
+
+def etag(tag):
+    return f'"{tag}"'
+
+
+def headers(tag):
+    return {
+        'ETag': etag(tag),
+        'Cache-Control': "no-cache",
+        'Vary': "Accept-Encoding"
+    }
+
+
+def not_modified(tag):
+    """Returns a 304 response if the request already has tag, else None"""
+    if tag is not None and flask.request.if_none_match.contains(tag):
+        metrics.cacheLookups.inc(cache="etag", result="hit")
+        return flask.Response(status=304, headers=headers(tag))
+    metrics.cacheLookups.inc(cache="etag", result="miss")
+    return None
+
+
+class VersionCounters:
+    """Per-resource version counters, bumped on every write
+
+    Reads derive their ETag from the counter, so a conditional GET can be
+    answered without looking at MongoDB or rebuilding anything.
+    """
+
+    def __init__(self):
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def bump(self, key):
+        with self._lock:
+            version = self._versions.get(key, 0) + 1
+            self._versions[key] = version
+            return version
+
+    def tag(self, key):
+        return f"{processId}-{key}-{self._versions.get(key, 0)}"
+
+
+versions = VersionCounters()
@@ -1,7 +1,11 @@
 from dataclasses import dataclass
 import os
 import logging
+import tempfile
+import threading
 from pymongo import MongoClient
+from swagger_server import startup
+from swagger_server.mongo_monitor import CommandMonitor
 
 
 logging.basicConfig(
@@ -9,9 +13,36 @@ logging.basicConfig(
 logger = logging.getLogger()
 
 
+class LazyClient:
+    """Class attribute that creates its value with create on first access"""
+
+    def __init__(self, create):
+        self._create = create
+        self._client = None
+        self._lock = threading.Lock()
+
+    def __get__(self, instance, owner):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    with startup.phase("mongodb client"):
+                        self._client = self._create()
+        return self._client
+
+
 @dataclass
 class Config:
     logLevel = os.environ.get('LOG_LEVEL', "INFO")
+    # Log records are formatted and written by a background thread, queueing
+    # up to logQueueSize records before new ones are dropped
+    logQueue = os.environ.get('LOG_QUEUE', "true").lower() == "true"
+    logQueueSize = int(os.environ.get('LOG_QUEUE_SIZE', "10000"))
+    # Per-entry diagnostics are sampled per route (LOG_SAMPLE_RATES as
+    # "operation_id=rate,...", LOG_SAMPLE_RATE otherwise) and then limited
+    # to logRateLimit records per route per second
+    logSampleRate = float(os.environ.get('LOG_SAMPLE_RATE', "0.1"))
+    logSampleRates = os.environ.get('LOG_SAMPLE_RATES', "")
+    logRateLimit = float(os.environ.get('LOG_RATE_LIMIT', "20"))
     apiKey = os.environ.get('API_KEY')
     mongodbHost = os.environ.get('MONGODB_HOST', "localhost")
     mongodbPort = os.environ.get('MONGODB_PORT', "27017")
@@ -19,9 +50,73 @@ class Config:
     mongodbPassword = os.environ.get('MONGODB_PASSWORD')
     mongodbDatabaseName = os.environ.get('MONGODB_DATABASE')
     mongodbConnectionString = f"mongodb://{mongodbUsername}:{mongodbPassword}@{mongodbHost}:{mongodbPort}/{mongodbDatabaseName}"
-    mongodbClient = MongoClient(mongodbConnectionString,
-                                serverSelectionTimeoutMS=5000)
-    lightsUrl = "https://lights.barbelltracker.com/api/meet_status"
+    # MongoDB commands taking at least mongodbSlowMs are logged, with the
+    # values in their filter redacted
+    mongodbSlowMs = float(os.environ.get('MONGODB_SLOW_MS', "100"))
+    # Created the first time it is used, which the memory and SQLite storage
+    # backends never do
+    mongodbClient = LazyClient(lambda: MongoClient(
+        Config.mongodbConnectionString,
+        serverSelectionTimeoutMS=5000,
+        event_listeners=[CommandMonitor(Config.mongodbSlowMs)]))
+    # Create missing indexes and apply schema migrations when the API starts,
+    # see swagger_server.migrations
+    mongodbMigrate = os.environ.get('MONGODB_MIGRATE', "true").lower() == "true"
+    # "mongodb", "memory" (this process only, lost on restart) or "sqlite"
+    # (the database file at sqlitePath, in WAL mode), see swagger_server.storage
+    storageBackend = os.environ.get('STORAGE_BACKEND', "mongodb")
+    sqlitePath = os.environ.get('SQLITE_PATH', "openlifter.db")
+    # "embedded" stores one order document per platform with every entry in it,
+    # "normalized" keeps the entries in their own collection, see swagger_server.order_store
+    orderStorage = os.environ.get('ORDER_STORAGE', "embedded")
+    # Registrations are imported with unordered bulk writes of this many upserts
+    registrationsBatchSize = int(os.environ.get('REGISTRATIONS_BATCH_SIZE', "500"))
+    # Point at benchmarks/lights_server.py to run the lights path offline
+    lightsUrl = os.environ.get('LIGHTS_URL', "https://lights.barbelltracker.com/api/meet_status")
+    # Lights statuses are cached for lightsTtl seconds and then served for up
+    # to lightsStaleTtl more while they are fetched again in the background
+    lightsTtl = float(os.environ.get('LIGHTS_TTL', "1"))
+    lightsStaleTtl = float(os.environ.get('LIGHTS_STALE_TTL', "30"))
+    lightsConnectTimeout = float(os.environ.get('LIGHTS_CONNECT_TIMEOUT', "1"))
+    lightsReadTimeout = float(os.environ.get('LIGHTS_READ_TIMEOUT', "2"))
+    lightsPoolSize = int(os.environ.get('LIGHTS_POOL_SIZE', "10"))
+    # A background poller fetches the status of every lights code in use every
+    # lightsPollInterval seconds, backing off to lightsPollMaxInterval while it
+    # doesn't change and until the next order write, and lights reads are
+    # answered from its latest status
+    lightsPoller = os.environ.get('LIGHTS_POLLER', "false").lower() == "true"
+    lightsPollInterval = float(os.environ.get('LIGHTS_POLL_INTERVAL', "1"))
+    lightsPollMaxInterval = float(os.environ.get('LIGHTS_POLL_MAX_INTERVAL', "2"))
+    lightsDiscoveryInterval = float(os.environ.get('LIGHTS_DISCOVERY_INTERVAL', "30"))
+    # "sync" writes every backup straight to MongoDB, "write-behind" keeps the
+    # latest state per meet in memory and flushes it every backupFlushInterval seconds
+    backupWriteMode = os.environ.get('BACKUP_WRITE_MODE', "sync")
+    backupFlushInterval = float(os.environ.get('BACKUP_FLUSH_INTERVAL', "2"))
+    # Every stored backup is also kept as a compressed version, a full snapshot
+    # every backupSnapshotInterval versions and deltas in between
+    backupHistoryEnabled = os.environ.get('BACKUP_HISTORY', "true").lower() == "true"
+    backupSnapshotInterval = int(os.environ.get('BACKUP_SNAPSHOT_INTERVAL', "50"))
+    backupHistoryRetentionHours = float(os.environ.get('BACKUP_HISTORY_RETENTION_HOURS', "24"))
+    backupHistoryMaxVersions = int(os.environ.get('BACKUP_HISTORY_MAX_VERSIONS', "20000"))
+    # Number of meets whose gzipped backup is kept in memory for GET /backup/{meet}
+    backupCacheSize = int(os.environ.get('BACKUP_CACHE_SIZE', "16"))
+    # Server-Sent Events: seconds between keep-alive comments and the number of
+    # events kept per platform for Last-Event-ID resume
+    sseKeepAlive = float(os.environ.get('SSE_KEEPALIVE', "15"))
+    sseHistorySize = int(os.environ.get('SSE_HISTORY_SIZE', "50"))
+    # Opt in to placing every entry with NumPy when the leaderboard is
+    # rebuilt for at least leaderboardNumpyMinEntries entries, if installed
+    leaderboardNumpy = os.environ.get('LEADERBOARD_NUMPY', "false").lower() == "true"
+    leaderboardNumpyMinEntries = int(os.environ.get('LEADERBOARD_NUMPY_MIN_ENTRIES', "1000"))
+    # Serve the interactive API docs at /ui, off for the fastest start
+    swaggerUi = os.environ.get('SWAGGER_UI', "true").lower() == "true"
+    # swagger.yaml is rendered once and cached here as JSON, so later starts
+    # skip Jinja2 and YAML parsing, empty to always parse it
+    specCachePath = os.environ.get(
+        'SPEC_CACHE_PATH', os.path.join(tempfile.gettempdir(), "openlifter-swagger.json"))
+    # Compute entry points from meetData.formula when an order is posted,
+    # instead of keeping the points the client rendered
+    pointsServerSide = os.environ.get('POINTS_SERVER_SIDE', "true").lower() == "true"
 
 
 def mongodb_connection_failure() -> str:
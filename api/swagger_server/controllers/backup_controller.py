@@ -2,36 +2,109 @@ import time
 import connexion
 import six
 import json
+from bson import Binary
 from swagger_server.exceptions import DocumentNotFound
 
 from swagger_server.models.any_value import AnyValue  # noqa: E501
 from swagger_server import util
 from swagger_server.config import Config, logger
+from swagger_server.payload_digest import PayloadDigests, digest
+from swagger_server.backup_buffer import BackupWriteBehind
+from swagger_server.backup_history import backupHistory
+from swagger_server import encoded_body
+from swagger_server.conditional import not_modified
+from swagger_server import logs, metrics, storage
 
 config = Config()
+backupDigests = PayloadDigests()
+backupBodies = encoded_body.EncodedBodyCache(config.backupCacheSize)
 
 
-def backup_meet_get(meet):  # noqa: E501
+def write_backup(meet, backup):
+    state, payload = backup
+    gzipped = encoded_body.compress(payload)
+    database = storage.database()
+    collection = database["backup"]
+    collection.update_one(
+        {'id': meet}, {'$set': dict(state, encoded=Binary(gzipped))}, upsert=True)
+    backupBodies.put(meet, state['digest'], gzipped)
+    # Only a stored state may answer repeated posts and conditional GETs
+    backupDigests.remember(meet, state['digest'])
+    if config.backupHistoryEnabled:
+        # The backup itself is stored, so a failed history version mustn't fail the post
+        try:
+            backupHistory.record(meet, state['globalState'], state['lastUpdated'])
+        except Exception as e:
+            logger.error(f"Failed to record backup history for meet: {meet}: {e}")
+
+
+backupBuffer = None
+if config.backupWriteMode == "write-behind":
+    backupBuffer = BackupWriteBehind(write_backup, config.backupFlushInterval)
+    backupBuffer.start()
+
+
+def backup_meet_get(meet, version=None):  # noqa: E501
     """Returns a copy of the global state for a meet
 
     Update the current lifter  # noqa: E501
 
     :param meet: Meet name
     :type meet: int
+    :param version: Backup version to restore, defaults to the latest state
+    :type version: int
 
     :rtype: AnyValue
     """
-    database = config.mongodbClient[config.mongodbDatabaseName]
+    if version is not None:
+        logger.info(f"Restoring state for meet: {meet} at version: {version}")
+        payload = json.dumps(backupHistory.restore(meet, version),
+                             separators=(',', ':')).encode('utf-8')
+        return encoded_body.response(digest(payload), encoded_body.compress(payload))
+
+    if backupBuffer is not None:
+        pending = backupBuffer.pending(meet)
+        if pending is not None:
+            logger.info(f"Returning buffered state for meet: {meet}")
+            state, payload = pending
+            notModified = not_modified(encoded_body.tag(state['digest']))
+            if notModified is not None:
+                return notModified
+            return encoded_body.response(state['digest'], encoded_body.compress(payload))
+    # The digest of the last state stored through this process identifies
+    # the current state, so a matching If-None-Match needs no further work.
+    notModified = not_modified(encoded_body.tag(backupDigests.latest(meet)))
+    if notModified is not None:
+        return notModified
+    cached = backupBodies.get(meet)
+    if cached is not None:
+        logger.info(f"Returning cached state for meet: {meet}")
+        return encoded_body.response(*cached)
+
+    database = storage.database()
     collection = database["backup"]
     query = {"id": meet}
-    document = collection.find_one(query)
+    if connexion.request.if_none_match:
+        document = collection.find_one(query, {'digest': True})
+        if document is not None:
+            notModified = not_modified(encoded_body.tag(document.get('digest')))
+            if notModified is not None:
+                return notModified
+    document = collection.find_one(query, {'globalState': False})
 
     if document is None:
         logger.info(f"Could not find document for meet: {meet}")
         raise DocumentNotFound(meet, "backup")
-    else:
-        logger.info(f"Returning state for meet: {meet}")
-        return document['globalState']
+    if 'encoded' not in document:
+        # Stored before backups were kept pre-encoded
+        document = collection.find_one(query, {'globalState': True})
+        payload = json.dumps(document['globalState'],
+                             separators=(',', ':')).encode('utf-8')
+        document['digest'] = digest(payload)
+        document['encoded'] = encoded_body.compress(payload)
+    logger.info(f"Returning state for meet: {meet}")
+    backupBodies.put(meet, document['digest'], bytes(document['encoded']))
+    return encoded_body.response(document['digest'], bytes(document['encoded']))
 
 
 def backup_meet_post(meet, body=None):  # noqa: E501
@@ -46,18 +119,43 @@ def backup_meet_post(meet, body=None):  # noqa: E501
 
     :rtype: AnyValue
     """
-    database = config.mongodbClient[config.mongodbDatabaseName]
-    collection = database["backup"]
     if connexion.request.is_json:
+        payload = connexion.request.get_data()
+        payloadDigest = digest(payload)
+        if backupDigests.lookup(meet, payloadDigest) is not None:
+            logger.info(f"State for meet: {meet} is unchanged, skipping backup")
+            metrics.skippedWrites.inc(collection="backup")
+            metrics.skippedWriteBytes.inc(len(payload), collection="backup")
+            return {'status': 'ok', 'message': 'state unchanged', 'unchanged': True}
         data = connexion.request.get_json()  # noqa: E501
-        logger.debug(json.dumps(connexion.request.get_json()))
+        logger.debug("Backup payload: %s", logs.body(payload))
         logger.info(f"Backing up state for meet: {meet}")
         state = {
             'id': meet,
             'lastUpdated': time.strftime("%Y/%m/%d-%H:%M:%S", time.localtime()),
-            'globalState': data
+            'globalState': data,
+            'digest': payloadDigest
         }
-        collection.update_one(
-            {'id': meet}, {'$set': state}, upsert=True)
-        return {'status': 'ok', 'message': 'state backed up'}
+        if backupBuffer is not None:
+            backupBuffer.submit(meet, (state, payload))
+            return {'status': 'ok', 'message': 'state queued for backup', 'unchanged': False}
+        write_backup(meet, (state, payload))
+        return {'status': 'ok', 'message': 'state backed up', 'unchanged': False}
     return {'status': 'fail', 'message': 'No JSON object detected'}
+
+
+def backup_meet_versions_get(meet):  # noqa: E501
+    """Lists the stored backup versions for a meet
+
+    Lists the stored backup versions for a meet, oldest first  # noqa: E501
+
+    :param meet: Meet name
+    :type meet: str
+
+    :rtype: AnyValue
+    """
+    versions = backupHistory.versions(meet)
+    if len(versions) == 0:
+        logger.info(f"Could not find backup history for meet: {meet}")
+        raise DocumentNotFound(meet, "backup_history")
+    return versions
@@ -4,6 +4,7 @@ import six
 from swagger_server.models.api_health import ApiHealth  # noqa: E501
 from swagger_server import util
 from swagger_server.config import Config, logger, mongodb_connection_failure
+from swagger_server import metrics, storage
 from pymongo import errors, MongoClient
 import json
 import time
@@ -22,7 +23,7 @@ def health_get():  # noqa: E501
     """
 
     try:
-        database = config.mongodbClient[config.mongodbDatabaseName]
+        database = storage.database()
         collection = database["health"]
         healthCheck = {
             'reason': "API health check",
@@ -35,17 +36,31 @@ def health_get():  # noqa: E501
         return {
             'databaseStatus': "fail",
             'apiStatus': "ok",
-            'failureMessage': mongodb_connection_failure()
+            'failureMessage': mongodb_connection_failure(),
+            'metrics': metrics.snapshot()
         }
     except Exception as e:
         logger.error(e)
         return {
             'databaseStatus': "fail",
             'apiStatus': "ok",
-            'failureMessage': json.dumps(e.args[0])
+            'failureMessage': json.dumps(e.args[0]),
+            'metrics': metrics.snapshot()
         }
 
     return {
         'databaseStatus': "ok",
-        'apiStatus': "ok"
+        'apiStatus': "ok",
+        'metrics': metrics.snapshot()
     }
+
+
+def metrics_get():  # noqa: E501
+    """Returns API metrics for Prometheus
+
+    Returns every metric in the Prometheus text exposition format  # noqa: E501
+
+
+    :rtype: str
+    """
+    return metrics.render()
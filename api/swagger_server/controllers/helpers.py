@@ -1,9 +1,27 @@
 from swagger_server.config import Config, logger
+from swagger_server import logs
+import bisect
 import json
 
+# NumPy takes longer to import than the rest of the API, so it is only
+# imported once a leaderboard is rebuilt with it
+_numpy = False
+
+
+def load_numpy():
+    """Returns the numpy module, or None when NumPy is not installed"""
+    global _numpy
+    if _numpy is False:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _numpy = numpy
+    return _numpy
+
 
 def calculate_max_lifts(data):
-    logger.info("Calculating max successful lift values")
+    logger.debug("Calculating max successful lift values", extra=logs.sampled)
     goodSquat = []
     goodBench = []
     goodDeadlift = []
@@ -40,6 +58,138 @@ def lbs2kgs(kg):
     return round(kg / 2.20462262, 2)
 
 
+sexes = ('M', 'F', 'Mx')
+
+
+def find_weight_class_index(bodyweight_kg, weight_classes, in_kg):
+    """Returns the index of the weight class for a body weight
+
+    Walks the classes in the order given: the first class the body weight
+    fits under wins, compared in pounds when the meet isn't in kg. Returns
+    len(weight_classes) for the super-heavy class. Only needed for class
+    lists that aren't in ascending order, see WeightClassBoundaries.
+
+    :rtype: int
+    """
+    outsideMax = weight_classes[-1]
+    for index in range(len(weight_classes)):
+        if in_kg is True:
+            if bodyweight_kg <= weight_classes[index]:
+                return index
+            elif bodyweight_kg > outsideMax:
+                break
+        else:
+            if kg2lbs(bodyweight_kg) <= kg2lbs(weight_classes[index]):
+                return index
+            elif kg2lbs(bodyweight_kg) > kg2lbs(outsideMax):
+                break
+    return len(weight_classes)
+
+
+def weight_class_label(weight_classes, index, in_kg):
+    """Returns the weightClass value used in results for a class index"""
+    if index == len(weight_classes):
+        if in_kg is True:
+            return str(weight_classes[-1]) + "+"
+        return str(kg2lbs(weight_classes[-1])) + "+"
+    if in_kg is True:
+        return weight_classes[index]
+    return kg2lbs(weight_classes[index])
+
+
+class WeightClassBoundaries:
+    """Upper limits of a sex's weight classes, precomputed for bisecting
+
+    The limits are converted to the meet's unit once, so placing a body
+    weight is a binary search instead of a walk over the classes with a
+    kg2lbs call per comparison. Class lists that aren't in ascending order
+    fall back to find_weight_class_index, which gives the same answer.
+    """
+
+    def __init__(self, weight_classes, in_kg):
+        self.weightClasses = weight_classes
+        self.inKg = in_kg
+        if in_kg is True:
+            self.limits = list(weight_classes)
+        else:
+            self.limits = [kg2lbs(weight_class)
+                           for weight_class in weight_classes]
+        self.ascending = all(self.limits[index] <= self.limits[index + 1]
+                             for index in range(len(self.limits) - 1))
+        self.labels = [weight_class_label(weight_classes, index, in_kg)
+                       for index in range(len(weight_classes) + 1)]
+
+    def index(self, bodyweight_kg):
+        """Returns the class index for a body weight, len(limits) if super-heavy
+
+        :rtype: int
+        """
+        if not self.ascending:
+            return find_weight_class_index(bodyweight_kg, self.weightClasses, self.inKg)
+        if self.inKg is True:
+            return bisect.bisect_left(self.limits, bodyweight_kg)
+        return bisect.bisect_left(self.limits, kg2lbs(bodyweight_kg))
+
+
+def meet_boundaries(meet_data):
+    """Returns WeightClassBoundaries by sex, None for sexes without classes
+
+    :rtype: dict
+    """
+    classesBySex = {
+        'M': meet_data['weightClassesKgMen'],
+        'F': meet_data['weightClassesKgWomen'],
+        'Mx': meet_data['weightClassesKgMx']
+    }
+    boundaries = {}
+    for sex in sexes:
+        if len(classesBySex[sex]) > 0:
+            boundaries[sex] = WeightClassBoundaries(
+                classesBySex[sex], meet_data['inKg'])
+        else:
+            boundaries[sex] = None
+    return boundaries
+
+
+def partition_entries(entries, boundaries):
+    """Places every entry in its sex and weight class in a single pass
+
+    :param boundaries: WeightClassBoundaries by sex, as from meet_boundaries
+    :type boundaries: dict
+
+    :rtype: dict
+    :returns: Lists of (class index, entry) by sex, in entry order
+    """
+    placed = {sex: [] for sex in boundaries}
+    for entry in entries:
+        sexBoundaries = boundaries.get(entry['sex'])
+        if sexBoundaries is None:
+            continue
+        placed[entry['sex']].append(
+            (sexBoundaries.index(entry['bodyweightKg']), entry))
+    return placed
+
+
+def place_bodyweights(boundaries, bodyweights):
+    """Returns the class index for each of a list of body weights
+
+    Uses a single numpy.searchsorted when NumPy is installed. Pounds are
+    still converted with kg2lbs so rounding matches index() exactly.
+
+    :rtype: list
+    """
+    numpy = load_numpy()
+    if numpy is None or not boundaries.ascending:
+        return [boundaries.index(bodyweight) for bodyweight in bodyweights]
+    if boundaries.inKg is True:
+        values = numpy.array(bodyweights, dtype=float)
+    else:
+        values = numpy.array([kg2lbs(bodyweight)
+                             for bodyweight in bodyweights], dtype=float)
+    limits = numpy.array(boundaries.limits, dtype=float)
+    return numpy.searchsorted(limits, values, side='left').tolist()
+
+
 def find_unique_event_combos(entries):
     events = []
     for entry in entries:
@@ -48,160 +198,56 @@ def find_unique_event_combos(entries):
 
 
 def group_entries(sex, weight_classes, entries, in_kg, entries_filter):
+    if len(weight_classes) == 0:
+        return group_placed_entries(None, [], entries_filter)
+    boundaries = {sex: WeightClassBoundaries(weight_classes, in_kg)}
+    placed = partition_entries(entries, boundaries)
+    return group_placed_entries(boundaries[sex], placed[sex], entries_filter)
+
+
+def group_placed_entries(boundaries, placed, entries_filter):
     if entries_filter == "class":
-        return group_entries_by_weight_class(sex, weight_classes, entries, in_kg)
+        return group_entries_by_weight_class(boundaries, placed)
     elif entries_filter == "points":
-        return group_entries_by_total_points(sex, weight_classes, entries, in_kg)
+        return group_entries_by_total_points(boundaries, placed)
 
 
-def group_entries_by_total_points(sex, weight_classes, entries, in_kg):
-    logger.info(f"Grouping entries by total points for: {sex}")
-    if len(weight_classes) == 0:
+def group_entries_by_total_points(boundaries, placed):
+    if boundaries is None:
         return None
-    fileteredEntries = []
-    outsideMax = weight_classes[-1:][0]
-    outsideMaxKey = str(outsideMax) + "+"
-    outsideMaxLbsKey = str(kg2lbs(outsideMax)) + "+"
+    logger.info(f"Ordering {len(placed)} entries by points")
+    for index, entry in placed:
+        entry["weightClass"] = boundaries.labels[index]
+    return sorted((entry for _, entry in placed),
+                  key=lambda d: d['points'], reverse=True)
 
-    for entry in entries:
-        logger.debug(entry)
-        if entry['sex'] == sex:
-            for index in range(len(weight_classes)):
-                logger.info(
-                    f"Checking if entry id: {entry['id']} belongs in class: {weight_classes[index]}")
-                if in_kg is True:
-                    if entry['bodyweightKg'] <= weight_classes[index]:
-                        logger.info(
-                            f"Body weight: {entry['bodyweightKg']} within class: {weight_classes[index]}")
-                        entry["weightClass"] = weight_classes[index]
-                        fileteredEntries.append(entry)
-                        break
-                    elif entry['bodyweightKg'] > outsideMax:
-                        logger.info(
-                            f"Body weight: {entry['bodyweightKg']} outside of maximum class assigned to: {outsideMaxKey}")
-                        entry["weightClass"] = outsideMaxKey
-                        fileteredEntries.append(entry)
-                        break
-                else:
-                    if kg2lbs(entry['bodyweightKg']) <= kg2lbs(weight_classes[index]):
-                        logger.info(
-                            f"Body weight: {kg2lbs(entry['bodyweightKg'])} within class: {kg2lbs(weight_classes[index])}")
-                        entry["weightClass"] = kg2lbs(weight_classes[index])
-                        fileteredEntries.append(entry)
-                        break
-                    elif kg2lbs(entry['bodyweightKg']) > kg2lbs(outsideMax):
-                        logger.info(
-                            f"Body weight: {kg2lbs(entry['bodyweightKg'])} outside of maximum class assigned to: {outsideMaxLbsKey}")
-                        entry["weightClass"] = outsideMaxLbsKey
-                        fileteredEntries.append(entry)
-                        break
-        else:
-            continue
 
-    logger.info("Ordering entries by points")
-    orderedbyPoints = sorted(fileteredEntries,
-                             key=lambda d: d['points'], reverse=True)
-    return orderedbyPoints
-
-
-def group_entries_by_weight_class(sex, weight_classes, entries, in_kg):
-    logger.info(f"Grouping entries by class for: {sex}")
-    if len(weight_classes) == 0:
+def group_entries_by_weight_class(boundaries, placed):
+    if boundaries is None:
         return None
+    logger.info(f"Grouping {len(placed)} entries by class")
+    entriesByClass = [[] for _ in boundaries.labels]
+    for index, entry in placed:
+        entriesByClass[index].append(entry)
     fileteredEntries = []
-    outsideMax = weight_classes[-1:][0]
-    outsideMaxKey = str(outsideMax) + "+"
-    outsideMaxLbsKey = str(kg2lbs(outsideMax)) + "+"
-    for weight_class in weight_classes:
-        if in_kg is True:
-            fileteredEntries.append({
-                'weightClass': weight_class,
-                'entries': []
-            })
-        else:
-            fileteredEntries.append({
-                'weightClass': kg2lbs(weight_class),
-                'entries': []
-            })
-    if in_kg is True:
-        fileteredEntries.append({
-            'weightClass': outsideMaxKey,
-            'outsideMax': True,
-            'entries': []
-        })
-    else:
-        fileteredEntries.append({
-            'weightClass': outsideMaxLbsKey,
-            'outsideMax': True,
-            'entries': []
-        })
-    for entry in entries:
-        logger.debug(entry)
-        if entry['sex'] == sex:
-            for index in range(len(weight_classes)):
-                logger.info(
-                    f"Checking if entry id: {entry['id']} belongs in class: {weight_classes[index]}")
-                if in_kg is True:
-                    if entry['bodyweightKg'] <= weight_classes[index]:
-                        logger.info(
-                            f"Body weight: {entry['bodyweightKg']} within class: {weight_classes[index]}")
-                        fileteredEntries[index]['entries'].append(entry)
-                        break
-                    elif entry['bodyweightKg'] > outsideMax:
-                        logger.info(
-                            f"Body weight: {entry['bodyweightKg']} outside of maximum class assigned to: {outsideMaxKey}")
-                        fileteredEntries[len(weight_classes)
-                                         ]['entries'].append(entry)
-                        break
-                else:
-                    if kg2lbs(entry['bodyweightKg']) <= kg2lbs(weight_classes[index]):
-                        logger.info(
-                            f"Body weight: {kg2lbs(entry['bodyweightKg'])} within class: {kg2lbs(weight_classes[index])}")
-                        fileteredEntries[index]['entries'].append(entry)
-                        break
-                    elif kg2lbs(entry['bodyweightKg']) > kg2lbs(outsideMax):
-                        logger.info(
-                            f"Body weight: {kg2lbs(entry['bodyweightKg'])} outside of maximum class assigned to: {outsideMaxLbsKey}")
-                        fileteredEntries[len(weight_classes)
-                                         ]['entries'].append(entry)
-                        break
-        else:
-            continue
-    emptyKeysToRemove = []
-    for index in range(len(fileteredEntries)):
-        if len(fileteredEntries[index]['entries']) > 0:
+    for index in range(len(entriesByClass)):
+        if len(entriesByClass[index]) == 0:
             continue
-        else:
-            emptyKeysToRemove.append(index)
-    for index in sorted(emptyKeysToRemove, reverse=True):
-        logger.info(
-            f"Removing index: {index} due to it not having any entries")
-        fileteredEntries.pop(index)
-    for index in range(len(fileteredEntries)):
-        logger.info(
-            f"Ordering entries for: {fileteredEntries[index]['weightClass']}")
-        currentEntriesOrder = fileteredEntries[index]['entries']
-        orderedbyPoints = sorted(currentEntriesOrder,
-                                 key=lambda d: d['points'], reverse=True)
-        fileteredEntries[index]['entries'] = orderedbyPoints
+        group = {'weightClass': boundaries.labels[index]}
+        if index == len(boundaries.weightClasses):
+            group['outsideMax'] = True
+        group['entries'] = sorted(entriesByClass[index],
+                                  key=lambda d: d['points'], reverse=True)
+        fileteredEntries.append(group)
     return fileteredEntries
 
 
 def leaderboard_results(data, entries_filter):
-    weightClassesKgMen = data['meetData']['weightClassesKgMen']
-    weightClassesKgWomen = data['meetData']['weightClassesKgWomen']
-    weightClassesKgMx = data['meetData']['weightClassesKgMx']
-
-    entriesByWeightClassesKgMen = group_entries("M",
-                                                weightClassesKgMen, data['entries'], data['meetData']['inKg'], entries_filter)
-    entriesByWeightClassesKgWomen = group_entries("F",
-                                                  weightClassesKgWomen, data['entries'], data['meetData']['inKg'], entries_filter)
-    entriesByWeightClassesKgMx = group_entries("Mx",
-                                               weightClassesKgMx, data['entries'], data['meetData']['inKg'], entries_filter)
-
+    boundaries = meet_boundaries(data['meetData'])
+    placed = partition_entries(data['entries'], boundaries)
     return {
-        'male': entriesByWeightClassesKgMen,
-        'female': entriesByWeightClassesKgWomen,
-        'mx': entriesByWeightClassesKgMx,
+        'male': group_placed_entries(boundaries['M'], placed['M'], entries_filter),
+        'female': group_placed_entries(boundaries['F'], placed['F'], entries_filter),
+        'mx': group_placed_entries(boundaries['Mx'], placed['Mx'], entries_filter),
         'inKg': data['meetData']['inKg']
     }
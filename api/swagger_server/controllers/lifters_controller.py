@@ -1,4 +1,4 @@
-from swagger_server.exceptions import DocumentNotFound
+from swagger_server.exceptions import DocumentNotFound, OrderVersionConflict
 import connexion
 import six
 
@@ -7,10 +7,65 @@ from swagger_server import util
 from swagger_server.config import Config, logger
 import json
 import time
-from swagger_server.controllers.helpers import calculate_max_lifts
+import flask
+from swagger_server.events import EventHub, event_stream
+from swagger_server.websocket_hub import hub
+from swagger_server.conditional import headers, not_modified, versions
+from swagger_server.controllers.lights_controller import lights_order_written
+from swagger_server.controllers.results_controller import divisionPlacings, leaderboardEngine, publish_leaderboards
+from swagger_server.order_delta import apply_order_delta
+from swagger_server.order_projection import OrderProjection
+from swagger_server.order_store import orderStore, stored_orders
+from swagger_server.payload_digest import PayloadDigests, digest
+from swagger_server.points import score_entries
+from swagger_server import logs, metrics
 
 
 config = Config()
+orderDigests = PayloadDigests()
+
+
+orderProjection = OrderProjection(stored_orders)
+lifterEvents = EventHub(config.sseHistorySize)
+
+
+def order_written(platform, document):
+    """Brings the read side up to date with a written order document"""
+    projection = orderProjection.update(platform, document)
+    if projection is None:
+        logger.info(
+            f"Order version: {document.get('version')} for platform: {platform} is already superseded")
+        return
+    leaderboardEngine.update(platform, document)
+    divisionPlacings.commit(platform, document)
+    lights_order_written(platform, document.get('lightsCode'))
+    publish_lifters(platform, projection)
+
+
+def lifters_event(projection):
+    return json.dumps({
+        'current': projection['current'],
+        'next': projection['next']
+    }, separators=(',', ':'), default=str)
+
+
+def publish_lifters(platform, projection):
+    versions.bump(f"order/{platform}/current")
+    versions.bump(f"order/{platform}/next")
+    versions.bump("results")
+    if lifterEvents.channel(platform).publish("lifters", lifters_event(projection)):
+        logger.info(f"Published current and next lifter for platform: {platform}")
+    hub.publish(f"platform/{platform}/current", projection['current'])
+    hub.publish(f"platform/{platform}/next", projection['next'])
+    publish_leaderboards()
+
+
+def load_platform_topic(topic):
+    _, platform, lifter = topic.split("/")
+    return orderProjection.get(int(platform))[lifter]
+
+
+hub.set_loader("platform", load_platform_topic)
 
 
 def lifter_platform_current_get(platform):  # noqa: E501
@@ -24,38 +79,12 @@ def lifter_platform_current_get(platform):  # noqa: E501
     :rtype: CurrentLifter
     """
     logger.debug(type(platform))
-    database = config.mongodbClient[config.mongodbDatabaseName]
-    collection = database["order"]
-    query = {"platform": platform}
-    document = collection.find_one(query)
-    currentEntryId = document['order']['currentEntryId']
-    currentAttemptNumber = document['order']['attemptOneIndexed']
-    platformDetails = document['order']['platformDetails']
-
-    if document is None:
-        logger.info(f"Could not find document for platform: {platform}")
-        raise DocumentNotFound(platform, "order")
-    else:
-        if currentEntryId is not None:
-            for order in document['order']['orderedEntries']:
-                if order['id'] == currentEntryId:
-                    logger.info(
-                        f"Found entry details for id: {currentEntryId}")
-                    return {
-                        'platformDetails': platformDetails,
-                        'attempt': currentAttemptNumber,
-                        'entry': order,
-                        'maxLift': calculate_max_lifts(order)
-                    }
-        elif currentEntryId is None:
-            return {
-                'platformDetails': platformDetails,
-                'attempt': currentAttemptNumber,
-                'entry': document['order']['orderedEntries'][-1],
-                'maxLift': calculate_max_lifts(document['order']['orderedEntries'][-1])
-            }
-        else:
-            raise DocumentNotFound(platform, "order")
+    tag = versions.tag(f"order/{platform}/current")
+    notModified = not_modified(tag)
+    if notModified is not None:
+        return notModified
+    return orderProjection.current(platform), 200, headers(tag)
+
 
 def lifter_platform_next_get(platform):  # noqa: E501
     """Returns the next lifter
@@ -68,35 +97,55 @@ def lifter_platform_next_get(platform):  # noqa: E501
     :rtype: CurrentLifter
     """
     logger.debug(type(platform))
-    database = config.mongodbClient[config.mongodbDatabaseName]
-    collection = database["order"]
-    query = {"platform": platform}
-    document = collection.find_one(query)
-    nextEntryId = document['order']['nextEntryId']
-    nextAttemptNumber = document['order']['nextAttemptOneIndexed']
-    platformDetails = document['order']['platformDetails']
-
-    if document is None:
-        logger.info(f"Could not find document for platform: {platform}")
-        raise DocumentNotFound(platform, "order")
-    else:
-        if nextEntryId is not None:
-            for order in document['order']['orderedEntries']:
-                if order['id'] == nextEntryId:
-                    logger.info(f"Found entry details for id: {nextEntryId}")
-                    return {
-                        'platformDetails': platformDetails,
-                        'attempt': nextAttemptNumber,
-                        'entry': order
-                    }
-        elif nextEntryId is None:
-            return {
-                'platformDetails': platformDetails,
-                'attempt': 3,
-                'entry': document['order']['orderedEntries'][-1]
-            }
-        else:
-            raise DocumentNotFound(platform, "order")
+    tag = versions.tag(f"order/{platform}/next")
+    notModified = not_modified(tag)
+    if notModified is not None:
+        return notModified
+    return orderProjection.next(platform), 200, headers(tag)
+
+
+def lifter_platform_events_get(platform):  # noqa: E501
+    """Streams current and next lifter changes
+
+    Streams the current and next lifter as Server-Sent Events whenever they change  # noqa: E501
+
+    :param platform: id of the account to return
+    :type platform: str
+
+    :rtype: str
+    """
+    channel = lifterEvents.channel(platform)
+    if channel.latest() is None:
+        # Only seeds the stream, nothing else changed
+        try:
+            channel.publish("lifters", lifters_event(orderProjection.get(platform)))
+        except DocumentNotFound:
+            logger.info(
+                f"No order for platform: {platform} yet, waiting for the first one")
+    lastEventId = connexion.request.headers.get('Last-Event-ID')
+    logger.info(
+        f"Streaming lifter events for platform: {platform} from event: {lastEventId}")
+    return flask.Response(
+        event_stream(channel, lastEventId, config.sseKeepAlive),
+        mimetype="text/event-stream",
+        headers={'Cache-Control': "no-cache", 'X-Accel-Buffering': "no"})
+
+
+def lifter_platform_projection_get(platform):  # noqa: E501
+    """Checks the in-memory order projection against the stored order
+
+    Rebuilds the projection if it does not match the stored order  # noqa: E501
+
+    :param platform: id of the account to return
+    :type platform: str
+
+    :rtype: AnyValue
+    """
+    logger.info(f"Verifying order projection for platform: {platform}")
+    report = orderProjection.verify(platform)
+    if not report['consistent']:
+        publish_lifters(platform, orderProjection.get(platform))
+    return report
 
 
 def lifter_platform_order_post(platform, body=None):  # noqa: E501
@@ -112,11 +161,21 @@ def lifter_platform_order_post(platform, body=None):  # noqa: E501
     :rtype: CurrentLifter
     """
     logger.debug(type(platform))
-    database = config.mongodbClient[config.mongodbDatabaseName]
-    collection = database["order"]
     if connexion.request.is_json:
+        payload = connexion.request.get_data()
+        payloadDigest = digest(payload)
+        unchanged = orderDigests.lookup(platform, payloadDigest)
+        if unchanged is not None:
+            logger.info(
+                f"Order for platform: {platform} is unchanged, skipping write")
+            metrics.skippedWrites.inc(collection="order")
+            metrics.skippedWriteBytes.inc(len(payload), collection="order")
+            return {'status': 'ok', 'message': 'order unchanged', 'version': unchanged['version'], 'unchanged': True}
         data = connexion.request.get_json()
-        logger.debug(json.dumps(connexion.request.get_json()))
+        logger.debug("Order payload: %s", logs.body(payload))
+        if config.pointsServerSide:
+            score_entries(data['meetData'], data['order']['orderedEntries'])
+        divisionPlacings.place(platform, data)
         order = {
             'platform': platform,
             'meetData': data['meetData'],
@@ -124,7 +183,49 @@ def lifter_platform_order_post(platform, body=None):  # noqa: E501
             'order': data['order'],
             'lastUpdated': time.strftime("%Y/%m/%d-%H:%M:%S", time.localtime())
         }
-        collection.update_one(
-            {'platform': platform}, {'$set': order}, upsert=True)
-        return {'status': 'ok', 'message': 'order updated'}
+        version = orderStore.replace(platform, order)
+        orderDigests.remember(platform, payloadDigest, version=version)
+        order_written(platform, dict(order, version=version))
+        return {'status': 'ok', 'message': 'order updated', 'version': version, 'unchanged': False}
+    return {'status': 'fail', 'message': 'No JSON object detected'}
+
+
+def lifter_platform_order_patch(platform, body=None):  # noqa: E501
+    """Apply a delta to the lifter order
+
+    Applies the changed entries and order fields on top of a stored order version  # noqa: E501
+
+    :param platform: id of the account to return
+    :type platform: str
+    :param body:
+    :type body: dict | bytes
+
+    :rtype: OrderResponse
+    """
+    logger.debug(type(platform))
+    if connexion.request.is_json:
+        delta = connexion.request.get_json()
+        logger.debug("Order delta payload: %s", logs.body(connexion.request.get_data()))
+        orderDigests.forget(platform)
+        document = orderStore.find_one({'platform': platform})
+        update = apply_order_delta(platform, document, delta)
+        meetData = update.get('meetData', document.get('meetData'))
+        if config.pointsServerSide:
+            score_entries(meetData, update['order']['orderedEntries'])
+        divisionPlacings.place(platform, {
+            'meetData': meetData,
+            'order': update['order']
+        })
+        update['lastUpdated'] = time.strftime(
+            "%Y/%m/%d-%H:%M:%S", time.localtime())
+        logger.info(
+            f"Applying order delta for platform: {platform} with {len(delta.get('entries', []))} changed entries")
+        if not orderStore.update(platform, delta['baseVersion'], update, meetData):
+            current = orderStore.find_one(
+                {'platform': platform}, {'version': True})
+            raise OrderVersionConflict(
+                platform, delta['baseVersion'], current.get('version') if current else None)
+        document.update(update)
+        order_written(platform, document)
+        return {'status': 'ok', 'message': 'order updated', 'version': update['version'], 'unchanged': False}
     return {'status': 'fail', 'message': 'No JSON object detected'}
@@ -4,10 +4,80 @@ import six
 from swagger_server.models.any_value import AnyValue  # noqa: E501
 from swagger_server import util
 from swagger_server.config import Config, logger
-import requests
+from swagger_server.exceptions import DocumentNotFound
+from swagger_server.lights_poller import LightsPoller
+from swagger_server.lights_proxy import LightsProxy, pooled_session
+from swagger_server import storage
+from swagger_server.websocket_hub import hub
 
 
 config = Config()
+lightsProxy = LightsProxy(
+    config.lightsUrl, pooled_session(config.lightsPoolSize),
+    config.lightsTtl, config.lightsStaleTtl,
+    (config.lightsConnectTimeout, config.lightsReadTimeout))
+
+
+def lights_for_platform(platform):
+    if lightsPoller is not None:
+        known, state = lightsPoller.lookup(platform)
+        if known:
+            return state
+    database = storage.database()
+    collection = database["order"]
+    query = {"platform": platform}
+    document = collection.find_one(query, {'lightsCode': True})
+
+    if document is None:
+        logger.info(f"Could not find document for platform: {platform}")
+        raise DocumentNotFound(platform, "order")
+
+    track_lights(platform, document.get("lightsCode"))
+    if document.get("lightsCode"):
+        jsonResponse = lightsProxy.get(document['lightsCode'])
+        hub.publish(f"lights/{platform}", jsonResponse)
+        return jsonResponse
+    else:
+        return {}
+
+
+def discover_lights_codes():
+    database = storage.database()
+    for document in database["order"].find({}, {'platform': True, 'lightsCode': True}):
+        if document.get('lightsCode'):
+            yield document['platform'], document['lightsCode']
+
+
+def publish_lights(platform, state):
+    hub.publish(f"lights/{platform}", state)
+
+
+def track_lights(platform, code):
+    """Tells the lights poller, if running, which code platform uses now"""
+    if lightsPoller is not None:
+        lightsPoller.track(platform, code)
+
+
+def lights_order_written(platform, code):
+    """Tells the lights poller, if running, that platform's order was written"""
+    if lightsPoller is not None:
+        lightsPoller.order_written(platform, code)
+
+
+lightsPoller = None
+if config.lightsPoller:
+    lightsPoller = LightsPoller(
+        lightsProxy, discover_lights_codes, publish_lights,
+        config.lightsPollInterval, config.lightsPollMaxInterval,
+        config.lightsDiscoveryInterval)
+    lightsPoller.start()
+
+
+def load_lights_topic(topic):
+    return lights_for_platform(int(topic.split("/")[1]))
+
+
+hub.set_loader("lights", load_lights_topic)
 
 
 def lights_platform_get(platform):  # noqa: E501
@@ -21,22 +91,4 @@ def lights_platform_get(platform):  # noqa: E501
     :rtype: AnyValue
     """
     logger.debug(type(platform))
-    database = config.mongodbClient[config.mongodbDatabaseName]
-    collection = database["order"]
-    query = {"platform": platform}
-    document = collection.find_one(query)
-
-    if document is None:
-        logger.info(f"Could not find document for platform: {platform}")
-        raise DocumentNotFound(platform, "order")
-
-    if "lightsCode" in document:
-        try:
-            response = requests.get(
-                config.lightsUrl + f"/{document['lightsCode']}")
-            jsonResponse = response.json()
-            return jsonResponse
-        except Exception as e:
-            raise e
-    else:
-        return {}
+    return lights_for_platform(platform)
@@ -1,35 +1,36 @@
 import connexion
+import io
 import six
 
-from swagger_server.models.current_lifter import CurrentLifter  # noqa: E501
+from swagger_server.models.registrations_import_report import RegistrationsImportReport  # noqa: E501
 from swagger_server import util
 from swagger_server.config import Config, logger
-import json
+from swagger_server import logs, storage
+from swagger_server.registrations_import import import_registrations, iter_json_array, iter_json_lines
 
 config = Config()
 
 
 def registrations_put(body=None):  # noqa: E501
-    """Returns the current lifter
+    """Imports registrations
 
-    Returns the current lifter  # noqa: E501
+    Upserts registrations by id from a JSON array or newline-delimited JSON  # noqa: E501
 
     :param body:
     :type body: dict | bytes
 
-    :rtype: CurrentLifter
+    :rtype: RegistrationsImportReport
     """
-    database = config.mongodbClient[config.mongodbDatabaseName]
+    database = storage.database()
     collection = database["registrations"]
-    if connexion.request.is_json:
-        logger.debug(json.dumps(connexion.request.get_json()))
-        registrations = connexion.request.get_json()
-        logger.info(f"{len(registrations)} registrations")
-        i = 1
-        for registration in registrations:
-            logger.debug(
-                f"Importing registration for id: {registration['id']} - {i} out of {len(registrations)}")
-            collection.update_one(
-                {'id': registration['id']}, {'$set': registration}, upsert=True)
-            i = i + 1
-    return 'do some magic!'
+    request = connexion.request
+    payload = request.get_data()
+    if request.mimetype == "application/x-ndjson":
+        records = iter_json_lines(io.BytesIO(payload))
+    elif request.is_json:
+        records = iter_json_array(io.BytesIO(payload))
+    else:
+        return {'status': 'fail', 'message': 'No JSON object detected'}
+    logger.debug("Registrations payload: %s", logs.body(payload))
+    logger.info(f"Importing registrations in batches of {config.registrationsBatchSize}")
+    return import_registrations(collection, records, config.registrationsBatchSize)
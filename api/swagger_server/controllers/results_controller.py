@@ -5,12 +5,42 @@ import time
 from swagger_server.models.any_value import AnyValue  # noqa: E501
 from swagger_server import util
 from swagger_server.config import Config, logger
-from swagger_server.controllers.helpers import leaderboard_results
+from swagger_server.division_place import DivisionPlacings
+from swagger_server.leaderboard import LeaderboardEngine
+from swagger_server.order_store import stored_orders
+from swagger_server.websocket_hub import hub
+from swagger_server.conditional import headers, not_modified, versions
+from swagger_server.payload_digest import digest
 
 
 config = Config()
 
 
+leaderboardEngine = LeaderboardEngine(stored_orders)
+divisionPlacings = DivisionPlacings(stored_orders)
+
+
+def leaderboard(entries_filter):
+    logger.info(
+        f"Generating leaderboard results based on filter: {entries_filter}")
+    return leaderboardEngine.results(entries_filter)
+
+
+def publish_leaderboards():
+    """Pushes fresh leaderboards to WebSocket subscribers, if there are any"""
+    for entries_filter in ("class", "points"):
+        topic = f"leaderboard/{entries_filter}"
+        if hub.has_subscribers(topic):
+            hub.publish(topic, leaderboard(entries_filter))
+
+
+def load_leaderboard_topic(topic):
+    return leaderboard(topic.split("/")[1])
+
+
+hub.set_loader("leaderboard", load_leaderboard_topic)
+
+
 def lifter_results_get(entries_filter):  # noqa: E501
     """Updates the lifter results
 
@@ -21,16 +51,28 @@ def lifter_results_get(entries_filter):  # noqa: E501
 
     :rtype: AnyValue
     """
-    database = config.mongodbClient[config.mongodbDatabaseName]
-    collection = database["order"]
-    documents = collection.find({})
-    data = {
-        'meetData': None,
-        'entries': []
-    }
-    for document in documents:
-        data['meetData'] = document['meetData']
-        data['entries'].extend(document['order']['orderedEntries'])
-    logger.info(
-        f"Generating leaderboard results based on filter: {entries_filter}")
-    return leaderboard_results(data, entries_filter)
+    tag = versions.tag("results") + f"-{entries_filter}"
+    notModified = not_modified(tag)
+    if notModified is not None:
+        return notModified
+    return leaderboard(entries_filter), 200, headers(tag)
+
+
+def lifter_results_divisions_get(division=None):  # noqa: E501
+    """Gets the division standings
+
+    Standings of every division category across all platforms  # noqa: E501
+
+    :param division: Only return categories for this division
+    :type division: str
+
+    :rtype: AnyValue
+    """
+    tag = versions.tag("results") + "-divisions"
+    if division is not None:
+        tag += f"-{digest(division.encode())}"
+    notModified = not_modified(tag)
+    if notModified is not None:
+        return notModified
+    logger.info(f"Generating division standings for division: {division}")
+    return divisionPlacings.standings(division), 200, headers(tag)
@@ -0,0 +1,90 @@
+"""WebSocket hub for overlays, served next to the connexion API at <base path>/ws
+
+Clients authenticate with the api_key query parameter (or the x-api-key
+header) and send JSON messages to pick their topics:
+
+    {"subscribe": ["platform/1/current", "leaderboard/points"]}
+    {"unsubscribe": ["leaderboard/points"]}
+
+Every update arrives as {"topic": ..., "data": ...}. Available topics are
+platform/<n>/current, platform/<n>/next, leaderboard/<class|points> and
+lights/<n>.
+"""
+
+import hmac
+import json
+import re
+import threading
+
+import flask
+from swagger_server.config import Config, logger
+from swagger_server.websocket_hub import Subscriber, hub
+from swagger_server import metrics
+
+config = Config()
+topicPattern = re.compile(
+    r"^(platform/\d+/(current|next)|leaderboard/(class|points)|lights/\d+)$")
+
+
+def serve(ws):
+    apiKey = flask.request.args.get('api_key') or flask.request.headers.get('x-api-key')
+    # Unlike the HTTP routes, nothing has checked a key was supplied yet
+    if not config.apiKey or not apiKey or \
+            not hmac.compare_digest(apiKey.encode(), config.apiKey.encode()):
+        logger.info("Rejecting WebSocket connection with an invalid API key")
+        ws.close(reason=1008, message="Invalid API key")
+        return
+    metrics.websocketConnections.inc()
+    subscriber = Subscriber()
+    sender = threading.Thread(
+        target=send_messages, args=(ws, subscriber), name="websocket-sender", daemon=True)
+    sender.start()
+    try:
+        while True:
+            handle_message(subscriber, ws.receive())
+    except Exception as e:
+        logger.debug(f"WebSocket connection closed: {e}")
+    finally:
+        hub.disconnect(subscriber)
+
+
+def handle_message(subscriber, message):
+    try:
+        request = json.loads(message)
+    except (TypeError, ValueError):
+        logger.info(f"Ignoring malformed WebSocket message: {message}")
+        return
+    if not isinstance(request, dict) or not all(
+            isinstance(request.get(key, []), list) for key in ('subscribe', 'unsubscribe')):
+        logger.info(f"Ignoring malformed WebSocket message: {message}")
+        return
+    for topic in request.get('subscribe', []):
+        if isinstance(topic, str) and topicPattern.match(topic):
+            hub.subscribe(subscriber, topic)
+        else:
+            logger.info(f"Ignoring subscription to unknown topic: {topic}")
+    for topic in request.get('unsubscribe', []):
+        if isinstance(topic, str):
+            hub.unsubscribe(subscriber, topic)
+
+
+def send_messages(ws, subscriber):
+    try:
+        while not subscriber.closed:
+            for message in subscriber.take(30):
+                ws.send(message)
+    except Exception as e:
+        logger.debug(f"Stopped sending to WebSocket connection: {e}")
+        hub.disconnect(subscriber)
+
+
+def register(app, base_path):
+    """Adds the WebSocket hub route to app if flask-sock is installed"""
+    try:
+        from flask_sock import Sock
+    except ImportError:
+        logger.warning("flask-sock is not installed, the WebSocket hub is disabled")
+        return
+    app.config.setdefault('SOCK_SERVER_OPTIONS', {'ping_interval': 25})
+    Sock(app).route(base_path + "/ws")(serve)
+    logger.info(f"WebSocket hub listening on {base_path}/ws")
@@ -0,0 +1,445 @@
+import json
+import math
+import threading
+from functools import cmp_to_key
+
+from swagger_server.config import logger
+
+# Ported from src/logic/divisionPlace.ts, keeping its tie-breakers so the
+# API and the lifting table agree on who is placed where.
+
+eventSortOrder = ["SBD", "BD", "SB", "SD", "S", "B", "D"]
+equipmentSortOrder = ["Bare", "Sleeves", "Wraps", "Single-ply", "Multi-ply", "Unlimited"]
+sexSortOrder = {"F": 0, "M": 1, "Mx": 2}
+lifts = {
+    "S": ("squatKg", "squatStatus"),
+    "B": ("benchKg", "benchStatus"),
+    "D": ("deadliftKg", "deadliftStatus"),
+}
+
+# Entry fields that placing depends on. Anything else (points, place,
+# notes, ...) can change without a category having to be re-sorted.
+placingFields = ('sex', 'bodyweightKg', 'equipment', 'divisions', 'events', 'guest', 'name', 'lot',
+                 'squatKg', 'squatStatus', 'benchKg', 'benchStatus', 'deadliftKg', 'deadliftStatus')
+
+
+def display_weight(weight):
+    """Port of displayWeight in src/logic/units.ts for the "en" locale"""
+    rounded = math.floor(weight * 100 + 0.5)
+    if rounded % 10 == 9:
+        rounded += 1
+    return f"{rounded / 100:.2f}".rstrip("0").rstrip(".")
+
+
+def weight_class_str(classes, bodyweight_kg):
+    """Port of getWeightClassStr in src/reducers/meetReducer.ts"""
+    if bodyweight_kg == 0 or len(classes) == 0:
+        return ""
+    for weightClass in classes:
+        if bodyweight_kg <= weightClass:
+            return display_weight(weightClass)
+    return display_weight(classes[-1]) + "+"
+
+
+def best3(entry, lift, projected):
+    """Best of the first three attempts, counting untaken first attempts if projected"""
+    fieldKg, fieldStatus = lifts[lift]
+    weights = entry[fieldKg]
+    statuses = entry[fieldStatus]
+    best = 0.0
+    if statuses[0] > 0 or (projected and statuses[0] == 0):
+        best = max(best, weights[0])
+    if statuses[1] > 0:
+        best = max(best, weights[1])
+    if statuses[2] > 0:
+        best = max(best, weights[2])
+    return best
+
+
+def event_total_kg(entry, event, projected):
+    """Port of getProjectedEventTotalKg and getFinalEventTotalKg in src/logic/entry.ts"""
+    total = 0.0
+    for lift in "SBD":
+        if projected:
+            # A missed first attempt on any lift zeroes the projected total,
+            # even for lifts outside the event
+            best = best3(entry, lift, True) if lift in event else 0.0
+            if best == 0 and entry[lifts[lift][1]][0] == -1:
+                return 0.0
+        elif lift in event:
+            best = best3(entry, lift, False)
+            if best == 0:
+                return 0.0
+        else:
+            continue
+        total += best
+    return total
+
+
+def final_total_kg(entry):
+    """Port of getFinalTotalKg in src/logic/entry.ts"""
+    total = 0.0
+    for lift in "SBD":
+        best = best3(entry, lift, False)
+        if best == 0 and entry[lifts[lift][1]][0] == -1:
+            return 0.0
+        total += best
+    return total
+
+
+def last_successful_lift(event, entry):
+    for lift in reversed(event):
+        if lift not in lifts:
+            return "S"
+        if 1 in entry[lifts[lift][1]]:
+            return lift
+    return "S"
+
+
+def last_successful_attempt(lift, entry):
+    statuses = entry[lifts[lift][1]]
+    for index in (2, 1, 0):
+        if statuses[index] == 1:
+            return index
+    return 0
+
+
+def attempt_kg(entry, field_kg, attempt_one_indexed):
+    # Out of range reads are undefined in TypeScript, which compare equal
+    index = attempt_one_indexed - 1
+    weights = entry[field_kg]
+    if index < 0 or index >= len(weights):
+        return None
+    return weights[index]
+
+
+def compare_by_attempt(a, b, field_kg, attempt_one_indexed):
+    """Port of compareEntriesByAttempt in src/logic/liftingOrder.ts"""
+    aKg = attempt_kg(a, field_kg, attempt_one_indexed)
+    bKg = attempt_kg(b, field_kg, attempt_one_indexed)
+    if aKg != bKg:
+        if aKg is None or bKg is None:
+            return 0
+        return aKg - bKg
+    if a.get('lot', 0) != 0 and b.get('lot', 0) != 0:
+        return a['lot'] - b['lot']
+    if attempt_one_indexed > 1:
+        return compare_by_attempt(a, b, field_kg, attempt_one_indexed - 1)
+    if a['bodyweightKg'] != b['bodyweightKg']:
+        return a['bodyweightKg'] - b['bodyweightKg']
+    return compare_names(a, b)
+
+
+def compare_names(a, b):
+    if a.get('name', "") < b.get('name', ""):
+        return -1
+    if a.get('name', "") > b.get('name', ""):
+        return 1
+    return 0
+
+
+def compare_in_category(a, b, event, a_projected, b_projected):
+    """Port of the sortByPlaceInCategory comparator, first place sorting first
+
+    Each entry's total is projected or final as its own platform's order is.
+    """
+    if bool(a.get('guest')) != bool(b.get('guest')):
+        return int(bool(a.get('guest'))) - int(bool(b.get('guest')))
+    aTotal = event_total_kg(a, event, a_projected)
+    bTotal = event_total_kg(b, event, b_projected)
+    if aTotal != bTotal:
+        return bTotal - aTotal
+    if a['bodyweightKg'] != b['bodyweightKg']:
+        return a['bodyweightKg'] - b['bodyweightKg']
+    if aTotal == 0:
+        return compare_names(a, b)
+    aLift = last_successful_lift(event, a)
+    bLift = last_successful_lift(event, b)
+    if aLift != bLift:
+        return "SBD".index(aLift) - "SBD".index(bLift)
+    aAttempt = last_successful_attempt(aLift, a)
+    bAttempt = last_successful_attempt(aLift, b)
+    if aAttempt != bAttempt:
+        return aAttempt - bAttempt
+    # divisionPlace.ts passes the zero-indexed attempt here, kept as is
+    return compare_by_attempt(a, b, lifts[aLift][0], aAttempt)
+
+
+def index_of(values, value):
+    return values.index(value) if value in values else -1
+
+
+def leading_int(value):
+    """parseInt() for weight class strings, 0 for ""."""
+    digits = ""
+    for character in value:
+        if not character.isdigit():
+            break
+        digits += character
+    return int(digits) if digits != "" else 0
+
+
+def category_sort_key(category):
+    """Presentation order of categories, as sortCategoryResults"""
+    weightClassStr = category['weightClassStr']
+    return (sexSortOrder.get(category['sex'], 3),
+            index_of(eventSortOrder, category['event']),
+            index_of(equipmentSortOrder, category['equipment']),
+            category['division'],
+            "+" in weightClassStr,
+            leading_int(weightClassStr))
+
+
+def entry_categories(entry, meet_data):
+    """Categories an entry is ranked in, one per division and event"""
+    classes = {
+        'M': meet_data.get('weightClassesKgMen', []),
+        'F': meet_data.get('weightClassesKgWomen', []),
+        'Mx': meet_data.get('weightClassesKgMx', []),
+    }.get(entry.get('sex'), meet_data.get('weightClassesKgMen', []))
+    weightClassStr = weight_class_str(classes, entry.get('bodyweightKg') or 0)
+    equipment = entry.get('equipment')
+    if meet_data.get('combineSleevesAndWraps') and equipment == "Sleeves":
+        equipment = "Wraps"
+    elif meet_data.get('combineSingleAndMulti') and equipment == "Single-ply":
+        equipment = "Multi-ply"
+    # Entries without divisions are still ranked, under division ""
+    divisions = entry.get('divisions') or [""]
+    return [{
+        'sex': entry.get('sex'),
+        'event': event,
+        'equipment': equipment,
+        'division': division,
+        'weightClassStr': weightClassStr
+    } for division in divisions for event in entry.get('events') or []]
+
+
+def category_key(category):
+    return json.dumps(category, sort_keys=True)
+
+
+def uses_projected(order):
+    """Projected totals are used for everything before 2nd attempt deadlifts"""
+    platformDetails = order.get('platformDetails') or {}
+    return platformDetails.get('lift') != "D" or (order.get('attemptOneIndexed') or 1) < 2
+
+
+class DivisionPlacings:
+    """Division placings across every platform, re-sorted per category
+
+    Entries are grouped by (sex, event, equipment, division, weight class)
+    like the lifting table does. An order update only re-sorts the
+    categories its changed entries left or joined; everything else keeps
+    its cached order. Every platform's entries use projected or final
+    totals as that platform's order is, so a platform switching only
+    re-sorts the categories its own entries are in. Changing the weight
+    classes or equipment combining re-sorts everything.
+
+    place() sets 'place' on an order about to be written without changing
+    the placings, commit() applies it once it is stored.
+    """
+
+    def __init__(self, collection):
+        self._collection = collection
+        self._loaded = False
+        self._settings = None
+        self._meetData = None
+        self._platforms = {}
+        self._documents = {}
+        self._projected = {}
+        self._versions = {}
+        self._signatures = {}
+        self._categoriesOf = {}
+        self._categories = {}
+        self._members = {}
+        self._standings = {}
+        self._positions = {}
+        self._sortedKeys = None
+        self._lock = threading.RLock()
+
+    def place(self, platform, document):
+        """Sets 'place' on the entries of an order document about to be written
+
+        The document is placed against every platform's stored order, then
+        the placings are put back as they were until commit() is called.
+
+        :param platform: Platform number
+        :type platform: int
+        :param document: Order document with meetData and order
+        :type document: dict
+
+        :rtype: int
+        :returns: Number of categories re-sorted
+        """
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            meetData = self._meetData
+            previous = self._documents.get(platform)
+            resorted = self._apply(platform, document)
+            for entry in document['order']['orderedEntries']:
+                entry['place'] = self._entry_place((platform, entry['id']), entry)
+            if previous is None:
+                self._apply(platform, {'meetData': meetData, 'order': {'orderedEntries': []}})
+                self._platforms.pop(platform, None)
+                self._documents.pop(platform, None)
+                self._projected.pop(platform, None)
+            else:
+                self._apply(platform, dict(previous, meetData=meetData))
+                self._documents[platform] = previous
+            return resorted
+
+    def commit(self, platform, document):
+        """Applies a stored order document, unless a newer version of it already was
+
+        :rtype: int
+        :returns: Number of categories re-sorted
+        """
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            version = document.get('version')
+            applied = self._versions.get(platform)
+            if version is not None and applied is not None and version < applied:
+                return 0
+            self._versions[platform] = version
+            return self._apply(platform, document)
+
+    def standings(self, division=None):
+        """Returns the placings of every category, in presentation order
+
+        :param division: Only return categories for this division
+        :type division: str
+
+        :rtype: list
+        """
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            results = []
+            for key in self._sorted_keys():
+                category = self._categories[key]
+                if division is not None and category['division'] != division:
+                    continue
+                standings = []
+                for index, memberKey in enumerate(self._standings[key]):
+                    entry = self._platforms[memberKey[0]][memberKey[1]]
+                    if entry.get('guest'):
+                        place = "GUEST"
+                    elif event_total_kg(entry, category['event'], self._projected[memberKey[0]]) == 0:
+                        place = "-"
+                    else:
+                        place = index + 1
+                    standings.append({'place': place, 'platform': memberKey[0], 'entry': entry})
+                results.append({'category': category, 'standings': standings})
+            return results
+
+    def _load(self):
+        logger.info("Loading division placings from all stored orders")
+        for document in self._collection().find({}):
+            self._versions[document['platform']] = document.get('version')
+            self._apply(document['platform'], document)
+        self._loaded = True
+
+    def _apply(self, platform, document):
+        meetData = document.get('meetData') or {}
+        settings = (tuple(meetData.get('weightClassesKgMen', [])),
+                    tuple(meetData.get('weightClassesKgWomen', [])),
+                    tuple(meetData.get('weightClassesKgMx', [])),
+                    bool(meetData.get('combineSleevesAndWraps')),
+                    bool(meetData.get('combineSingleAndMulti')))
+        rebuild = settings != self._settings
+        self._settings = settings
+        self._meetData = meetData
+        projected = uses_projected(document['order'])
+        reprojected = projected != self._projected.get(platform)
+        self._projected[platform] = projected
+
+        previous = self._platforms.get(platform, {})
+        current = {entry['id']: entry for entry in document['order']['orderedEntries']}
+        self._platforms[platform] = current
+        self._documents[platform] = {'meetData': meetData, 'order': document['order']}
+        dirty = set()
+        for entryId in previous:
+            if entryId not in current:
+                self._signatures.pop((platform, entryId), None)
+                dirty.update(self._leave((platform, entryId)))
+        if rebuild:
+            self._signatures = {}
+        for otherPlatform, entries in self._platforms.items():
+            if otherPlatform != platform and not rebuild:
+                continue
+            for entryId, entry in entries.items():
+                key = (otherPlatform, entryId)
+                signature = tuple(json.dumps(entry.get(field), sort_keys=True) for field in placingFields)
+                if signature == self._signatures.get(key):
+                    if reprojected and otherPlatform == platform:
+                        dirty.update(self._categoriesOf.get(key, []))
+                    continue
+                self._signatures[key] = signature
+                dirty.update(self._leave(key))
+                dirty.update(self._join(key, entry, meetData))
+        for key in dirty:
+            self._resort(key)
+        if len(dirty) > 0:
+            logger.debug(f"Re-sorted {len(dirty)} division categories for platform: {platform}")
+        return len(dirty)
+
+    def _leave(self, key):
+        left = self._categoriesOf.pop(key, [])
+        for categoryKey in left:
+            self._members[categoryKey].discard(key)
+        return left
+
+    def _join(self, key, entry, meet_data):
+        joined = []
+        for category in entry_categories(entry, meet_data):
+            categoryKey = category_key(category)
+            if categoryKey not in self._categories:
+                self._categories[categoryKey] = category
+                self._members[categoryKey] = set()
+                self._sortedKeys = None
+            self._members[categoryKey].add(key)
+            joined.append(categoryKey)
+        self._categoriesOf[key] = joined
+        return joined
+
+    def _resort(self, category_key):
+        members = self._members.get(category_key)
+        if not members:
+            self._categories.pop(category_key, None)
+            self._members.pop(category_key, None)
+            self._standings.pop(category_key, None)
+            self._positions.pop(category_key, None)
+            self._sortedKeys = None
+            return
+        category = self._categories[category_key]
+        entries = {key: self._platforms[key[0]][key[1]] for key in members}
+        ordered = sorted(sorted(members), key=cmp_to_key(
+            lambda a, b: compare_in_category(entries[a], entries[b], category['event'],
+                                             self._projected[a[0]], self._projected[b[0]])))
+        self._standings[category_key] = ordered
+        self._positions[category_key] = {key: index for index, key in enumerate(ordered)}
+
+    def _sorted_keys(self):
+        if self._sortedKeys is None:
+            self._sortedKeys = sorted(
+                self._categories, key=lambda key: category_sort_key(self._categories[key]))
+        return self._sortedKeys
+
+    def _entry_place(self, key, entry):
+        """The place the lifting table shows: first division, first matching category"""
+        if final_total_kg(entry) == 0:
+            return "-"
+        if entry.get('guest'):
+            return "GUEST"
+        divisions = entry.get('divisions') or []
+        if len(divisions) == 0:
+            return "-"
+        for categoryKey in self._sorted_keys():
+            if self._categories[categoryKey]['division'] != divisions[0]:
+                continue
+            position = self._positions[categoryKey].get(key)
+            if position is not None:
+                return position + 1
+        return "-"
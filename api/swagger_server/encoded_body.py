@@ -0,0 +1,101 @@
+import gzip
+import threading
+import zlib
+from collections import OrderedDict
+
+import flask
+from swagger_server import metrics
+from swagger_server.conditional import headers, not_modified
+
+chunkSize = 64 * 1024
+
+
+def compress(payload):
+    """Gzips an encoded JSON body
+
+    :param payload: Encoded JSON body
+    :type payload: bytes
+
+    :rtype: bytes
+    """
+    return gzip.compress(payload, compresslevel=6)
+
+
+def _gzipped_chunks(gzipped):
+    view = memoryview(gzipped)
+    for offset in range(0, len(view), chunkSize):
+        yield bytes(view[offset:offset + chunkSize])
+
+
+def _plain_chunks(gzipped):
+    decompressor = zlib.decompressobj(wbits=31)
+    for chunk in _gzipped_chunks(gzipped):
+        yield decompressor.decompress(chunk)
+    yield decompressor.flush()
+
+
+def accepts_gzip():
+    return bool(flask.request.accept_encodings['gzip'])
+
+
+def tag(payload_digest):
+    """Returns the ETag of the representation served for payload_digest
+
+    The gzipped and the plain body are different representations, so the
+    gzipped one is tagged with a -gz suffix.
+
+    :rtype: str
+    """
+    if payload_digest is None or not accepts_gzip():
+        return payload_digest
+    return f"{payload_digest}-gz"
+
+
+def response(payload_digest, gzipped):
+    """Builds a streamed response for a pre-encoded, gzipped JSON body
+
+    Answers If-None-Match with 304 and only decompresses, chunk by chunk,
+    for clients that don't accept gzip.
+
+    :param payload_digest: Digest of the uncompressed body
+    :type payload_digest: str
+    :param gzipped: Gzipped JSON body
+    :type gzipped: bytes
+
+    :rtype: flask.Response
+    """
+    representationTag = tag(payload_digest)
+    notModified = not_modified(representationTag)
+    if notModified is not None:
+        return notModified
+    responseHeaders = headers(representationTag)
+    if accepts_gzip():
+        responseHeaders['Content-Encoding'] = "gzip"
+        responseHeaders['Content-Length'] = str(len(gzipped))
+        return flask.Response(_gzipped_chunks(gzipped), mimetype="application/json", headers=responseHeaders)
+    return flask.Response(_plain_chunks(gzipped), mimetype="application/json", headers=responseHeaders)
+
+
+class EncodedBodyCache:
+    """Keeps the gzipped body of the most recently used keys in memory"""
+
+    def __init__(self, max_size):
+        self._maxSize = max_size
+        self._bodies = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Returns (digest, gzipped) for key, if cached"""
+        with self._lock:
+            body = self._bodies.get(key)
+            if body is not None:
+                self._bodies.move_to_end(key)
+        metrics.cacheLookups.inc(cache="backup", result="miss" if body is None else "hit")
+        return body
+
+    def put(self, key, payload_digest, gzipped):
+        with self._lock:
+            self._bodies[key] = (payload_digest, gzipped)
+            self._bodies.move_to_end(key)
+            while len(self._bodies) > self._maxSize:
+                self._bodies.popitem(last=False)
@@ -1,12 +1,21 @@
 from connexion.apps.flask_app import FlaskJSONEncoder
 import six
+import time
 from bson import ObjectId
 from swagger_server.models.base_model_ import Model
+from swagger_server.request_metrics import add_serialize_time
 
 
 class JSONEncoder(FlaskJSONEncoder):
     include_nulls = False
 
+    def encode(self, o):
+        started = time.perf_counter()
+        try:
+            return super().encode(o)
+        finally:
+            add_serialize_time(time.perf_counter() - started)
+
     def default(self, o):
         if isinstance(o, ObjectId):
             return str(o)
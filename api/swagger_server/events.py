@@ -0,0 +1,107 @@
+import itertools
+import threading
+import uuid
+from collections import deque
+
+# Event ids are prefixed with a per-process id so a Last-Event-ID from
+# before a restart is never mistaken for one of ours.
+processId = uuid.uuid4().hex[:8]
+
+
+class EventChannel:
+    """Broadcasts events for one topic to any number of waiting readers
+
+    Keeps the last few events so a reader that reconnects with a
+    Last-Event-ID can be replayed what it missed.
+    """
+
+    def __init__(self, history_size):
+        self._events = deque(maxlen=history_size)
+        self._sequence = itertools.count(1)
+        self._condition = threading.Condition()
+        self._lastData = None
+
+    def publish(self, event, data):
+        """Publishes data unless it is the same as the last published data
+
+        :rtype: bool
+        """
+        with self._condition:
+            if data == self._lastData:
+                return False
+            self._lastData = data
+            self._events.append(
+                (f"{processId}-{next(self._sequence)}", event, data))
+            self._condition.notify_all()
+            return True
+
+    def latest(self):
+        with self._condition:
+            return self._events[-1] if len(self._events) > 0 else None
+
+    def since(self, last_event_id):
+        """Returns the events after last_event_id
+
+        Unknown or expired ids get only the latest event, which carries the
+        full state anyway.
+
+        :rtype: list
+        """
+        with self._condition:
+            return self._since(last_event_id)
+
+    def wait(self, last_event_id, timeout):
+        """Blocks until there are events after last_event_id or timeout expires
+
+        :rtype: list
+        """
+        with self._condition:
+            events = self._since(last_event_id)
+            if len(events) == 0:
+                self._condition.wait(timeout)
+                events = self._since(last_event_id)
+            return events
+
+    def _since(self, last_event_id):
+        if len(self._events) == 0:
+            return []
+        if last_event_id is not None:
+            for index, (eventId, _, _) in enumerate(self._events):
+                if eventId == last_event_id:
+                    return list(self._events)[index + 1:]
+        return [self._events[-1]]
+
+
+class EventHub:
+    """EventChannels by topic, created on first use"""
+
+    def __init__(self, history_size):
+        self._historySize = history_size
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def channel(self, topic):
+        with self._lock:
+            channel = self._channels.get(topic)
+            if channel is None:
+                channel = EventChannel(self._historySize)
+                self._channels[topic] = channel
+            return channel
+
+
+def event_stream(channel, last_event_id, keepalive):
+    """Yields a text/event-stream body for channel
+
+    Starts with the events after last_event_id (or the latest event) and
+    sends a comment line every keepalive seconds without events so proxies
+    keep the connection open.
+    """
+    yield "retry: 2000\n\n"
+    events = channel.since(last_event_id)
+    while True:
+        for eventId, event, data in events:
+            last_event_id = eventId
+            yield f"id: {eventId}\nevent: {event}\ndata: {data}\n\n"
+        events = channel.wait(last_event_id, keepalive)
+        if len(events) == 0:
+            yield ": keep-alive\n\n"
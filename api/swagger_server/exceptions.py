@@ -3,7 +3,28 @@ class NotFoundException(RuntimeError):
     """Not found."""
 
 
+class ConflictException(RuntimeError):
+    """Conflict with the stored state."""
+
+
+class UpstreamException(RuntimeError):
+    """An upstream service could not be reached."""
+
+
 class DocumentNotFound(NotFoundException):
     def __init__(self, filter, collection):
         super().__init__(
             f"Failed to find document with filter: {filter} in collection: {collection}")
+
+
+class OrderVersionConflict(ConflictException):
+    def __init__(self, platform, base_version, current_version):
+        self.version = current_version
+        super().__init__(
+            f"Order delta for platform: {platform} is based on version: {base_version} but the stored version is: {current_version}, a full resync is required")
+
+
+class LightsUnavailable(UpstreamException):
+    def __init__(self, code, error):
+        super().__init__(
+            f"Failed to fetch lights for code: {code} from the lights service: {error}")
@@ -0,0 +1,225 @@
+import bisect
+import heapq
+import threading
+import time
+
+from swagger_server import metrics
+from swagger_server.config import Config, logger
+from swagger_server.controllers.helpers import load_numpy, meet_boundaries, place_bodyweights
+from swagger_server.exceptions import DocumentNotFound
+
+config = Config()
+sexes = (
+    ('M', 'male', 'weightClassesKgMen'),
+    ('F', 'female', 'weightClassesKgWomen'),
+    ('Mx', 'mx', 'weightClassesKgMx'),
+)
+
+
+def _points(entry):
+    return entry.get('points') or 0
+
+
+class LeaderboardEngine:
+    """Incrementally maintained leaderboard across every platform
+
+    Entries are bucketed by sex and weight class, each bucket being a list
+    kept sorted by (-points, platform, entry id) with bisect. An order
+    update only re-buckets the entries whose sex, body weight or points
+    changed; the class and points views are rebuilt lazily on the next
+    read and cached until something changes. With LEADERBOARD_NUMPY, a
+    full rebuild of a large meet places and sorts every entry with NumPy
+    instead of inserting them one at a time.
+
+    Produces the same views as helpers.leaderboard_results, except that
+    entries on equal points are ordered by platform and entry id instead
+    of by their position in the lifting order.
+    """
+
+    def __init__(self, collection):
+        self._collection = collection
+        self._loaded = False
+        self._meetData = None
+        self._classes = None
+        self._boundaries = None
+        self._platforms = {}
+        self._placement = {}
+        self._entries = {}
+        self._buckets = {}
+        self._views = {}
+        self._lock = threading.RLock()
+
+    def update(self, platform, document):
+        """Applies a written order document for platform"""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            started = time.perf_counter()
+            self._apply(platform, document)
+            metrics.leaderboardRebuildLatency.observe(
+                time.perf_counter() - started, stage="update")
+
+    def results(self, entries_filter):
+        """Returns the leaderboard for entries_filter ("class" or "points")
+
+        :rtype: dict
+        """
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            if self._meetData is None:
+                raise DocumentNotFound({}, "order")
+            view = self._views.get(entries_filter)
+            if view is not None:
+                metrics.cacheLookups.inc(cache="leaderboard", result="hit")
+                return view
+            metrics.cacheLookups.inc(cache="leaderboard", result="miss")
+            started = time.perf_counter()
+            view = self._build_view(entries_filter)
+            metrics.leaderboardRebuildLatency.observe(
+                time.perf_counter() - started, stage="view")
+            self._views[entries_filter] = view
+            return view
+
+    def _load(self):
+        logger.info("Loading leaderboard from all stored orders")
+        started = time.perf_counter()
+        for document in self._collection().find({}):
+            self._apply(document['platform'], document)
+        self._loaded = True
+        metrics.leaderboardRebuildLatency.observe(time.perf_counter() - started, stage="load")
+
+    def _apply(self, platform, document):
+        meetData = document['meetData']
+        classes = (meetData['inKg'],) + tuple(
+            tuple(meetData[key]) for _, _, key in sexes)
+        if classes != self._classes:
+            self._meetData = meetData
+            self._classes = classes
+            self._boundaries = meet_boundaries(meetData)
+            self._platforms[platform] = {
+                entry['id']: entry for entry in document['order']['orderedEntries']}
+            self._rebuild()
+            return
+        self._meetData = meetData
+
+        previous = self._platforms.get(platform, {})
+        current = {entry['id']: entry for entry in document['order']['orderedEntries']}
+        self._platforms[platform] = current
+        changed = 0
+        for entryId in previous:
+            if entryId not in current:
+                self._remove((platform, entryId))
+                changed += 1
+        for entryId, entry in current.items():
+            key = (platform, entryId)
+            placement = self._place(key, entry)
+            if placement != self._placement.get(key):
+                self._remove(key)
+                self._insert(key, entry, placement)
+                changed += 1
+            else:
+                self._entries[key] = entry
+        self._views = {}
+        logger.debug(
+            f"Re-bucketed {changed} of {len(current)} entries for platform: {platform}")
+
+    def _rebuild(self):
+        self._placement = {}
+        self._entries = {}
+        self._buckets = {}
+        self._views = {}
+        count = sum(len(entries) for entries in self._platforms.values())
+        if config.leaderboardNumpy and count >= config.leaderboardNumpyMinEntries:
+            numpy = load_numpy()
+            if numpy is not None:
+                self._rebuild_numpy(numpy)
+                return
+        for platform, entries in self._platforms.items():
+            for entryId, entry in entries.items():
+                key = (platform, entryId)
+                self._insert(key, entry, self._place(key, entry))
+
+    def _rebuild_numpy(self, numpy):
+        """Fills the buckets with one searchsorted and one lexsort per sex
+
+        lexsort orders by class, -points, platform and entry id, so the
+        buckets come out in the order _insert keeps them in.
+        """
+        ranked = {}
+        for platform, entries in self._platforms.items():
+            for entryId, entry in entries.items():
+                key = (platform, entryId)
+                self._entries[key] = entry
+                self._placement[key] = None
+                if self._boundaries.get(entry.get('sex')) is not None:
+                    ranked.setdefault(entry['sex'], []).append(key)
+        for sex, keys in ranked.items():
+            entries = [self._entries[key] for key in keys]
+            classIndexes = place_bodyweights(
+                self._boundaries[sex], [entry['bodyweightKg'] for entry in entries])
+            points = [-_points(entry) for entry in entries]
+            order = numpy.lexsort((numpy.array([entryId for _, entryId in keys]),
+                                   numpy.array([platform for platform, _ in keys]),
+                                   numpy.array(points, dtype=float), classIndexes))
+            for index in order.tolist():
+                key = keys[index]
+                placement = (sex, classIndexes[index], (points[index],) + key)
+                self._placement[key] = placement
+                self._buckets.setdefault(placement[:2], []).append(placement[2])
+
+    def _place(self, key, entry):
+        """Returns (sex, class index, sort key) for entry, or None if it isn't ranked"""
+        boundaries = self._boundaries.get(entry.get('sex'))
+        if boundaries is None:
+            return None
+        classIndex = boundaries.index(entry['bodyweightKg'])
+        return (entry['sex'], classIndex, (-_points(entry),) + key)
+
+    def _insert(self, key, entry, placement):
+        self._entries[key] = entry
+        self._placement[key] = placement
+        if placement is None:
+            return
+        sex, classIndex, sortKey = placement
+        bisect.insort(self._buckets.setdefault((sex, classIndex), []), sortKey)
+
+    def _remove(self, key):
+        self._entries.pop(key, None)
+        placement = self._placement.pop(key, None)
+        if placement is None:
+            return
+        sex, classIndex, sortKey = placement
+        bucket = self._buckets[(sex, classIndex)]
+        del bucket[bisect.bisect_left(bucket, sortKey)]
+
+    def _build_view(self, entries_filter):
+        view = {}
+        for sex, name, _ in sexes:
+            boundaries = self._boundaries[sex]
+            if boundaries is None:
+                view[name] = None
+                continue
+            labels = boundaries.labels
+            buckets = [(classIndex, self._buckets.get((sex, classIndex), []))
+                       for classIndex in range(len(labels))]
+            if entries_filter == "class":
+                groups = []
+                for classIndex, bucket in buckets:
+                    if len(bucket) == 0:
+                        continue
+                    group = {'weightClass': labels[classIndex]}
+                    if classIndex == len(boundaries.weightClasses):
+                        group['outsideMax'] = True
+                    group['entries'] = [self._entries[sortKey[1:]] for sortKey in bucket]
+                    groups.append(group)
+                view[name] = groups
+            elif entries_filter == "points":
+                merged = heapq.merge(*[[(sortKey, classIndex) for sortKey in bucket]
+                                       for classIndex, bucket in buckets])
+                view[name] = [dict(self._entries[sortKey[1:]], weightClass=labels[classIndex])
+                              for sortKey, classIndex in merged]
+            else:
+                view[name] = None
+        view['inKg'] = self._meetData['inKg']
+        return view
@@ -0,0 +1,174 @@
+import atexit
+import threading
+import time
+
+from swagger_server import metrics
+from swagger_server.config import logger
+from swagger_server.exceptions import LightsUnavailable
+
+
+class _Code:
+    """Polling state of one lights code"""
+
+    def __init__(self, interval, due):
+        self.interval = interval
+        self.due = due
+        self.known = False
+        self.state = None
+
+
+class LightsPoller:
+    """Background poller keeping the latest lights status of every platform
+
+    The platforms and their lights codes are discovered from the stored
+    orders every discovery_interval seconds, and tracked as soon as an order
+    is written. Every code is polled once per interval however many
+    platforms or screens use it. A code whose status didn't change is
+    polled half as often each time, up to max_interval, and goes back to
+    interval as soon as it changes or an order using it is written, since
+    a decision usually follows. Changes are handed to publish once per
+    platform using the code.
+    """
+
+    def __init__(self, proxy, discover, publish, interval, max_interval,
+                 discovery_interval, clock=time.monotonic):
+        self._proxy = proxy
+        self._discover = discover
+        self._publish = publish
+        self._interval = interval
+        self._maxInterval = max_interval
+        self._discoveryInterval = discovery_interval
+        self._clock = clock
+        self._platforms = {}
+        self._codes = {}
+        self._discovered = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="lights-poller", daemon=True)
+            self._thread.start()
+        atexit.register(self.stop)
+        logger.info(
+            f"Lights poller started with a poll interval of {self._interval}s")
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(self._interval + 1)
+
+    def track(self, platform, code):
+        """Polls code for platform from now on, or stops polling platform if code is empty"""
+        with self._lock:
+            self._track(platform, code)
+        self._wake.set()
+
+    def order_written(self, platform, code):
+        """Tracks code for platform and polls it at interval again"""
+        with self._lock:
+            self._track(platform, code)
+            polled = self._codes.get(code) if code else None
+            if polled is not None:
+                polled.interval = self._interval
+                polled.due = min(polled.due, self._clock() + self._interval)
+        self._wake.set()
+
+    def _track(self, platform, code):
+        if self._platforms.get(platform) == code:
+            return
+        if code:
+            self._platforms[platform] = code
+            if code not in self._codes:
+                self._codes[code] = _Code(self._interval, self._clock())
+        else:
+            self._platforms.pop(platform, None)
+        used = set(self._platforms.values())
+        for unused in [known for known in self._codes if known not in used]:
+            del self._codes[unused]
+
+    def lookup(self, platform):
+        """Returns whether the status of platform is known, and the status
+
+        :rtype: Tuple[bool, dict]
+        """
+        with self._lock:
+            code = self._platforms.get(platform)
+            polled = self._codes.get(code) if code is not None else None
+            if polled is None or not polled.known:
+                return False, None
+            return True, polled.state
+
+    def discover(self):
+        """Replaces the tracked platforms with the ones the stored orders have lights codes for"""
+        platforms = dict(self._discover())
+        with self._lock:
+            for platform in [known for known in self._platforms if known not in platforms]:
+                self._track(platform, None)
+            for platform, code in platforms.items():
+                self._track(platform, code)
+            self._discovered = self._clock()
+        logger.debug(f"Discovered lights codes for {len(platforms)} platforms")
+
+    def poll_due(self):
+        """Polls every code that is due
+
+        :return: Seconds until the next code is due
+        :rtype: float
+        """
+        now = self._clock()
+        with self._lock:
+            due = [code for code, polled in self._codes.items() if polled.due <= now]
+        for code in due:
+            self._poll(code)
+        with self._lock:
+            upcoming = [polled.due for polled in self._codes.values()]
+        if len(upcoming) == 0:
+            return self._interval
+        return max(min(upcoming) - self._clock(), 0.0)
+
+    def _poll(self, code):
+        try:
+            state = self._proxy.refresh(code)
+            error = None
+        except LightsUnavailable as e:
+            error = e
+        with self._lock:
+            polled = self._codes.get(code)
+            if polled is None:
+                return
+            changed = error is None and (not polled.known or polled.state != state)
+            if changed:
+                polled.known = True
+                polled.state = state
+                polled.interval = self._interval
+            else:
+                polled.interval = min(polled.interval * 2, self._maxInterval)
+            polled.due = self._clock() + polled.interval
+            platforms = [platform for platform, used in self._platforms.items() if used == code]
+        if error is not None:
+            metrics.lightsPolls.inc(result="error")
+            return
+        metrics.lightsPolls.inc(result="changed" if changed else "unchanged")
+        if changed:
+            for platform in platforms:
+                self._publish(platform, state)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.clear()
+            try:
+                if self._discovered is None or \
+                        self._clock() - self._discovered >= self._discoveryInterval:
+                    self.discover()
+                wait = self.poll_due()
+            except Exception as e:
+                logger.error(f"Lights poller failed: {e}")
+                wait = self._interval
+            self._wake.wait(wait)
@@ -0,0 +1,125 @@
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from swagger_server import metrics
+from swagger_server.config import logger
+from swagger_server.exceptions import LightsUnavailable
+
+
+class _Flight:
+    """One upstream fetch that every concurrent caller for a code waits on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+def pooled_session(pool_size):
+    """Returns a requests session keeping up to pool_size connections alive
+
+    Retries are left to the proxy, which would rather serve a stale status
+    than keep an overlay waiting.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class LightsProxy:
+    """Caching proxy in front of the lights service
+
+    Statuses are cached per lights code for ttl seconds. Concurrent misses
+    for the same code share one upstream fetch. Once a status is older than
+    ttl it is still served for up to stale_ttl seconds while a single
+    background fetch revalidates it, so a slow upstream never holds up an
+    overlay that has seen the code before. Past ttl + stale_ttl a status is
+    never served: the caller waits for a fresh fetch, and an upstream
+    failure then raises even though an older status is still cached.
+    """
+
+    def __init__(self, url, session, ttl, stale_ttl, timeout, clock=time.monotonic):
+        self._url = url
+        self._session = session
+        self._ttl = ttl
+        self._staleTtl = stale_ttl
+        self._timeout = timeout
+        self._clock = clock
+        self._cache = {}
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def get(self, code):
+        """Returns the lights status for code
+
+        :raises LightsUnavailable: If the upstream failed and nothing younger
+            than ttl + stale_ttl is cached
+        """
+        with self._lock:
+            cached = self._cache.get(code)
+            age = self._clock() - cached[1] if cached is not None else None
+            if cached is not None and age < self._ttl:
+                metrics.cacheLookups.inc(cache="lights", result="hit")
+                return cached[0]
+            flight = self._flights.get(code)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[code] = flight
+        if cached is not None and age < self._ttl + self._staleTtl:
+            metrics.cacheLookups.inc(cache="lights", result="stale")
+            if leader:
+                threading.Thread(target=self._fetch, args=(code, flight),
+                                 name="lights-revalidate", daemon=True).start()
+            return cached[0]
+        metrics.cacheLookups.inc(cache="lights", result="miss")
+        if leader:
+            self._fetch(code, flight)
+        else:
+            flight.done.wait()
+        if flight.error is not None:
+            raise LightsUnavailable(code, flight.error)
+        return flight.value
+
+    def refresh(self, code):
+        """Fetches the lights status for code from upstream, ignoring the cache
+
+        A fetch already in flight for code is joined instead of repeated.
+
+        :raises LightsUnavailable: If the upstream failed
+        """
+        with self._lock:
+            flight = self._flights.get(code)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[code] = flight
+        if leader:
+            self._fetch(code, flight)
+        else:
+            flight.done.wait()
+        if flight.error is not None:
+            raise LightsUnavailable(code, flight.error)
+        return flight.value
+
+    def _fetch(self, code, flight):
+        started = time.perf_counter()
+        try:
+            response = self._session.get(f"{self._url}/{code}", timeout=self._timeout)
+            response.raise_for_status()
+            flight.value = response.json()
+            metrics.lightsLatency.observe(time.perf_counter() - started, result="ok")
+        except (requests.RequestException, ValueError) as e:
+            flight.error = e
+            metrics.lightsLatency.observe(time.perf_counter() - started, result="error")
+            logger.warning(f"Failed to fetch lights for code: {code}: {e}")
+        with self._lock:
+            if flight.error is None:
+                self._cache[code] = (flight.value, self._clock())
+            self._flights.pop(code, None)
+        flight.done.set()
@@ -0,0 +1,160 @@
+import atexit
+import logging
+import logging.handlers
+import queue
+import random
+import threading
+import time
+
+from swagger_server import metrics
+
+# Pass as extra= on per-entry and other high-volume diagnostics so they go
+# through per-route sampling and rate limiting, e.g.
+#   logger.debug("Placed entry: %s", entryId, extra=logs.sampled)
+sampled = {'sampled': True}
+
+
+class Lazy:
+    """Defers building a log argument until the record is actually formatted
+
+    logger.debug("Payload: %s", Lazy(json.dumps, payload)) costs nothing
+    when DEBUG is off, and with the queue handler the work happens on the
+    listener thread instead of the request thread.
+    """
+
+    __slots__ = ('_function', '_args')
+
+    def __init__(self, function, *args):
+        self._function = function
+        self._args = args
+
+    def __str__(self):
+        return str(self._function(*self._args))
+
+
+def body(payload):
+    """Lazy text of a raw request body, safe to log after the parsed body is modified"""
+    return Lazy(bytes.decode, payload, "utf-8", "replace")
+
+
+def current_route():
+    """The operationId handling the current request, or None outside of one"""
+    try:
+        import flask
+        from swagger_server.request_metrics import operation_id
+        if flask.has_request_context():
+            return operation_id(flask.request.endpoint)
+    except ImportError:
+        pass
+    return None
+
+
+class SamplingFilter(logging.Filter):
+    """Samples and rate limits records logged with extra=sampled, per route
+
+    Keeps a record with the route's sample rate (sampleRates, falling back
+    to defaultRate) and then at most rateLimit of them per route per
+    second. Records without the sampled flag always pass.
+    """
+
+    def __init__(self, default_rate, sample_rates, rate_limit):
+        super().__init__()
+        self.defaultRate = default_rate
+        self.sampleRates = sample_rates
+        self.rateLimit = rate_limit
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if not getattr(record, 'sampled', False):
+            return True
+        route = getattr(record, 'route', None) or current_route() or record.name
+        rate = self.sampleRates.get(route, self.defaultRate)
+        if rate < 1 and random.random() >= rate:
+            metrics.suppressedLogRecords.inc(route=route)
+            return False
+        if self.rateLimit > 0 and not self._take(route):
+            metrics.suppressedLogRecords.inc(route=route)
+            return False
+        return True
+
+    def _take(self, route):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(route, (self.rateLimit, now))
+            tokens = min(self.rateLimit, tokens + (now - updated) * self.rateLimit)
+            if tokens < 1:
+                self._buckets[route] = (tokens, now)
+                return False
+            self._buckets[route] = (tokens - 1, now)
+            return True
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread
+
+    The stock QueueHandler formats the message before queueing it, which
+    is exactly the work we want off the request thread. Records stay
+    in-process, so they don't need to be made picklable either.
+    """
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.droppedLogRecords.inc()
+
+
+def parse_sample_rates(value):
+    """Parses "route=rate,route=rate" into a dict
+
+    :rtype: dict
+    """
+    rates = {}
+    for item in value.split(","):
+        if "=" not in item:
+            continue
+        route, rate = item.split("=", 1)
+        rates[route.strip()] = float(rate)
+    return rates
+
+
+_listener = None
+
+
+def configure(logger, config):
+    """Moves logger's handlers behind a queue and installs sampling
+
+    :param logger: Logger whose handlers should be made asynchronous
+    :type logger: logging.Logger
+    :param config: Application config
+    :type config: swagger_server.config.Config
+    """
+    global _listener
+    samplingFilter = SamplingFilter(
+        config.logSampleRate, parse_sample_rates(config.logSampleRates), config.logRateLimit)
+    if not config.logQueue or _listener is not None:
+        for handler in logger.handlers:
+            handler.addFilter(samplingFilter)
+        return
+    handlers = list(logger.handlers)
+    queueHandler = DeferredQueueHandler(queue.Queue(config.logQueueSize))
+    queueHandler.addFilter(samplingFilter)
+    for handler in handlers:
+        logger.removeHandler(handler)
+    logger.addHandler(queueHandler)
+    _listener = logging.handlers.QueueListener(
+        queueHandler.queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop)
+
+
+def stop():
+    """Flushes queued records and stops the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,220 @@
+import threading
+
+
+def _labels(labelnames, key, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, key)]
+    if extra:
+        pairs.append(extra)
+    if len(pairs) == 0:
+        return ""
+    return "{" + ",".join(pairs) + "}"
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """A monotonically increasing value, optionally split by labels"""
+
+    def __init__(self, name, description, labelnames=()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        registry.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(label, "")) for label in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        key = tuple(str(labels.get(label, "")) for label in self.labelnames)
+        return self._values.get(key, 0)
+
+    def snapshot(self):
+        with self._lock:
+            values = dict(self._values)
+        if len(self.labelnames) == 0:
+            return values.get((), 0)
+        return {"/".join(key): value for key, value in values.items()}
+
+    def render(self):
+        """Returns the counter in the Prometheus text format
+
+        :rtype: List[str]
+        """
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.description}",
+                 f"# TYPE {self.name} counter"]
+        if len(self.labelnames) == 0 and len(values) == 0:
+            values = [((), 0)]
+        for key, value in values:
+            lines.append(f"{self.name}{_labels(self.labelnames, key)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    """Counts observations into cumulative buckets, optionally split by labels"""
+
+    defaultBuckets = (0.005, 0.01, 0.025, 0.05, 0.1,
+                      0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, name, description, labelnames=(), buckets=defaultBuckets):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}
+        self._lock = threading.Lock()
+        registry.append(self)
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(label, "")) for label in self.labelnames)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = {'count': 0, 'sum': 0.0, 'max': 0.0,
+                          'buckets': [0] * len(self.buckets)}
+                self._values[key] = series
+            series['count'] += 1
+            series['sum'] += value
+            series['max'] = max(series['max'], value)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['buckets'][index] += 1
+
+    def snapshot(self):
+        with self._lock:
+            values = {key: {'count': series['count'],
+                            'sum': series['sum'],
+                            'max': series['max']}
+                      for key, series in self._values.items()}
+        if len(self.labelnames) == 0:
+            return values.get((), {'count': 0, 'sum': 0.0, 'max': 0.0})
+        return {"/".join(key): value for key, value in values.items()}
+
+    def render(self):
+        """Returns the histogram in the Prometheus text format
+
+        :rtype: List[str]
+        """
+        with self._lock:
+            values = sorted((key, dict(series, buckets=list(series['buckets'])))
+                            for key, series in self._values.items())
+        lines = [f"# HELP {self.name} {self.description}",
+                 f"# TYPE {self.name} histogram"]
+        for key, series in values:
+            bounds = [_number(float(bound)) for bound in self.buckets] + ["+Inf"]
+            for bound, count in zip(bounds, series['buckets'] + [series['count']]):
+                bucketLabels = _labels(self.labelnames, key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{bucketLabels} {count}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(series['sum'])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {series['count']}")
+        return lines
+
+
+registry = []
+
+
+def snapshot():
+    """Returns the current value of every registered metric
+
+    :rtype: dict
+    """
+    return {metric.name: metric.snapshot() for metric in registry}
+
+
+def render():
+    """Returns every registered metric in the Prometheus text exposition format
+
+    :rtype: str
+    """
+    lines = []
+    for metric in registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+skippedWrites = Counter(
+    "skipped_writes_total",
+    "Writes acknowledged without touching MongoDB because the payload was unchanged",
+    ["collection"])
+skippedWriteBytes = Counter(
+    "skipped_write_bytes_total",
+    "Request body bytes that did not need to be written to MongoDB",
+    ["collection"])
+coalescedWrites = Counter(
+    "coalesced_writes_total",
+    "Buffered writes replaced by a newer state before they were flushed",
+    ["collection"])
+flushLatency = Histogram(
+    "flush_latency_seconds",
+    "Time taken to flush a buffered write to MongoDB",
+    ["collection"])
+websocketConnections = Counter(
+    "websocket_connections_total",
+    "WebSocket connections accepted by the hub")
+websocketBroadcasts = Counter(
+    "websocket_broadcasts_total",
+    "Topic updates encoded and fanned out by the WebSocket hub")
+websocketDroppedMessages = Counter(
+    "websocket_dropped_messages_total",
+    "Undelivered WebSocket messages replaced by a newer state for the same topic")
+suppressedLogRecords = Counter(
+    "suppressed_log_records_total",
+    "Sampled diagnostics dropped by per-route sampling or rate limiting",
+    ["route"])
+droppedLogRecords = Counter(
+    "dropped_log_records_total",
+    "Log records dropped because the log queue was full")
+requestLatency = Histogram(
+    "http_request_duration_seconds",
+    "Time taken to handle an API request, by connexion operationId",
+    ["operation", "method", "status", "platform"])
+payloadSize = Histogram(
+    "http_request_payload_bytes",
+    "Size of request bodies sent to the API",
+    ["operation"],
+    buckets=(1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216))
+storageLatency = Histogram(
+    "storage_command_duration_seconds",
+    "Time taken by memory and SQLite storage commands, see mongodb_command_duration_seconds for MongoDB",
+    ["backend", "collection", "command"])
+mongodbLatency = Histogram(
+    "mongodb_command_duration_seconds",
+    "Time taken by MongoDB commands, by collection",
+    ["collection", "command"])
+slowMongodbCommands = Counter(
+    "mongodb_slow_commands_total",
+    "MongoDB commands that took longer than MONGODB_SLOW_MS",
+    ["collection", "command"])
+requestDatabaseLatency = Histogram(
+    "http_request_database_seconds",
+    "Time an API request spent waiting on MongoDB, by connexion operationId",
+    ["operation"])
+leaderboardRebuildLatency = Histogram(
+    "leaderboard_rebuild_seconds",
+    "Time taken to load, re-bucket or render the leaderboard",
+    ["stage"])
+cacheLookups = Counter(
+    "cache_lookups_total",
+    "Lookups of in-process caches, by cache and whether they were answered from it",
+    ["cache", "result"])
+lightsLatency = Histogram(
+    "lights_upstream_duration_seconds",
+    "Time taken by the lights service to answer, by whether the fetch succeeded",
+    ["result"])
+lightsPolls = Counter(
+    "lights_polls_total",
+    "Background polls of the lights service, by whether the status changed",
+    ["result"])
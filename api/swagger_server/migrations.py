@@ -0,0 +1,134 @@
+"""Versioned MongoDB schema migrations
+
+Every migration runs once per database, in order, and its version is
+recorded in the migrations collection afterwards. The migrations
+themselves only create indexes, which MongoDB treats as a no-op when the
+index already exists, so running them again after an interrupted start
+is harmless.
+
+Run at startup (MONGODB_MIGRATE=true, the default) or with
+
+    python3 -m swagger_server.migrations [--status]
+"""
+
+import argparse
+import time
+
+from pymongo import ASCENDING, errors
+
+from swagger_server import storage
+from swagger_server.config import Config, logger
+
+config = Config()
+stateId = "schema"
+
+
+def unique_order_platform(database):
+    database["order"].create_index(
+        [('platform', ASCENDING)], name="platform_unique", unique=True)
+
+
+def unique_backup_id(database):
+    database["backup"].create_index(
+        [('id', ASCENDING)], name="id_unique", unique=True)
+
+
+def unique_registrations_id(database):
+    database["registrations"].create_index(
+        [('id', ASCENDING)], name="id_unique", unique=True)
+
+
+def unique_backup_history_version(database):
+    database["backup_history"].create_index(
+        [('id', ASCENDING), ('version', ASCENDING)], name="id_version_unique", unique=True)
+
+
+def order_entries_indexes(database):
+    database["order_entries"].create_index(
+        [('meet', ASCENDING), ('platform', ASCENDING), ('entryId', ASCENDING)],
+        name="meet_platform_entryId_unique", unique=True)
+    database["order_entries"].create_index([('platform', ASCENDING)], name="platform")
+
+
+migrations = (
+    (1, "Unique index on order.platform", unique_order_platform),
+    (2, "Unique index on backup.id", unique_backup_id),
+    (3, "Unique index on registrations.id", unique_registrations_id),
+    (4, "Unique index on backup_history (id, version)", unique_backup_history_version),
+    (5, "Unique index on order_entries (meet, platform, entryId), index on order_entries.platform",
+     order_entries_indexes),
+)
+latestVersion = migrations[-1][0]
+
+
+def current_version(database):
+    """Returns the last migration applied to database, 0 if none were
+
+    :rtype: int
+    """
+    state = database["migrations"].find_one({'_id': stateId})
+    if state is None:
+        return 0
+    return state['version']
+
+
+def migrate(database):
+    """Applies every migration newer than the database's version
+
+    :return: The versions that were applied
+    :rtype: List[int]
+    """
+    version = current_version(database)
+    applied = []
+    for migrationVersion, description, migration in migrations:
+        if migrationVersion <= version:
+            continue
+        logger.info(f"Applying migration: {migrationVersion} - {description}")
+        started = time.perf_counter()
+        migration(database)
+        database["migrations"].update_one(
+            {'_id': stateId},
+            {'$max': {'version': migrationVersion},
+             '$push': {'applied': {'version': migrationVersion,
+                                   'description': description,
+                                   'appliedAt': time.time()}}},
+            upsert=True)
+        logger.info(
+            f"Applied migration: {migrationVersion} in {time.perf_counter() - started:.3f} seconds")
+        applied.append(migrationVersion)
+    if len(applied) == 0:
+        logger.info(f"Database schema is up to date at version: {version}")
+    return applied
+
+
+def migrate_on_startup():
+    """Migrates the configured database, logging instead of failing if it can't"""
+    if not config.mongodbMigrate:
+        return
+    try:
+        migrate(storage.database())
+    except errors.DuplicateKeyError as e:
+        logger.error(
+            f"Could not create a unique index because of duplicate documents, remove them and restart: {e}")
+    except errors.PyMongoError as e:
+        logger.error(f"Could not migrate the database schema: {e}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python3 -m swagger_server.migrations",
+        description="Creates the indexes and applies the schema migrations the API needs")
+    parser.add_argument("--status", action="store_true",
+                        help="only print the current and latest schema version")
+    arguments = parser.parse_args(argv)
+    database = storage.database()
+    if arguments.status:
+        print(f"Schema version: {current_version(database)} of {latestVersion}")
+        return
+    applied = migrate(database)
+    print(f"Applied migrations: {applied}" if applied else "Nothing to migrate")
+
+
+if __name__ == '__main__':
+    logger.setLevel(config.logLevel)
+    main()
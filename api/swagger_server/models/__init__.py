@@ -6,4 +6,6 @@ from __future__ import absolute_import
 from swagger_server.models.any_value import AnyValue
 from swagger_server.models.api_health import ApiHealth
 from swagger_server.models.lifter_order import LifterOrder
+from swagger_server.models.lifter_order_delta import LifterOrderDelta
 from swagger_server.models.order_response import OrderResponse
+from swagger_server.models.registrations_import_report import RegistrationsImportReport
@@ -14,7 +14,7 @@ class ApiHealth(Model):
 
     Do not edit the class manually.
     """
-    def __init__(self, api_status: str=None, database_status: str=None, failure_message: str=None):  # noqa: E501
+    def __init__(self, api_status: str=None, database_status: str=None, failure_message: str=None, metrics: object=None):  # noqa: E501
         """ApiHealth - a model defined in Swagger
 
         :param api_status: The api_status of this ApiHealth.  # noqa: E501
@@ -23,21 +23,26 @@ class ApiHealth(Model):
         :type database_status: str
         :param failure_message: The failure_message of this ApiHealth.  # noqa: E501
         :type failure_message: str
+        :param metrics: The metrics of this ApiHealth.  # noqa: E501
+        :type metrics: object
         """
         self.swagger_types = {
             'api_status': str,
             'database_status': str,
-            'failure_message': str
+            'failure_message': str,
+            'metrics': object
         }
 
         self.attribute_map = {
             'api_status': 'apiStatus',
             'database_status': 'databaseStatus',
-            'failure_message': 'failureMessage'
+            'failure_message': 'failureMessage',
+            'metrics': 'metrics'
         }
         self._api_status = api_status
         self._database_status = database_status
         self._failure_message = failure_message
+        self._metrics = metrics
 
     @classmethod
     def from_dict(cls, dikt) -> 'ApiHealth':
@@ -116,3 +121,24 @@ class ApiHealth(Model):
         """
 
         self._failure_message = failure_message
+
+    @property
+    def metrics(self) -> object:
+        """Gets the metrics of this ApiHealth.
+
+
+        :return: The metrics of this ApiHealth.
+        :rtype: object
+        """
+        return self._metrics
+
+    @metrics.setter
+    def metrics(self, metrics: object):
+        """Sets the metrics of this ApiHealth.
+
+
+        :param metrics: The metrics of this ApiHealth.
+        :type metrics: object
+        """
+
+        self._metrics = metrics
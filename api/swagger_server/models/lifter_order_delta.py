@@ -0,0 +1,194 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+from datetime import date, datetime  # noqa: F401
+
+from typing import List, Dict  # noqa: F401
+
+from swagger_server.models.base_model_ import Model
+from swagger_server import util
+
+
+class LifterOrderDelta(Model):
+    """NOTE: This class is auto generated by the swagger code generator program.
+
+    Do not edit the class manually.
+    """
+    def __init__(self, base_version: int=None, entries: List[object]=None, entry_order: List[int]=None, order: object=None, meet_data: object=None, lights_code: str=None):  # noqa: E501
+        """LifterOrderDelta - a model defined in Swagger
+
+        :param base_version: The base_version of this LifterOrderDelta.  # noqa: E501
+        :type base_version: int
+        :param entries: The entries of this LifterOrderDelta.  # noqa: E501
+        :type entries: List[object]
+        :param entry_order: The entry_order of this LifterOrderDelta.  # noqa: E501
+        :type entry_order: List[int]
+        :param order: The order of this LifterOrderDelta.  # noqa: E501
+        :type order: object
+        :param meet_data: The meet_data of this LifterOrderDelta.  # noqa: E501
+        :type meet_data: object
+        :param lights_code: The lights_code of this LifterOrderDelta.  # noqa: E501
+        :type lights_code: str
+        """
+        self.swagger_types = {
+            'base_version': int,
+            'entries': List[object],
+            'entry_order': List[int],
+            'order': object,
+            'meet_data': object,
+            'lights_code': str
+        }
+
+        self.attribute_map = {
+            'base_version': 'baseVersion',
+            'entries': 'entries',
+            'entry_order': 'entryOrder',
+            'order': 'order',
+            'meet_data': 'meetData',
+            'lights_code': 'lightsCode'
+        }
+        self._base_version = base_version
+        self._entries = entries
+        self._entry_order = entry_order
+        self._order = order
+        self._meet_data = meet_data
+        self._lights_code = lights_code
+
+    @classmethod
+    def from_dict(cls, dikt) -> 'LifterOrderDelta':
+        """Returns the dict as a model
+
+        :param dikt: A dict.
+        :type: dict
+        :return: The LifterOrderDelta of this LifterOrderDelta.  # noqa: E501
+        :rtype: LifterOrderDelta
+        """
+        return util.deserialize_model(dikt, cls)
+
+    @property
+    def base_version(self) -> int:
+        """Gets the base_version of this LifterOrderDelta.
+
+
+        :return: The base_version of this LifterOrderDelta.
+        :rtype: int
+        """
+        return self._base_version
+
+    @base_version.setter
+    def base_version(self, base_version: int):
+        """Sets the base_version of this LifterOrderDelta.
+
+
+        :param base_version: The base_version of this LifterOrderDelta.
+        :type base_version: int
+        """
+        if base_version is None:
+            raise ValueError("Invalid value for `base_version`, must not be `None`")  # noqa: E501
+
+        self._base_version = base_version
+
+    @property
+    def entries(self) -> List[object]:
+        """Gets the entries of this LifterOrderDelta.
+
+
+        :return: The entries of this LifterOrderDelta.
+        :rtype: List[object]
+        """
+        return self._entries
+
+    @entries.setter
+    def entries(self, entries: List[object]):
+        """Sets the entries of this LifterOrderDelta.
+
+
+        :param entries: The entries of this LifterOrderDelta.
+        :type entries: List[object]
+        """
+
+        self._entries = entries
+
+    @property
+    def entry_order(self) -> List[int]:
+        """Gets the entry_order of this LifterOrderDelta.
+
+
+        :return: The entry_order of this LifterOrderDelta.
+        :rtype: List[int]
+        """
+        return self._entry_order
+
+    @entry_order.setter
+    def entry_order(self, entry_order: List[int]):
+        """Sets the entry_order of this LifterOrderDelta.
+
+
+        :param entry_order: The entry_order of this LifterOrderDelta.
+        :type entry_order: List[int]
+        """
+
+        self._entry_order = entry_order
+
+    @property
+    def order(self) -> object:
+        """Gets the order of this LifterOrderDelta.
+
+
+        :return: The order of this LifterOrderDelta.
+        :rtype: object
+        """
+        return self._order
+
+    @order.setter
+    def order(self, order: object):
+        """Sets the order of this LifterOrderDelta.
+
+
+        :param order: The order of this LifterOrderDelta.
+        :type order: object
+        """
+
+        self._order = order
+
+    @property
+    def meet_data(self) -> object:
+        """Gets the meet_data of this LifterOrderDelta.
+
+
+        :return: The meet_data of this LifterOrderDelta.
+        :rtype: object
+        """
+        return self._meet_data
+
+    @meet_data.setter
+    def meet_data(self, meet_data: object):
+        """Sets the meet_data of this LifterOrderDelta.
+
+
+        :param meet_data: The meet_data of this LifterOrderDelta.
+        :type meet_data: object
+        """
+
+        self._meet_data = meet_data
+
+    @property
+    def lights_code(self) -> str:
+        """Gets the lights_code of this LifterOrderDelta.
+
+
+        :return: The lights_code of this LifterOrderDelta.
+        :rtype: str
+        """
+        return self._lights_code
+
+    @lights_code.setter
+    def lights_code(self, lights_code: str):
+        """Sets the lights_code of this LifterOrderDelta.
+
+
+        :param lights_code: The lights_code of this LifterOrderDelta.
+        :type lights_code: str
+        """
+
+        self._lights_code = lights_code
@@ -14,25 +14,35 @@ class OrderResponse(Model):
 
     Do not edit the class manually.
     """
-    def __init__(self, status: str=None, message: str=None):  # noqa: E501
+    def __init__(self, status: str=None, message: str=None, version: int=None, unchanged: bool=None):  # noqa: E501
         """OrderResponse - a model defined in Swagger
 
         :param status: The status of this OrderResponse.  # noqa: E501
         :type status: str
         :param message: The message of this OrderResponse.  # noqa: E501
         :type message: str
+        :param version: The version of this OrderResponse.  # noqa: E501
+        :type version: int
+        :param unchanged: The unchanged of this OrderResponse.  # noqa: E501
+        :type unchanged: bool
         """
         self.swagger_types = {
             'status': str,
-            'message': str
+            'message': str,
+            'version': int,
+            'unchanged': bool
         }
 
         self.attribute_map = {
             'status': 'status',
-            'message': 'message'
+            'message': 'message',
+            'version': 'version',
+            'unchanged': 'unchanged'
         }
         self._status = status
         self._message = message
+        self._version = version
+        self._unchanged = unchanged
 
     @classmethod
     def from_dict(cls, dikt) -> 'OrderResponse':
@@ -86,3 +96,45 @@ class OrderResponse(Model):
         """
 
         self._message = message
+
+    @property
+    def version(self) -> int:
+        """Gets the version of this OrderResponse.
+
+
+        :return: The version of this OrderResponse.
+        :rtype: int
+        """
+        return self._version
+
+    @version.setter
+    def version(self, version: int):
+        """Sets the version of this OrderResponse.
+
+
+        :param version: The version of this OrderResponse.
+        :type version: int
+        """
+
+        self._version = version
+
+    @property
+    def unchanged(self) -> bool:
+        """Gets the unchanged of this OrderResponse.
+
+
+        :return: The unchanged of this OrderResponse.
+        :rtype: bool
+        """
+        return self._unchanged
+
+    @unchanged.setter
+    def unchanged(self, unchanged: bool):
+        """Sets the unchanged of this OrderResponse.
+
+
+        :param unchanged: The unchanged of this OrderResponse.
+        :type unchanged: bool
+        """
+
+        self._unchanged = unchanged
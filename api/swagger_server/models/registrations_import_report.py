@@ -0,0 +1,270 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+from datetime import date, datetime  # noqa: F401
+
+from typing import List, Dict  # noqa: F401
+
+from swagger_server.models.base_model_ import Model
+from swagger_server import util
+
+
+class RegistrationsImportReport(Model):
+    """NOTE: This class is auto generated by the swagger code generator program.
+
+    Do not edit the class manually.
+    """
+    def __init__(self, status: str=None, message: str=None, received: int=None, inserted: int=None, updated: int=None, failed: int=None, batches: int=None, seconds: float=None, errors: List[object]=None):  # noqa: E501
+        """RegistrationsImportReport - a model defined in Swagger
+
+        :param status: The status of this RegistrationsImportReport.  # noqa: E501
+        :type status: str
+        :param message: The message of this RegistrationsImportReport.  # noqa: E501
+        :type message: str
+        :param received: The received of this RegistrationsImportReport.  # noqa: E501
+        :type received: int
+        :param inserted: The inserted of this RegistrationsImportReport.  # noqa: E501
+        :type inserted: int
+        :param updated: The updated of this RegistrationsImportReport.  # noqa: E501
+        :type updated: int
+        :param failed: The failed of this RegistrationsImportReport.  # noqa: E501
+        :type failed: int
+        :param batches: The batches of this RegistrationsImportReport.  # noqa: E501
+        :type batches: int
+        :param seconds: The seconds of this RegistrationsImportReport.  # noqa: E501
+        :type seconds: float
+        :param errors: The errors of this RegistrationsImportReport.  # noqa: E501
+        :type errors: List[object]
+        """
+        self.swagger_types = {
+            'status': str,
+            'message': str,
+            'received': int,
+            'inserted': int,
+            'updated': int,
+            'failed': int,
+            'batches': int,
+            'seconds': float,
+            'errors': List[object]
+        }
+
+        self.attribute_map = {
+            'status': 'status',
+            'message': 'message',
+            'received': 'received',
+            'inserted': 'inserted',
+            'updated': 'updated',
+            'failed': 'failed',
+            'batches': 'batches',
+            'seconds': 'seconds',
+            'errors': 'errors'
+        }
+        self._status = status
+        self._message = message
+        self._received = received
+        self._inserted = inserted
+        self._updated = updated
+        self._failed = failed
+        self._batches = batches
+        self._seconds = seconds
+        self._errors = errors
+
+    @classmethod
+    def from_dict(cls, dikt) -> 'RegistrationsImportReport':
+        """Returns the dict as a model
+
+        :param dikt: A dict.
+        :type: dict
+        :return: The RegistrationsImportReport of this RegistrationsImportReport.  # noqa: E501
+        :rtype: RegistrationsImportReport
+        """
+        return util.deserialize_model(dikt, cls)
+
+    @property
+    def status(self) -> str:
+        """Gets the status of this RegistrationsImportReport.
+
+
+        :return: The status of this RegistrationsImportReport.
+        :rtype: str
+        """
+        return self._status
+
+    @status.setter
+    def status(self, status: str):
+        """Sets the status of this RegistrationsImportReport.
+
+
+        :param status: The status of this RegistrationsImportReport.
+        :type status: str
+        """
+
+        self._status = status
+
+    @property
+    def message(self) -> str:
+        """Gets the message of this RegistrationsImportReport.
+
+
+        :return: The message of this RegistrationsImportReport.
+        :rtype: str
+        """
+        return self._message
+
+    @message.setter
+    def message(self, message: str):
+        """Sets the message of this RegistrationsImportReport.
+
+
+        :param message: The message of this RegistrationsImportReport.
+        :type message: str
+        """
+
+        self._message = message
+
+    @property
+    def received(self) -> int:
+        """Gets the received of this RegistrationsImportReport.
+
+
+        :return: The received of this RegistrationsImportReport.
+        :rtype: int
+        """
+        return self._received
+
+    @received.setter
+    def received(self, received: int):
+        """Sets the received of this RegistrationsImportReport.
+
+
+        :param received: The received of this RegistrationsImportReport.
+        :type received: int
+        """
+
+        self._received = received
+
+    @property
+    def inserted(self) -> int:
+        """Gets the inserted of this RegistrationsImportReport.
+
+
+        :return: The inserted of this RegistrationsImportReport.
+        :rtype: int
+        """
+        return self._inserted
+
+    @inserted.setter
+    def inserted(self, inserted: int):
+        """Sets the inserted of this RegistrationsImportReport.
+
+
+        :param inserted: The inserted of this RegistrationsImportReport.
+        :type inserted: int
+        """
+
+        self._inserted = inserted
+
+    @property
+    def updated(self) -> int:
+        """Gets the updated of this RegistrationsImportReport.
+
+
+        :return: The updated of this RegistrationsImportReport.
+        :rtype: int
+        """
+        return self._updated
+
+    @updated.setter
+    def updated(self, updated: int):
+        """Sets the updated of this RegistrationsImportReport.
+
+
+        :param updated: The updated of this RegistrationsImportReport.
+        :type updated: int
+        """
+
+        self._updated = updated
+
+    @property
+    def failed(self) -> int:
+        """Gets the failed of this RegistrationsImportReport.
+
+
+        :return: The failed of this RegistrationsImportReport.
+        :rtype: int
+        """
+        return self._failed
+
+    @failed.setter
+    def failed(self, failed: int):
+        """Sets the failed of this RegistrationsImportReport.
+
+
+        :param failed: The failed of this RegistrationsImportReport.
+        :type failed: int
+        """
+
+        self._failed = failed
+
+    @property
+    def batches(self) -> int:
+        """Gets the batches of this RegistrationsImportReport.
+
+
+        :return: The batches of this RegistrationsImportReport.
+        :rtype: int
+        """
+        return self._batches
+
+    @batches.setter
+    def batches(self, batches: int):
+        """Sets the batches of this RegistrationsImportReport.
+
+
+        :param batches: The batches of this RegistrationsImportReport.
+        :type batches: int
+        """
+
+        self._batches = batches
+
+    @property
+    def seconds(self) -> float:
+        """Gets the seconds of this RegistrationsImportReport.
+
+
+        :return: The seconds of this RegistrationsImportReport.
+        :rtype: float
+        """
+        return self._seconds
+
+    @seconds.setter
+    def seconds(self, seconds: float):
+        """Sets the seconds of this RegistrationsImportReport.
+
+
+        :param seconds: The seconds of this RegistrationsImportReport.
+        :type seconds: float
+        """
+
+        self._seconds = seconds
+
+    @property
+    def errors(self) -> List[object]:
+        """Gets the errors of this RegistrationsImportReport.
+
+
+        :return: The errors of this RegistrationsImportReport.
+        :rtype: List[object]
+        """
+        return self._errors
+
+    @errors.setter
+    def errors(self, errors: List[object]):
+        """Sets the errors of this RegistrationsImportReport.
+
+
+        :param errors: The errors of this RegistrationsImportReport.
+        :type errors: List[object]
+        """
+
+        self._errors = errors
@@ -0,0 +1,123 @@
+import logging
+import threading
+
+from pymongo import monitoring
+
+from swagger_server import metrics
+
+# The root logger, as in swagger_server.config, which creates the monitor
+# for its MongoClient and so can't be imported from here
+logger = logging.getLogger()
+
+_request = threading.local()
+
+
+def command_collection(command_name, command):
+    """Returns the collection a MongoDB command works on, or "" for database commands"""
+    if command_name == "getMore":
+        return command.get('collection', "")
+    target = command.get(command_name)
+    if isinstance(target, str):
+        return target
+    return ""
+
+
+def command_filter(command_name, command):
+    """Returns the part of a command that selects documents, if it has one"""
+    if command_name in ("update", "delete"):
+        return [statement.get('q') for statement in command.get(command_name + "s", [])]
+    if command_name == "findAndModify":
+        return command.get('query')
+    if command_name == "aggregate":
+        return command.get('pipeline')
+    return command.get('filter', command.get('query'))
+
+
+def redact(value):
+    """Replaces every value in a filter with "?", keeping field names and operators"""
+    if isinstance(value, dict):
+        return {key: redact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    if value is None:
+        return None
+    return "?"
+
+
+class RequestTiming:
+    """Database time and command counts of the current request"""
+
+    __slots__ = ('seconds', 'commands')
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.commands = {}
+
+    def describe(self):
+        return ", ".join(f"{count} {command}" for command, count in sorted(self.commands.items()))
+
+
+def begin_request():
+    """Starts counting the MongoDB commands issued by this thread"""
+    _request.timing = RequestTiming()
+
+
+def end_request():
+    """Stops counting and returns what the thread spent in MongoDB since begin_request
+
+    :rtype: RequestTiming
+    """
+    timing = getattr(_request, 'timing', None)
+    _request.timing = None
+    return timing
+
+
+def add_request_time(command_name, seconds):
+    """Adds a database command to the request this thread is timing, if any"""
+    timing = getattr(_request, 'timing', None)
+    if timing is not None:
+        timing.seconds += seconds
+        timing.commands[command_name] = timing.commands.get(command_name, 0) + 1
+
+
+class CommandMonitor(monitoring.CommandListener):
+    """Records the latency of every MongoDB command per collection
+
+    Commands issued while a request is being timed (see begin_request) are
+    also added to that request's database time, and commands slower than
+    slow_ms are logged with their filter values redacted.
+
+    The succeeded and failed events only carry the command name, so the
+    collection and command are remembered from the started event until
+    they arrive. pymongo publishes all three on the thread that issued the
+    command.
+    """
+
+    def __init__(self, slow_ms):
+        self.slowSeconds = slow_ms / 1000
+        self._commands = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        with self._lock:
+            self._commands[(event.connection_id, event.request_id)] = event.command
+
+    def succeeded(self, event):
+        self._observe(event)
+
+    def failed(self, event):
+        self._observe(event)
+
+    def _observe(self, event):
+        with self._lock:
+            command = self._commands.pop((event.connection_id, event.request_id), {})
+        seconds = event.duration_micros / 1e6
+        collection = command_collection(event.command_name, command)
+        metrics.mongodbLatency.observe(seconds, collection=collection, command=event.command_name)
+        add_request_time(event.command_name, seconds)
+        if seconds >= self.slowSeconds:
+            metrics.slowMongodbCommands.inc(collection=collection, command=event.command_name)
+            logger.warning(
+                "Slow MongoDB %s on collection: %s took %.1f ms with filter: %s",
+                event.command_name, collection, seconds * 1000,
+                redact(command_filter(event.command_name, command)))
@@ -0,0 +1,55 @@
+from swagger_server.config import logger
+from swagger_server.exceptions import OrderVersionConflict
+
+
+def apply_order_delta(platform, document, delta):
+    """Applies an order delta to a stored order document
+
+    The delta carries the version it was computed against, the entries that
+    changed since that version, the full ordered list of entry ids and any
+    changed order fields. Anything the delta can't be applied to cleanly
+    raises OrderVersionConflict so the client falls back to a full resync.
+
+    :param platform: Platform number
+    :type platform: int
+    :param document: Stored order document
+    :type document: dict
+    :param delta: Order delta posted by the client
+    :type delta: dict
+
+    :rtype: dict
+    """
+    baseVersion = delta.get('baseVersion')
+    if document is None:
+        raise OrderVersionConflict(platform, baseVersion, None)
+    currentVersion = document.get('version')
+    if currentVersion is None or currentVersion != baseVersion:
+        raise OrderVersionConflict(platform, baseVersion, currentVersion)
+
+    storedOrder = document['order']
+    entriesById = {entry['id']: entry for entry in storedOrder['orderedEntries']}
+    for entry in delta.get('entries', []):
+        entriesById[entry['id']] = entry
+
+    entryOrder = delta.get('entryOrder')
+    if entryOrder is None:
+        entryOrder = [entry['id'] for entry in storedOrder['orderedEntries']]
+    missingIds = [entryId for entryId in entryOrder if entryId not in entriesById]
+    if len(missingIds) > 0:
+        logger.info(
+            f"Order delta for platform: {platform} references unknown entry ids: {missingIds}")
+        raise OrderVersionConflict(platform, baseVersion, currentVersion)
+
+    order = dict(storedOrder)
+    order.update(delta.get('order') or {})
+    order['orderedEntries'] = [entriesById[entryId] for entryId in entryOrder]
+
+    update = {
+        'order': order,
+        'version': currentVersion + 1
+    }
+    if 'meetData' in delta:
+        update['meetData'] = delta['meetData']
+    if 'lightsCode' in delta:
+        update['lightsCode'] = delta['lightsCode']
+    return update
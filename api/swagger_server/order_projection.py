@@ -0,0 +1,182 @@
+import threading
+
+from swagger_server.config import logger
+from swagger_server.controllers.helpers import calculate_max_lifts
+from swagger_server.exceptions import DocumentNotFound
+
+
+def lifter_slots(order, last_entry_id):
+    """Returns the (entry id, attempt) of the current and next lifter
+
+    Both fall back to the last entry in the lifting order once the flight
+    is finished.
+
+    :param order: Order fields of a stored order document
+    :type order: dict
+    :param last_entry_id: Id of the last entry in the lifting order
+    :type last_entry_id: int
+
+    :rtype: dict
+    """
+    currentEntryId = order.get('currentEntryId')
+    current = (currentEntryId if currentEntryId is not None else last_entry_id,
+               order.get('attemptOneIndexed'))
+    nextEntryId = order.get('nextEntryId')
+    if nextEntryId is not None:
+        nextLifter = (nextEntryId, order.get('nextAttemptOneIndexed'))
+    else:
+        nextLifter = (last_entry_id, 3)
+    return {'current': current, 'next': nextLifter}
+
+
+def build_lifter(slot, order, attempt, entry):
+    """Builds the current or next lifter served for entry, None without one
+
+    :rtype: dict
+    """
+    if entry is None:
+        return None
+    lifter = {
+        'platformDetails': order.get('platformDetails'),
+        'attempt': attempt,
+        'entry': entry
+    }
+    if slot == "current":
+        lifter['maxLift'] = calculate_max_lifts(entry)
+    return lifter
+
+
+def build_projection(document):
+    """Builds the read side of a stored order document
+
+    Resolves the current and next lifter once, so serving them is a dict
+    lookup instead of a scan over orderedEntries.
+
+    :param document: Stored order document
+    :type document: dict
+
+    :rtype: dict
+    """
+    order = document['order']
+    orderedEntries = order['orderedEntries']
+    entriesById = {entry['id']: entry for entry in orderedEntries}
+    lastEntryId = orderedEntries[-1]['id'] if len(orderedEntries) > 0 else None
+    projection = {
+        'version': document.get('version'),
+        'entriesById': entriesById
+    }
+    for slot, (entryId, attempt) in lifter_slots(order, lastEntryId).items():
+        projection[slot] = build_lifter(slot, order, attempt, entriesById.get(entryId))
+    return projection
+
+
+class OrderProjection:
+    """In-process current/next view of every platform's order
+
+    Updated whenever an order is written through this API. Platforms that
+    haven't been written since a restart are loaded from the order store on
+    first read, only the requested lifter for current and next reads.
+    """
+
+    def __init__(self, collection):
+        self._collection = collection
+        self._platforms = {}
+        self._lifters = {}
+        self._lock = threading.Lock()
+
+    def update(self, platform, document):
+        """Rebuilds the projection for platform from a written order document
+
+        Writes aren't serialized once they are stored, so a document older
+        than the projection is dropped instead of replacing it.
+
+        :return: The new projection, or None if document was older
+        :rtype: dict
+        """
+        projection = build_projection(document)
+        with self._lock:
+            stored = self._platforms.get(platform)
+            if stored is not None and stored['version'] is not None and projection['version'] is not None \
+                    and projection['version'] < stored['version']:
+                return None
+            self._replace(platform, projection)
+        return projection
+
+    def _replace(self, platform, projection):
+        self._platforms[platform] = projection
+        self._lifters.pop((platform, "current"), None)
+        self._lifters.pop((platform, "next"), None)
+
+    def invalidate(self, platform):
+        with self._lock:
+            self._platforms.pop(platform, None)
+            self._lifters.pop((platform, "current"), None)
+            self._lifters.pop((platform, "next"), None)
+
+    def get(self, platform):
+        """Returns the projection for platform, loading it from MongoDB if needed
+
+        :rtype: dict
+        """
+        projection = self._platforms.get(platform)
+        if projection is not None:
+            return projection
+        document = self._collection().find_one({'platform': platform})
+        if document is None:
+            logger.info(f"Could not find document for platform: {platform}")
+            raise DocumentNotFound(platform, "order")
+        logger.info(f"Loaded order projection for platform: {platform} from MongoDB")
+        return self.update(platform, document) or self._platforms[platform]
+
+    def lifter(self, platform, slot):
+        """Returns the "current" or "next" lifter for platform
+
+        :rtype: dict
+        """
+        projection = self._platforms.get(platform)
+        if projection is not None:
+            lifter = projection[slot]
+        elif (platform, slot) in self._lifters:
+            lifter = self._lifters[(platform, slot)]
+        else:
+            lifter = self._collection().lifter(platform, slot)
+            with self._lock:
+                if platform not in self._platforms:
+                    self._lifters[(platform, slot)] = lifter
+        if lifter is None:
+            raise DocumentNotFound(platform, "order")
+        return lifter
+
+    def current(self, platform):
+        return self.lifter(platform, "current")
+
+    def next(self, platform):
+        return self.lifter(platform, "next")
+
+    def verify(self, platform):
+        """Compares the projection for platform with the stored document
+
+        Only an inconsistent projection is replaced, with one rebuilt from
+        the stored document.
+
+        :rtype: dict
+        """
+        document = self._collection().find_one({'platform': platform})
+        if document is None:
+            raise DocumentNotFound(platform, "order")
+        projection = self._platforms.get(platform)
+        stored = build_projection(document)
+        consistent = projection is None or all(
+            projection[key] == stored[key] for key in ('version', 'current', 'next'))
+        if not consistent:
+            logger.warning(
+                f"Order projection for platform: {platform} does not match the stored document, rebuilding")
+            with self._lock:
+                self._replace(platform, stored)
+        return {
+            'platform': platform,
+            'consistent': consistent,
+            'loaded': projection is not None,
+            'projectionVersion': projection['version'] if projection is not None else None,
+            'storedVersion': stored['version']
+        }
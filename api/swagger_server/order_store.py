@@ -0,0 +1,244 @@
+"""Storage layouts for lifter orders
+
+"embedded" keeps one document per platform in the order collection, with
+meetData and every orderedEntries element embedded, as posted.
+
+"normalized" keeps a slim document per platform in the order collection,
+holding the order fields and the ordered entry ids, and every entry in the
+order_entries collection keyed by (meet, platform, entryId). Current and
+next reads fetch just the one entry they need, and writes only upsert the
+entries that changed.
+
+Both stores return full order documents from find and find_one, so callers
+don't need to know which layout is in use.
+"""
+
+import json
+import threading
+
+from pymongo import ReplaceOne, ReturnDocument
+
+from swagger_server import storage
+from swagger_server.config import Config, logger
+from swagger_server.exceptions import DocumentNotFound
+from swagger_server.order_projection import build_lifter, build_projection, lifter_slots
+from swagger_server.payload_digest import digest
+
+config = Config()
+
+
+class EmbeddedOrderStore:
+    """One document per platform with every entry embedded"""
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def find(self, filter):
+        return self._collection().find(filter)
+
+    def find_one(self, filter, projection=None):
+        return self._collection().find_one(filter, projection)
+
+    def lifter(self, platform, slot):
+        """Returns the "current" or "next" lifter for platform
+
+        :rtype: dict
+        """
+        document = self.find_one({'platform': platform})
+        if document is None:
+            logger.info(f"Could not find document for platform: {platform}")
+            raise DocumentNotFound(platform, "order")
+        return build_projection(document)[slot]
+
+    def replace(self, platform, order):
+        """Stores a full order for platform
+
+        :return: The new version of the order
+        :rtype: int
+        """
+        document = self._collection().find_one_and_update(
+            {'platform': platform}, {'$set': order, '$inc': {'version': 1}},
+            projection={'version': True}, upsert=True,
+            return_document=ReturnDocument.AFTER)
+        return document['version']
+
+    def update(self, platform, base_version, update, meet_data):
+        """Stores an order update, if the stored order is still at base_version
+
+        :param meet_data: meetData of the order after the update
+        :return: Whether the stored order was at base_version
+        :rtype: bool
+        """
+        result = self._collection().update_one(
+            {'platform': platform, 'version': base_version}, {'$set': update})
+        return result.matched_count > 0
+
+
+def meet_key(meet_data):
+    return (meet_data or {}).get('name') or ""
+
+
+def entry_digest(entry):
+    return digest(json.dumps(entry, sort_keys=True, separators=(',', ':'), default=str).encode())
+
+
+class NormalizedOrderStore:
+    """Slim per-platform order documents with entries in their own collection
+
+    Remembers a digest of every entry it has written per platform, so a
+    write only upserts the entries that changed since the last one. Entries
+    are written before the order document that references them and removed
+    after it, so a reader never finds an id without its entry.
+    """
+
+    def __init__(self, collection, entries_collection):
+        self._collection = collection
+        self._entriesCollection = entries_collection
+        self._written = {}
+        self._lock = threading.Lock()
+
+    def _assemble(self, document, entries):
+        """Puts the entries back into a slim order document"""
+        order = dict(document['order'])
+        entryIds = order.pop('entryIds', None)
+        if entryIds is None:
+            # Stored in the embedded layout, before the switch
+            return document
+        order['orderedEntries'] = [entries[entryId] for entryId in entryIds if entryId in entries]
+        return dict(document, order=order)
+
+    def find(self, filter):
+        documents = list(self._collection().find(filter))
+        entries = {}
+        if len(documents) > 0:
+            for stored in self._entriesCollection().find(
+                    {'platform': {'$in': [document['platform'] for document in documents]}}):
+                entries.setdefault((stored['meet'], stored['platform']), {})[stored['entryId']] = stored['entry']
+        return [self._assemble(document, entries.get(
+            (meet_key(document.get('meetData')), document['platform']), {})) for document in documents]
+
+    def find_one(self, filter, projection=None):
+        document = self._collection().find_one(filter, projection)
+        if document is None or projection is not None:
+            return document
+        stored = self._entriesCollection().find(
+            {'meet': meet_key(document.get('meetData')), 'platform': document['platform']})
+        return self._assemble(document, {entry['entryId']: entry['entry'] for entry in stored})
+
+    def lifter(self, platform, slot):
+        """Returns the "current" or "next" lifter for platform, reading only its entry
+
+        :rtype: dict
+        """
+        document = self._collection().find_one({'platform': platform})
+        if document is None:
+            logger.info(f"Could not find document for platform: {platform}")
+            raise DocumentNotFound(platform, "order")
+        order = document['order']
+        if 'entryIds' not in order:
+            return build_projection(document)[slot]
+        entryIds = order['entryIds']
+        entryId, attempt = lifter_slots(order, entryIds[-1] if len(entryIds) > 0 else None)[slot]
+        stored = None
+        if entryId is not None:
+            stored = self._entriesCollection().find_one({
+                'meet': meet_key(document.get('meetData')),
+                'platform': platform,
+                'entryId': entryId
+            })
+        return build_lifter(slot, order, attempt, stored['entry'] if stored is not None else None)
+
+    def replace(self, platform, order):
+        """Stores a full order for platform
+
+        :return: The new version of the order
+        :rtype: int
+        """
+        with self._lock:
+            written = self._write_entries(platform, order['meetData'], order['order']['orderedEntries'])
+            document = self._collection().find_one_and_update(
+                {'platform': platform}, {'$set': self._slim(order), '$inc': {'version': 1}},
+                projection={'version': True}, upsert=True,
+                return_document=ReturnDocument.AFTER)
+            self._remove_entries(platform, written)
+            return document['version']
+
+    def update(self, platform, base_version, update, meet_data):
+        """Stores an order update, if the stored order is still at base_version
+
+        :param meet_data: meetData of the order after the update
+        :return: Whether the stored order was at base_version
+        :rtype: bool
+        """
+        with self._lock:
+            # Claim the next version before writing any entry, so an update
+            # that lost to another leaves the stored entries alone
+            result = self._collection().update_one(
+                {'platform': platform, 'version': base_version},
+                {'$set': {'version': update['version']}})
+            if result.matched_count == 0:
+                return False
+            written = self._write_entries(platform, meet_data, update['order']['orderedEntries'])
+            self._collection().update_one(
+                {'platform': platform, 'version': update['version']}, {'$set': self._slim(update)})
+            self._remove_entries(platform, written)
+            return True
+
+    def _slim(self, document):
+        order = dict(document['order'])
+        order['entryIds'] = [entry['id'] for entry in order.pop('orderedEntries')]
+        return dict(document, order=order)
+
+    def _write_entries(self, platform, meet_data, entries):
+        """Bulk upserts the entries that changed since the last write for platform
+
+        :return: What was written, for _remove_entries
+        """
+        meet = meet_key(meet_data)
+        previous = self._written.pop(platform, None)
+        if previous is not None and previous['meet'] != meet:
+            previous = None
+        digests = {entry['id']: entry_digest(entry) for entry in entries}
+        known = previous['digests'] if previous is not None else {}
+        operations = [ReplaceOne(
+            {'meet': meet, 'platform': platform, 'entryId': entry['id']},
+            {'meet': meet, 'platform': platform, 'entryId': entry['id'], 'entry': entry},
+            upsert=True) for entry in entries if known.get(entry['id']) != digests[entry['id']]]
+        if len(operations) > 0:
+            self._entriesCollection().bulk_write(operations, ordered=False)
+        logger.info(
+            f"Wrote {len(operations)} of {len(entries)} entries for platform: {platform}")
+        return {'meet': meet, 'digests': digests, 'previous': previous}
+
+    def _remove_entries(self, platform, written):
+        """Removes the entries of platform the written order no longer references"""
+        previous = written['previous']
+        if previous is None:
+            self._entriesCollection().delete_many({'platform': platform, '$or': [
+                {'meet': {'$ne': written['meet']}},
+                {'entryId': {'$nin': list(written['digests'])}}
+            ]})
+        else:
+            removed = [entryId for entryId in previous['digests'] if entryId not in written['digests']]
+            if len(removed) > 0:
+                self._entriesCollection().delete_many(
+                    {'meet': written['meet'], 'platform': platform, 'entryId': {'$in': removed}})
+        self._written[platform] = {'meet': written['meet'], 'digests': written['digests']}
+
+
+def order_collection():
+    return storage.database()["order"]
+
+
+def entries_collection():
+    return storage.database()["order_entries"]
+
+
+if config.orderStorage == "normalized":
+    orderStore = NormalizedOrderStore(order_collection, entries_collection)
+else:
+    orderStore = EmbeddedOrderStore(order_collection)
+
+
+def stored_orders():
+    return orderStore
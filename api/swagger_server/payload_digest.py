@@ -0,0 +1,48 @@
+import hashlib
+import threading
+
+
+def digest(payload):
+    """Returns a content hash for a raw request body
+
+    :param payload: Raw request body
+    :type payload: bytes
+
+    :rtype: str
+    """
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+class PayloadDigests:
+    """Remembers the digest of the last payload accepted for each key
+
+    Lets a write endpoint acknowledge a repeated post without touching
+    MongoDB. Anything extra passed to remember() (e.g. the stored version)
+    is handed back by lookup() so the response can still report it.
+    """
+
+    def __init__(self):
+        self._digests = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, key, payload_digest):
+        """Returns the details remembered for key if payload_digest matches"""
+        with self._lock:
+            remembered = self._digests.get(key)
+        if remembered is not None and remembered[0] == payload_digest:
+            return remembered[1]
+        return None
+
+    def latest(self, key):
+        """Returns the digest of the last payload accepted for key, if any"""
+        with self._lock:
+            remembered = self._digests.get(key)
+        return remembered[0] if remembered is not None else None
+
+    def remember(self, key, payload_digest, **details):
+        with self._lock:
+            self._digests[key] = (payload_digest, details)
+
+    def forget(self, key):
+        with self._lock:
+            self._digests.pop(key, None)
@@ -0,0 +1,336 @@
+import math
+from decimal import ROUND_HALF_UP, Decimal
+from functools import lru_cache
+
+from swagger_server.config import logger
+
+# Ported from src/logic/coefficients, which in turn come from the
+# OpenPowerlifting coefficients module. Keep the arithmetic in the same
+# order as the TypeScript so both sides produce the same points.
+
+
+def wilks_poly(a, b, c, d, e, f, x):
+    x2 = x * x
+    x3 = x2 * x
+    x4 = x3 * x
+    x5 = x4 * x
+    return 500.0 / (a + b * x + c * x2 + d * x3 + e * x4 + f * x5)
+
+
+def wilks_men(bodyweight_kg):
+    normalized = min(max(bodyweight_kg, 40.0), 201.9)
+    return wilks_poly(-216.0475144, 16.2606339, -0.002388645, -0.00113732, 7.01863e-6, -1.291e-8, normalized)
+
+
+def wilks_women(bodyweight_kg):
+    normalized = min(max(bodyweight_kg, 26.51), 154.53)
+    return wilks_poly(594.31747775582, -27.23842536447, 0.82112226871, -0.00930733913,
+                      0.00004731582, -0.00000009054, normalized)
+
+
+def wilks2020_poly(a, b, c, d, e, f, x):
+    x2 = x * x
+    x3 = x2 * x
+    x4 = x3 * x
+    x5 = x4 * x
+    return 600.0 / (a + b * x + c * x2 + d * x3 + e * x4 + f * x5)
+
+
+def wilks2020_men(bodyweight_kg):
+    normalized = min(max(bodyweight_kg, 40.0), 200.95)
+    return wilks2020_poly(47.4617885411949, 8.47206137941125, 0.073694103462609, -0.00139583381094385,
+                          0.00000707665973070743, -0.0000000120804336482315, normalized)
+
+
+def wilks2020_women(bodyweight_kg):
+    normalized = min(max(bodyweight_kg, 40.0), 150.95)
+    return wilks2020_poly(-125.425539779509, 13.7121941940668, -0.0330725063103405, -0.0010504000506583,
+                          0.00000938773881462799, -0.000000023334613884954, normalized)
+
+
+def dots_poly(a, b, c, d, e, x):
+    x2 = x * x
+    x3 = x2 * x
+    x4 = x3 * x
+    return 500.0 / (a * x4 + b * x3 + c * x2 + d * x + e)
+
+
+def dots_men(bodyweight_kg):
+    adjusted = max(min(bodyweight_kg, 210.0), 40.0)
+    return dots_poly(-0.000001093, 0.0007391293, -0.1918759221, 24.0900756, -307.75076, adjusted)
+
+
+def dots_women(bodyweight_kg):
+    adjusted = max(min(bodyweight_kg, 150.0), 40.0)
+    return dots_poly(-0.0000010706, 0.0005158568, -0.1126655495, 13.6175032, -57.96288, adjusted)
+
+
+def ah_men(bodyweight_kg):
+    adjusted = min(max(bodyweight_kg, 32.0), 157.0)
+    return 3.2695 / math.pow(math.log10(adjusted), 1.95)
+
+
+def ah_women(bodyweight_kg):
+    adjusted = min(max(bodyweight_kg, 28.0), 112.0)
+    return 2.7566 / math.pow(math.log10(adjusted), 1.8)
+
+
+def reshel_men(bodyweight_kg):
+    normalized = min(max(bodyweight_kg, 50.0), 174.75)
+    return 23740.8329088123 * math.pow(normalized + -9.75618720662844, -2.68445158813578) + 0.787990994925928
+
+
+def reshel_women(bodyweight_kg):
+    normalized = min(max(bodyweight_kg, 40.0), 118.75)
+    return 239.894659799145 * math.pow(normalized + -20.5105859285582, -1.61417872668708) + 1.16052601684125
+
+
+def schwartz_coefficient(bodyweight_kg):
+    adjusted = min(max(bodyweight_kg, 40.0), 166.0)
+    if adjusted <= 126.0:
+        x0 = 0.631926 * 10.0
+        x1 = 0.262349 * adjusted
+        x2 = 0.51155 * math.pow(10.0, -2) * math.pow(adjusted, 2)
+        x3 = 0.519738 * math.pow(10.0, -4) * math.pow(adjusted, 3)
+        x4 = 0.267626 * math.pow(10.0, -6) * math.pow(adjusted, 4)
+        x5 = 0.540132 * math.pow(10.0, -9) * math.pow(adjusted, 5)
+        x6 = 0.728875 * math.pow(10.0, -13) * math.pow(adjusted, 6)
+        return x0 - x1 + x2 - x3 + x4 - x5 - x6
+    elif adjusted <= 136.0:
+        return 0.521 - 0.0012 * (adjusted - 125.0)
+    elif adjusted <= 146.0:
+        return 0.509 - 0.0011 * (adjusted - 135.0)
+    elif adjusted <= 156.0:
+        return 0.498 - 0.001 * (adjusted - 145.0)
+    return 0.4879 - 0.00088185 * (adjusted - 155.0)
+
+
+def malone_coefficient(bodyweight_kg):
+    adjusted = max(bodyweight_kg, 29.24)
+    return 106.011586323613 * math.pow(adjusted, -1.293027130579051) + 0.322935585328304
+
+
+def glossbrenner_men(bodyweight_kg):
+    if bodyweight_kg < 153.05:
+        return (schwartz_coefficient(bodyweight_kg) + wilks_men(bodyweight_kg)) / 2.0
+    return (schwartz_coefficient(bodyweight_kg) + -0.000821668402557 * bodyweight_kg + 0.676940740094416) / 2.0
+
+
+def glossbrenner_women(bodyweight_kg):
+    if bodyweight_kg < 106.3:
+        return (malone_coefficient(bodyweight_kg) + wilks_women(bodyweight_kg)) / 2.0
+    return (malone_coefficient(bodyweight_kg) + -0.000313738002024 * bodyweight_kg + 0.852664892884785) / 2.0
+
+
+# Formulas that are a bodyweight coefficient times the total, as
+# (men and Mx, women) coefficient functions. None means no points.
+coefficientFormulas = {
+    "AH": (ah_men, ah_women),
+    "Dots": (dots_men, dots_women),
+    "Glossbrenner": (glossbrenner_men, glossbrenner_women),
+    "Reshel": (reshel_men, reshel_women),
+    "Schwartz/Malone": (schwartz_coefficient, malone_coefficient),
+    "Wilks": (wilks_men, wilks_women),
+    "Wilks2020": (wilks2020_men, wilks2020_women),
+}
+
+
+@lru_cache(maxsize=4096)
+def coefficient(formula, sex, bodyweight_kg):
+    """Returns the bodyweight coefficient for one of coefficientFormulas
+
+    Cached, since a meet only has a few hundred distinct body weights and
+    every order write rescores every entry.
+
+    :rtype: float
+    """
+    men, women = coefficientFormulas[formula]
+    if sex == "F":
+        return women(bodyweight_kg)
+    if sex == "M" or (sex == "Mx" and formula != "Schwartz/Malone"):
+        return men(bodyweight_kg)
+    return 0.0
+
+
+ipfParameters = {
+    'M': {
+        'Sleeves': {
+            'SBD': [310.67, 857.785, 53.216, 147.0835],
+            'S': [123.1, 363.085, 25.1667, 75.4311],
+            'B': [86.4745, 259.155, 17.57845, 53.122],
+            'D': [103.5355, 244.765, 15.3714, 31.5022],
+        },
+        'Single-ply': {
+            'SBD': [387.265, 1121.28, 80.6324, 222.4896],
+            'S': [150.485, 446.445, 36.5155, 103.7061],
+            'B': [133.94, 441.465, 35.3938, 113.0057],
+            'D': [110.135, 263.66, 14.996, 23.011],
+        },
+    },
+    'F': {
+        'Sleeves': {
+            'SBD': [125.1435, 228.03, 34.5246, 86.8301],
+            'S': [50.479, 105.632, 19.1846, 56.2215],
+            'B': [25.0485, 43.848, 6.7172, 13.952],
+            'D': [47.136, 67.349, 9.1555, 13.67],
+        },
+        'Single-ply': {
+            'SBD': [176.58, 373.315, 48.4534, 110.0103],
+            'S': [74.6855, 171.585, 21.9475, 52.2948],
+            'B': [49.106, 124.209, 23.199, 67.4926],
+            'D': [51.002, 69.8265, 8.5802, 5.7258],
+        },
+    },
+}
+
+goodliftParameters = {
+    'M': {
+        'Sleeves': {
+            'SBD': [1199.72839, 1025.18162, 0.00921],
+            'B': [320.98041, 281.40258, 0.01008],
+        },
+        'Single-ply': {
+            'SBD': [1236.25115, 1449.21864, 0.01644],
+            'B': [381.22073, 733.79378, 0.02398],
+        },
+    },
+    'F': {
+        'Sleeves': {
+            'SBD': [610.32796, 1045.59282, 0.03048],
+            'B': [142.40398, 442.52671, 0.04724],
+        },
+        'Single-ply': {
+            'SBD': [758.63878, 949.31382, 0.02435],
+            'B': [221.82209, 357.00377, 0.02937],
+        },
+    },
+}
+
+
+def ipf_parameters(table, sex, equipment, event):
+    """Returns the IPF/GL parameters for an entry, None if they don't apply"""
+    if equipment == "Bare" or equipment == "Wraps":
+        equipment = "Sleeves"
+    elif equipment == "Multi-ply" or equipment == "Unlimited":
+        equipment = "Single-ply"
+    if sex == "Mx":
+        sex = "M"
+    return table.get(sex, {}).get(equipment, {}).get(event)
+
+
+def ipf_points(total_kg, bodyweight_kg, sex, equipment, event):
+    if total_kg == 0 or bodyweight_kg < 40:
+        return 0
+    params = ipf_parameters(ipfParameters, sex, equipment, event)
+    if params is None:
+        return 0
+    bwLog = math.log(bodyweight_kg)
+    mean = params[0] * bwLog - params[1]
+    dev = params[2] * bwLog - params[3]
+    if dev == 0:
+        return 0
+    points = 500 + (100 * (total_kg - mean)) / dev
+    if math.isnan(points) or points < 0:
+        return 0
+    return points
+
+
+def goodlift(total_kg, bodyweight_kg, sex, equipment, event):
+    if total_kg == 0 or bodyweight_kg < 40:
+        return 0
+    params = ipf_parameters(goodliftParameters, sex, equipment, event)
+    if params is None:
+        return 0
+    denom = params[0] - params[1] * math.exp(-1.0 * params[2] * bodyweight_kg)
+    glp = 0 if denom == 0 else max(0, (total_kg * 100.0) / denom)
+    if math.isnan(glp) or bodyweight_kg < 35:
+        return 0.0
+    return glp
+
+
+def get_points(formula, entry, event, total_kg, in_kg):
+    """Port of getPoints in src/logic/coefficients/coefficients.ts
+
+    :rtype: float
+    """
+    sex = entry.get('sex')
+    bodyweightKg = entry.get('bodyweightKg') or 0
+    if formula in coefficientFormulas:
+        if formula == "Dots" and (bodyweightKg == 0 or total_kg == 0):
+            return 0.0
+        return coefficient(formula, sex, bodyweightKg) * total_kg
+    if formula == "Bodyweight Multiple":
+        if bodyweightKg <= 0 or total_kg <= 0:
+            return 0
+        return total_kg / bodyweightKg
+    if formula == "IPF GL Points":
+        return goodlift(total_kg, bodyweightKg, sex, entry.get('equipment'), event)
+    if formula == "IPF Points":
+        return ipf_points(total_kg, bodyweightKg, sex, entry.get('equipment'), event)
+    if formula == "NASA Points":
+        if bodyweightKg < 30:
+            return 0
+        return (total_kg / bodyweightKg) * (0.00620912 * bodyweightKg + 0.565697)
+    if formula == "Total":
+        return total_kg if in_kg else total_kg * 2.20462262
+    return 0
+
+
+def projected_total_kg(entry):
+    """Port of getProjectedTotalKg in src/logic/entry.ts
+
+    Counts first attempts that haven't been taken yet, so points are
+    meaningful while lifters are still squatting and benching.
+
+    :rtype: float
+    """
+    total = 0.0
+    for lift in ('squat', 'bench', 'deadlift'):
+        weights = entry.get(f"{lift}Kg") or [0, 0, 0]
+        statuses = entry.get(f"{lift}Status") or [0, 0, 0]
+        best = 0.0
+        if statuses[0] >= 0:
+            best = max(best, weights[0])
+        if statuses[1] > 0:
+            best = max(best, weights[1])
+        if statuses[2] > 0:
+            best = max(best, weights[2])
+        if best == 0 and statuses[0] == -1:
+            return 0.0
+        total += best
+    return total
+
+
+def round_points(points):
+    """Rounds like displayPoints, half up on the exact value, to 2 places"""
+    if points == 0:
+        return 0
+    return float(Decimal(points).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP))
+
+
+def score_entries(meet_data, entries):
+    """Sets 'points' on every entry from the meet's formula
+
+    Uses the projected total and the entry's first event, like the
+    ProjectedPoints column of the lifting table did when it wrote points
+    into entries. Meets without a formula are left alone.
+
+    :param meet_data: meetData of the posted order
+    :type meet_data: dict
+    :param entries: orderedEntries, updated in place
+    :type entries: list
+
+    :rtype: int
+    :returns: Number of entries scored
+    """
+    formula = (meet_data or {}).get('formula')
+    if formula is None:
+        return 0
+    inKg = meet_data.get('inKg', True)
+    for entry in entries:
+        events = entry.get('events') or []
+        event = events[0] if len(events) > 0 else "SBD"
+        entry['points'] = round_points(
+            get_points(formula, entry, event, projected_total_kg(entry), inKg))
+    logger.debug(f"Scored {len(entries)} entries with formula: {formula}")
+    return len(entries)
@@ -0,0 +1,212 @@
+"""Bulk registrations import
+
+The request body arrives fully buffered, since connexion validates it
+before the controller runs. It is decoded one registration at a time,
+either from a JSON array or from newline-delimited JSON, and written with
+unordered bulk_write batches, so only a batch of decoded registrations is
+held at once rather than the whole roster as Python objects.
+"""
+
+import codecs
+import json
+import time
+
+from pymongo import UpdateOne, errors
+
+from swagger_server.config import logger
+
+chunkSize = 64 * 1024
+# Per-item errors beyond this are only counted in the report
+maxReportedErrors = 100
+
+_decoder = json.JSONDecoder()
+_whitespace = " \t\n\r"
+# Longest token that fails to decode when cut short, a \uXXXX escape pair
+_longestToken = 12
+
+
+def _chunks(stream):
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    while True:
+        chunk = stream.read(chunkSize)
+        if not chunk:
+            tail = decoder.decode(b"", final=True)
+            if tail:
+                yield tail
+            return
+        yield decoder.decode(chunk)
+
+
+def iter_json_array(stream):
+    """Yields the items of a JSON array read from stream, one at a time
+
+    :raises ValueError: If the body isn't a JSON array
+    """
+    chunks = _chunks(stream)
+    buffer = ""
+    position = 0
+    expecting = "["
+
+    def fill():
+        nonlocal buffer, position
+        chunk = next(chunks, None)
+        if chunk is None:
+            return False
+        buffer = buffer[position:] + chunk
+        position = 0
+        return True
+
+    while True:
+        while position < len(buffer) and buffer[position] in _whitespace:
+            position += 1
+        if position == len(buffer):
+            if not fill():
+                raise ValueError("Unexpected end of body, expected a JSON array")
+            continue
+        character = buffer[position]
+        if expecting == "[":
+            if character != "[":
+                raise ValueError("Body must be a JSON array of registrations")
+            position += 1
+            expecting = "first"
+        elif expecting in ("first", ",") and character == "]":
+            return
+        elif expecting == ",":
+            if character != ",":
+                raise ValueError(f"Expected ',' or ']' but found: {character!r}")
+            position += 1
+            expecting = "item"
+        else:
+            try:
+                item, end = _decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as e:
+                # Only an item cut off by the end of the buffer can still
+                # decode with the next chunk, anything else fails right away
+                if (e.msg.startswith("Unterminated string") or e.pos >= len(buffer) - _longestToken) \
+                        and fill():
+                    continue
+                raise
+            if end == len(buffer) and fill():
+                # A number may continue in the next chunk, decode it again
+                continue
+            position = end
+            expecting = ","
+            yield item
+
+
+def iter_json_lines(stream):
+    """Yields every line of newline-delimited JSON, or the error decoding it"""
+    remainder = ""
+    for chunk in _chunks(stream):
+        lines = (remainder + chunk).split("\n")
+        remainder = lines.pop()
+        for line in lines:
+            if line.strip():
+                yield _decode_line(line)
+    if remainder.strip():
+        yield _decode_line(remainder)
+
+
+def _decode_line(line):
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return e
+
+
+class ImportReport:
+    """Counts and per-item errors of one import"""
+
+    def __init__(self):
+        self.received = 0
+        self.inserted = 0
+        self.updated = 0
+        self.failed = 0
+        self.batches = 0
+        self.errors = []
+        self._started = time.perf_counter()
+
+    def fail(self, index, registration_id, message):
+        self.failed += 1
+        if len(self.errors) < maxReportedErrors:
+            self.errors.append({'index': index, 'id': registration_id, 'message': message})
+
+    def to_dict(self, message=None):
+        return {
+            'status': "ok" if self.failed == 0 and message is None else "fail",
+            'message': message or f"Imported {self.inserted + self.updated} of {self.received} registrations",
+            'received': self.received,
+            'inserted': self.inserted,
+            'updated': self.updated,
+            'failed': self.failed,
+            'batches': self.batches,
+            'seconds': round(time.perf_counter() - self._started, 3),
+            'errors': self.errors
+        }
+
+
+def _write_batch(collection, batch, report):
+    operations = []
+    indexes = []
+    for index, registration in batch:
+        report.received += 1
+        if isinstance(registration, ValueError):
+            report.fail(index, None, f"Malformed JSON: {registration}")
+        elif not isinstance(registration, dict) or registration.get('id') is None:
+            report.fail(index, None, "Registration must be an object with an id")
+        else:
+            operations.append(UpdateOne(
+                {'id': registration['id']}, {'$set': registration}, upsert=True))
+            indexes.append((index, registration['id']))
+    if len(operations) == 0:
+        return
+    report.batches += 1
+    try:
+        result = collection.bulk_write(operations, ordered=False)
+        report.inserted += result.upserted_count
+        report.updated += result.matched_count
+    except errors.BulkWriteError as e:
+        details = e.details
+        report.inserted += details.get('nUpserted', 0)
+        report.updated += details.get('nMatched', 0)
+        for writeError in details.get('writeErrors', []):
+            index, registrationId = indexes[writeError['index']]
+            report.fail(index, registrationId, writeError.get('errmsg', "Write failed"))
+
+
+def import_registrations(collection, records, batch_size):
+    """Upserts registrations by id in unordered bulk batches
+
+    :param collection: Registrations collection
+    :param records: Registrations, or the ValueError decoding one
+    :type records: Iterable
+    :param batch_size: Registrations per bulk_write
+    :type batch_size: int
+
+    :rtype: dict
+    """
+    report = ImportReport()
+    batch = []
+    message = None
+    records = enumerate(records)
+    while True:
+        try:
+            index, record = next(records)
+        except StopIteration:
+            break
+        except ValueError as e:
+            message = f"Malformed body after {report.received + len(batch)} registrations: {e}"
+            break
+        batch.append((index, record))
+        if len(batch) >= batch_size:
+            _write_batch(collection, batch, report)
+            batch = []
+    if len(batch) > 0:
+        _write_batch(collection, batch, report)
+    if message is not None:
+        logger.info(f"Stopped importing registrations: {message}")
+        return report.to_dict(message)
+    logger.info(
+        f"Imported {report.received} registrations in {report.batches} batches, "
+        f"{report.inserted} inserted, {report.updated} updated, {report.failed} failed")
+    return report.to_dict()
@@ -0,0 +1,73 @@
+import time
+
+import flask
+
+from swagger_server import metrics, mongo_monitor
+
+
+def operation_id(endpoint):
+    """Returns the operationId connexion registered endpoint for
+
+    connexion names endpoints "<blueprint>.<controller module>_<operationId>"
+    with the dots in the module path replaced by underscores.
+
+    :rtype: str
+    """
+    if endpoint is None:
+        return None
+    name = endpoint.rsplit(".", 1)[-1]
+    if "_controller_" in name:
+        return name.split("_controller_", 1)[1]
+    return name
+
+
+def add_serialize_time(seconds):
+    """Adds time spent encoding the response body to the current request"""
+    if flask.has_request_context():
+        flask.g.serializeSeconds = flask.g.get('serializeSeconds', 0.0) + seconds
+
+
+def server_timing(total, database, serialize):
+    """Returns a Server-Timing header value splitting total into db, compute and serialize
+
+    :param total: Seconds taken by the whole request
+    :param database: What the request spent in MongoDB
+    :type database: swagger_server.mongo_monitor.RequestTiming
+    :param serialize: Seconds taken to encode the response body
+    :rtype: str
+    """
+    compute = max(total - database.seconds - serialize, 0.0)
+    return (f'db;dur={database.seconds * 1000:.2f};desc="{database.describe()}", '
+            f"compute;dur={compute * 1000:.2f}, "
+            f"serialize;dur={serialize * 1000:.2f}")
+
+
+def start_timer():
+    flask.g.requestStarted = time.perf_counter()
+    mongo_monitor.begin_request()
+
+
+def observe_request(response):
+    started = flask.g.pop('requestStarted', None)
+    database = mongo_monitor.end_request()
+    if started is None or database is None:
+        return response
+    total = time.perf_counter() - started
+    request = flask.request
+    operation = operation_id(request.endpoint) or "unmatched"
+    platform = (request.view_args or {}).get('platform', "")
+    metrics.requestLatency.observe(
+        total, operation=operation, method=request.method,
+        status=response.status_code, platform=platform)
+    metrics.requestDatabaseLatency.observe(database.seconds, operation=operation)
+    if request.content_length:
+        metrics.payloadSize.observe(request.content_length, operation=operation)
+    response.headers['Server-Timing'] = server_timing(
+        total, database, flask.g.pop('serializeSeconds', 0.0))
+    return response
+
+
+def register(app):
+    """Times every request handled by the Flask app and adds a Server-Timing header"""
+    app.before_request(start_timer)
+    app.after_request(observe_request)
@@ -0,0 +1,103 @@
+"""Startup phases
+
+Every phase of starting the API is timed from the moment this module is
+imported, which swagger_server.__main__ does first, so
+
+    python3 -m swagger_server --profile-startup
+
+can report where the time goes before serving anything.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+started = time.perf_counter()
+phases = []
+_depth = threading.local()
+
+
+@contextmanager
+def phase(name):
+    """Times the block as a startup phase, indented under any phase it runs in"""
+    depth = getattr(_depth, 'value', 0)
+    _depth.value = depth + 1
+    began = time.perf_counter()
+    try:
+        yield
+    finally:
+        _depth.value = depth
+        phases.append((depth, name, time.perf_counter() - began))
+
+
+def record(name, seconds):
+    phases.append((getattr(_depth, 'value', 0), name, seconds))
+
+
+def elapsed():
+    """Returns the seconds since startup began
+
+    :rtype: float
+    """
+    return time.perf_counter() - started
+
+
+def report():
+    """Returns a table of the startup phases, in the order they finished
+
+    :rtype: str
+    """
+    total = elapsed()
+    lines = [f"{'phase':<32} {'ms':>9} {'share':>7}"]
+    for depth, name, seconds in phases:
+        lines.append(f"{'  ' * depth + name:<32} {seconds * 1000:>9.1f} {seconds / total:>7.1%}")
+    lines.append(f"{'total':<32} {total * 1000:>9.1f}")
+    return "\n".join(lines)
+
+
+def _render_specification(contents, arguments):
+    import jinja2
+    import yaml
+
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    return yaml.load(jinja2.Template(contents.decode()).render(**arguments), Loader=loader)
+
+
+def load_specification(path, arguments, cache_path):
+    """Returns the OpenAPI specification at path rendered with arguments, as a dict
+
+    The rendered specification is kept as JSON at cache_path together with
+    a digest of the YAML and the arguments, so starting again with the same
+    specification skips Jinja2 and YAML parsing. Only the rendering is
+    cached: connexion still resolves the $refs and builds its validators on
+    every start. An empty cache_path or a cache that can't be read or
+    written only costs the parsing.
+
+    :rtype: dict
+    """
+    with open(path, "rb") as specification:
+        contents = specification.read()
+    key = hashlib.blake2b(
+        contents + json.dumps(arguments, sort_keys=True).encode(), digest_size=16).hexdigest()
+    if cache_path:
+        try:
+            with open(cache_path) as cache:
+                cached = json.load(cache)
+            if cached.get('key') == key:
+                return cached['specification']
+        except (OSError, ValueError):
+            pass
+    rendered = _render_specification(contents, arguments)
+    if cache_path:
+        temporary = f"{cache_path}.{os.getpid()}"
+        try:
+            with open(temporary, "w") as cache:
+                json.dump({'key': key, 'specification': rendered}, cache, separators=(',', ':'))
+            os.replace(temporary, cache_path)
+        except (OSError, TypeError):
+            if os.path.exists(temporary):
+                os.remove(temporary)
+    return rendered
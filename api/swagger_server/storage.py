@@ -0,0 +1,758 @@
+"""Storage backends
+
+Every collection the API uses is reached through database(), which
+returns the backend selected by STORAGE_BACKEND:
+
+"mongodb" (the default) is the MongoDB database from the config.
+
+"memory" keeps every collection in this process. Nothing survives a
+restart, which suits tests and trying the API out.
+
+"sqlite" keeps every collection in a table of the SQLite database at
+SQLITE_PATH, in WAL mode so reads don't wait for writes. It needs no
+server, for a single-node meet on one laptop.
+
+The memory and SQLite backends answer the subset of the pymongo
+collection API this package uses: equality, $in, $nin, $ne, $exists,
+range and $or filters, inclusion or exclusion projections, sorting, the
+$set, $setOnInsert, $unset, $inc, $min, $max and $push updates, upserts,
+bulk writes and unique indexes. They raise the same pymongo errors.
+"""
+
+import base64
+import copy
+import json
+import queue
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from bson import ObjectId
+from pymongo import DeleteMany, DeleteOne, InsertOne, ReplaceOne, ReturnDocument, UpdateOne, errors
+
+from swagger_server import metrics, mongo_monitor
+from swagger_server.config import Config, logger
+
+config = Config()
+
+_operatorKey = re.compile(r"^\$")
+_plainKey = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_sqlComparisons = {'$lt': "<", '$lte': "<=", '$gt': ">", '$gte': ">="}
+
+
+class _Result:
+    """Counts of a write, named as on the pymongo result classes"""
+
+    acknowledged = True
+
+    def __init__(self, **counts):
+        self.__dict__.update(counts)
+
+
+def lookup(document, key):
+    """Returns whether document has the dotted key, and its value
+
+    :rtype: Tuple[bool, object]
+    """
+    value = document
+    for part in key.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return False, None
+        value = value[part]
+    return True, value
+
+
+def _is_operators(condition):
+    return isinstance(condition, dict) and len(condition) > 0 and \
+        all(_operatorKey.match(key) for key in condition)
+
+
+def _equals(found, value, condition):
+    if not found:
+        return condition is None
+    if value == condition and type(value) is not bool and type(condition) is not bool:
+        return True
+    if isinstance(value, bool) or isinstance(condition, bool):
+        return value is condition
+    return isinstance(value, list) and not isinstance(condition, list) and condition in value
+
+
+def _compare(operator, found, value, operand):
+    if operator == "$eq":
+        return _equals(found, value, operand)
+    if operator == "$ne":
+        return not _equals(found, value, operand)
+    if operator == "$in":
+        return any(_equals(found, value, candidate) for candidate in operand)
+    if operator == "$nin":
+        return not any(_equals(found, value, candidate) for candidate in operand)
+    if operator == "$exists":
+        return found == bool(operand)
+    if operator in _sqlComparisons:
+        if not found or value is None or operand is None:
+            return False
+        try:
+            if operator == "$lt":
+                return value < operand
+            if operator == "$lte":
+                return value <= operand
+            if operator == "$gt":
+                return value > operand
+            return value >= operand
+        except TypeError:
+            return False
+    raise errors.OperationFailure(f"Unsupported query operator: {operator}")
+
+
+def matches(document, filter):
+    """Returns whether document matches a MongoDB filter
+
+    :rtype: bool
+    """
+    for key, condition in (filter or {}).items():
+        if key == "$or":
+            if not any(matches(document, clause) for clause in condition):
+                return False
+        elif key == "$and":
+            if not all(matches(document, clause) for clause in condition):
+                return False
+        elif _operatorKey.match(key):
+            raise errors.OperationFailure(f"Unsupported query operator: {key}")
+        else:
+            found, value = lookup(document, key)
+            if _is_operators(condition):
+                if not all(_compare(operator, found, value, operand)
+                           for operator, operand in condition.items()):
+                    return False
+            elif not _equals(found, value, condition):
+                return False
+    return True
+
+
+def project(document, projection):
+    """Returns the fields of document a find projection selects
+
+    :rtype: dict
+    """
+    if not projection:
+        return document
+    if isinstance(projection, (list, tuple)):
+        projection = {key: True for key in projection}
+    included = [key for key, value in projection.items() if value and key != "_id"]
+    if len(included) > 0:
+        projected = {key: document[key] for key in included if key in document}
+        if projection.get('_id', True) and '_id' in document:
+            projected['_id'] = document['_id']
+        return projected
+    return {key: value for key, value in document.items() if projection.get(key, True)}
+
+
+def _set(document, key, value):
+    """Sets the dotted key, copying the dicts on the way instead of changing them"""
+    parts = key.split(".")
+    for part in parts[:-1]:
+        child = document.get(part)
+        child = dict(child) if isinstance(child, dict) else {}
+        document[part] = child
+        document = child
+    document[parts[-1]] = value
+
+
+def _unset(document, key):
+    parts = key.split(".")
+    for part in parts[:-1]:
+        child = document.get(part)
+        if not isinstance(child, dict):
+            return
+        child = dict(child)
+        document[part] = child
+        document = child
+    document.pop(parts[-1], None)
+
+
+def apply_update(document, update, inserting=False):
+    """Returns a copy of document with the update operators applied
+
+    document itself is left as it was, so it can still be returned or
+    restored when the write fails.
+
+    :rtype: dict
+    """
+    updated = dict(document)
+    for operator, fields in update.items():
+        for key, operand in fields.items():
+            found, value = lookup(updated, key)
+            if operator == "$set" or (operator == "$setOnInsert" and inserting):
+                _set(updated, key, operand)
+            elif operator == "$setOnInsert":
+                continue
+            elif operator == "$unset":
+                _unset(updated, key)
+            elif operator == "$inc":
+                _set(updated, key, (value if found else 0) + operand)
+            elif operator == "$max":
+                if not found or value is None or operand > value:
+                    _set(updated, key, operand)
+            elif operator == "$min":
+                if not found or value is None or operand < value:
+                    _set(updated, key, operand)
+            elif operator == "$push":
+                items = operand['$each'] if _is_operators(operand) else [operand]
+                _set(updated, key, list(value if found else []) + list(items))
+            else:
+                raise errors.OperationFailure(f"Unsupported update operator: {operator}")
+    return updated
+
+
+def upsert_document(filter, update, replacement=False):
+    """Returns the document an upsert inserts when nothing matches filter
+
+    :rtype: dict
+    """
+    document = {}
+    if not replacement:
+        for key, condition in filter.items():
+            if not _operatorKey.match(key) and not _is_operators(condition):
+                _set(document, key, condition)
+        document = apply_update(document, update, inserting=True)
+    else:
+        document = dict(update)
+        if '_id' in filter and not _is_operators(filter['_id']):
+            document.setdefault('_id', filter['_id'])
+    document.setdefault('_id', ObjectId())
+    return document
+
+
+_typeOrder = {type(None): 0, int: 1, float: 1, str: 2, dict: 3, list: 4, bytes: 5, ObjectId: 6, bool: 7}
+
+
+def _sort_value(value):
+    return (_typeOrder.get(type(value), 5 if isinstance(value, bytes) else 8), value)
+
+
+def sort_documents(documents, sort):
+    """Sorts documents in place by a pymongo sort specification"""
+    for key, direction in reversed(sort):
+        try:
+            documents.sort(key=lambda document: _sort_value(lookup(document, key)[1]),
+                           reverse=direction < 0)
+        except TypeError:
+            documents.sort(key=lambda document: repr(lookup(document, key)[1]),
+                           reverse=direction < 0)
+
+
+def index_name(keys):
+    return "_".join(f"{key}_{direction}" for key, direction in keys)
+
+
+def duplicate_key(collection, name, key):
+    return errors.DuplicateKeyError(
+        f"E11000 duplicate key error collection: {collection} index: {name} dup key: {key}", 11000)
+
+
+class _Collection:
+    """pymongo collection methods on top of a few storage primitives
+
+    Subclasses select, insert, replace and delete whole documents, and
+    make _transaction() exclusive, so every write here reads and changes
+    documents atomically.
+    """
+
+    backend = None
+
+    def __init__(self, name):
+        self.name = name
+
+    @contextmanager
+    def _timed(self, command):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            metrics.storageLatency.observe(
+                seconds, backend=self.backend, collection=self.name, command=command)
+            mongo_monitor.add_request_time(command, seconds)
+
+    def find(self, filter=None, projection=None, sort=None, limit=0):
+        with self._timed("find"):
+            return [self._output(document, projection)
+                    for document in self._select(filter or {}, sort, limit)]
+
+    def find_one(self, filter=None, projection=None, sort=None):
+        with self._timed("find"):
+            documents = self._select(filter or {}, sort, 1)
+            return self._output(documents[0], projection) if len(documents) > 0 else None
+
+    def insert_one(self, document):
+        with self._timed("insert"), self._transaction():
+            document.setdefault('_id', ObjectId())
+            self._insert(self._own(document))
+        return _Result(inserted_id=document['_id'])
+
+    def update_one(self, filter, update, upsert=False):
+        with self._timed("update"), self._transaction():
+            return self._update_one(filter, update, upsert)
+
+    def replace_one(self, filter, replacement, upsert=False):
+        with self._timed("update"), self._transaction():
+            return self._update_one(filter, replacement, upsert, replacement=True)
+
+    def find_one_and_update(self, filter, update, projection=None, sort=None, upsert=False,
+                            return_document=ReturnDocument.BEFORE):
+        with self._timed("findAndModify"), self._transaction():
+            documents = self._select(filter, sort, 1)
+            if len(documents) == 0:
+                if not upsert:
+                    return None
+                document = upsert_document(self._own(filter), self._own(update))
+                self._insert(document)
+                return self._output(document, projection) if return_document else None
+            before = documents[0]
+            after = apply_update(before, self._own(update))
+            self._replace(before, after)
+            return self._output(after if return_document else before, projection)
+
+    def delete_many(self, filter):
+        with self._timed("delete"), self._transaction():
+            documents = self._select(filter, None, 0)
+            self._delete(documents)
+        return _Result(deleted_count=len(documents))
+
+    def bulk_write(self, requests, ordered=True):
+        inserted = matched = modified = removed = 0
+        upserted = []
+        writeErrors = []
+        with self._timed("bulkWrite"), self._transaction():
+            for index, request in enumerate(requests):
+                try:
+                    if isinstance(request, (UpdateOne, ReplaceOne)):
+                        result = self._update_one(request._filter, request._doc, request._upsert,
+                                                  replacement=isinstance(request, ReplaceOne))
+                        matched += result.matched_count
+                        modified += result.modified_count
+                        if result.upserted_id is not None:
+                            upserted.append({'index': index, '_id': result.upserted_id})
+                    elif isinstance(request, InsertOne):
+                        request._doc.setdefault('_id', ObjectId())
+                        self._insert(self._own(request._doc))
+                        inserted += 1
+                    elif isinstance(request, (DeleteOne, DeleteMany)):
+                        documents = self._select(
+                            request._filter, None, 1 if isinstance(request, DeleteOne) else 0)
+                        self._delete(documents)
+                        removed += len(documents)
+                    else:
+                        raise TypeError(f"Unsupported bulk write request: {request!r}")
+                except errors.DuplicateKeyError as e:
+                    writeErrors.append({'index': index, 'code': e.code, 'errmsg': str(e)})
+                    if ordered:
+                        break
+        if len(writeErrors) > 0:
+            raise errors.BulkWriteError({
+                'writeErrors': writeErrors, 'writeConcernErrors': [],
+                'nInserted': inserted, 'nUpserted': len(upserted), 'nMatched': matched,
+                'nModified': modified, 'nRemoved': removed, 'upserted': upserted
+            })
+        return _Result(inserted_count=inserted, matched_count=matched, modified_count=modified,
+                       deleted_count=removed, upserted_count=len(upserted),
+                       upserted_ids={item['index']: item['_id'] for item in upserted})
+
+    def _update_one(self, filter, update, upsert, replacement=False):
+        documents = self._select(filter, None, 1)
+        update = self._own(update)
+        if len(documents) == 0:
+            if not upsert:
+                return _Result(matched_count=0, modified_count=0, upserted_id=None)
+            document = upsert_document(self._own(filter), update, replacement)
+            self._insert(document)
+            return _Result(matched_count=0, modified_count=0, upserted_id=document['_id'])
+        before = documents[0]
+        if replacement:
+            after = dict(update, _id=before['_id'])
+        else:
+            after = apply_update(before, update)
+        if after == before:
+            return _Result(matched_count=1, modified_count=0, upserted_id=None)
+        self._replace(before, after)
+        return _Result(matched_count=1, modified_count=1, upserted_id=None)
+
+    def _own(self, value):
+        """Returns value as the collection may keep it, unshared with the caller"""
+        return value
+
+    def _output(self, document, projection):
+        """Returns a stored document as find hands it to the caller"""
+        return project(document, projection)
+
+
+class _MemoryIndex:
+
+    def __init__(self, keys, unique):
+        self.keys = [key for key, _ in keys]
+        self.unique = unique
+        self.entries = {}
+
+    def key(self, document):
+        return tuple(_hashable(lookup(document, key)[1]) for key in self.keys)
+
+
+def _hashable(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, sort_keys=True, default=str)
+    return value
+
+
+def _indexable(condition):
+    return condition is None or isinstance(condition, (str, int, float, ObjectId))
+
+
+class MemoryCollection(_Collection):
+    """A collection held in a dict of documents by _id
+
+    Documents are copied on the way in and out, so callers can't change
+    what is stored, and writes replace a stored document instead of
+    changing it. Indexes map the values of their keys to document ids and
+    are used for equality and $in filters on all of their keys, which are
+    expected to hold single values, not arrays.
+    """
+
+    backend = "memory"
+
+    def __init__(self, name):
+        super().__init__(name)
+        self._documents = {}
+        self._indexes = {}
+        self._lock = threading.RLock()
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            yield
+
+    def _own(self, value):
+        return copy.deepcopy(value)
+
+    def _output(self, document, projection):
+        return copy.deepcopy(project(document, projection))
+
+    def create_index(self, keys, name=None, unique=False, **kwargs):
+        if isinstance(keys, str):
+            keys = [(keys, 1)]
+        name = name or index_name(keys)
+        with self._timed("createIndexes"), self._lock:
+            if name in self._indexes:
+                return name
+            index = _MemoryIndex(keys, unique)
+            for documentId, document in self._documents.items():
+                key = index.key(document)
+                if unique and key in index.entries:
+                    raise duplicate_key(self.name, name, key)
+                index.entries.setdefault(key, set()).add(documentId)
+            self._indexes[name] = index
+        return name
+
+    def _candidates(self, filter):
+        if '_id' in filter and _indexable(filter['_id']):
+            document = self._documents.get(filter['_id'])
+            return [document] if document is not None else []
+        for index in self._indexes.values():
+            conditions = [filter.get(key, ()) for key in index.keys]
+            if all(_indexable(condition) for condition in conditions):
+                return [self._documents[documentId]
+                        for documentId in index.entries.get(tuple(conditions), ())]
+            if len(index.keys) == 1 and isinstance(conditions[0], dict) and \
+                    list(conditions[0]) == ['$in'] and all(_indexable(value) for value in conditions[0]['$in']):
+                ids = set()
+                for value in conditions[0]['$in']:
+                    ids.update(index.entries.get((value,), ()))
+                return [self._documents[documentId] for documentId in ids]
+        return list(self._documents.values())
+
+    def _select(self, filter, sort, limit):
+        with self._lock:
+            documents = [document for document in self._candidates(filter) if matches(document, filter)]
+        if sort:
+            sort_documents(documents, sort)
+        return documents[:limit] if limit else documents
+
+    def _check_unique(self, document):
+        for name, index in self._indexes.items():
+            if index.unique:
+                key = index.key(document)
+                if any(existing != document['_id'] for existing in index.entries.get(key, ())):
+                    raise duplicate_key(self.name, name, key)
+
+    def _insert(self, document):
+        if document['_id'] in self._documents:
+            raise duplicate_key(self.name, "_id_", document['_id'])
+        self._check_unique(document)
+        self._documents[document['_id']] = document
+        for index in self._indexes.values():
+            index.entries.setdefault(index.key(document), set()).add(document['_id'])
+
+    def _replace(self, before, after):
+        self._check_unique(after)
+        self._delete([before])
+        self._insert(after)
+
+    def _delete(self, documents):
+        for document in documents:
+            del self._documents[document['_id']]
+            for index in self._indexes.values():
+                key = index.key(document)
+                ids = index.entries.get(key)
+                ids.discard(document['_id'])
+                if len(ids) == 0:
+                    del index.entries[key]
+
+
+class MemoryDatabase:
+    """Collections kept in this process, lost when it exits"""
+
+    def __init__(self):
+        self._collections = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name):
+        with self._lock:
+            if name not in self._collections:
+                self._collections[name] = MemoryCollection(name)
+            return self._collections[name]
+
+
+def _encode_value(value):
+    if isinstance(value, bytes):
+        return {'$binary': base64.b64encode(value).decode('ascii')}
+    if isinstance(value, ObjectId):
+        return {'$oid': str(value)}
+    return str(value)
+
+
+def _decode_value(value):
+    if len(value) == 1:
+        if '$binary' in value:
+            return base64.b64decode(value['$binary'])
+        if '$oid' in value:
+            return ObjectId(value['$oid'])
+    return value
+
+
+def encode(value):
+    return json.dumps(value, separators=(',', ':'), default=_encode_value)
+
+
+def decode(text):
+    return json.loads(text, object_hook=_decode_value)
+
+
+def _quote(identifier):
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _field(key):
+    return f"json_extract(document, '$.{key}')"
+
+
+def _sql_value(value):
+    return value is None or isinstance(value, (str, int, float))
+
+
+class SqliteCollection(_Collection):
+    """A collection stored as JSON documents in one SQLite table
+
+    The parts of a filter that compare plain fields with plain values are
+    answered by SQL on json_extract, which the indexes made by
+    create_index cover. The rest of the filter, sorting and limits are
+    then applied to the decoded documents. A field compared in SQL is
+    expected to hold single values, not arrays.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, database, name):
+        super().__init__(name)
+        self._database = database
+        self._table = _quote(name)
+
+    def _transaction(self):
+        return self._database.transaction()
+
+    def create_index(self, keys, name=None, unique=False, **kwargs):
+        if isinstance(keys, str):
+            keys = [(keys, 1)]
+        name = name or index_name(keys)
+        columns = ", ".join(
+            f"{_field(key)}{' DESC' if direction < 0 else ''}" for key, direction in keys)
+        with self._timed("createIndexes"), self._database.transaction() as connection:
+            try:
+                connection.execute(
+                    f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS "
+                    f"{_quote(self.name + '.' + name)} ON {self._table} ({columns})")
+            except sqlite3.IntegrityError:
+                raise duplicate_key(self.name, name, keys)
+        return name
+
+    def _where(self, filter):
+        """Returns the SQL for the plain parts of filter, and whether that is all of it"""
+        clauses = []
+        parameters = []
+        complete = True
+        for key, condition in filter.items():
+            if key == "_id" and not _is_operators(condition):
+                clauses.append("_id = ?")
+                parameters.append(encode(condition))
+            elif not _plainKey.match(key):
+                complete = False
+            elif condition is None:
+                clauses.append(f"{_field(key)} IS NULL")
+            elif _sql_value(condition) and not isinstance(condition, bool):
+                clauses.append(f"{_field(key)} = ?")
+                parameters.append(condition)
+            elif _is_operators(condition):
+                for operator, operand in condition.items():
+                    if operator in _sqlComparisons and _sql_value(operand) and \
+                            operand is not None and not isinstance(operand, bool):
+                        clauses.append(f"{_field(key)} {_sqlComparisons[operator]} ?")
+                        parameters.append(operand)
+                    elif operator == "$in" and all(_sql_value(value) and value is not None and
+                                                   not isinstance(value, bool) for value in operand):
+                        clauses.append(f"{_field(key)} IN ({', '.join('?' * len(operand))})"
+                                       if len(operand) > 0 else "0")
+                        parameters.extend(operand)
+                    else:
+                        complete = False
+            else:
+                complete = False
+        return " AND ".join(clauses) or "1", parameters, complete
+
+    def _select(self, filter, sort, limit):
+        where, parameters, complete = self._where(filter)
+        query = f"SELECT document FROM {self._table} WHERE {where}"
+        pushed = complete and all(_plainKey.match(key) for key, _ in sort or ())
+        if pushed and sort:
+            query += " ORDER BY " + ", ".join(
+                f"{_field(key)}{' DESC' if direction < 0 else ''}" for key, direction in sort)
+        if pushed and limit:
+            query += f" LIMIT {int(limit)}"
+        with self._database.connection() as connection:
+            rows = connection.execute(query, parameters).fetchall()
+        documents = [decode(row[0]) for row in rows]
+        if pushed:
+            return documents
+        documents = [document for document in documents if matches(document, filter)]
+        if sort:
+            sort_documents(documents, sort)
+        return documents[:limit] if limit else documents
+
+    def _insert(self, document):
+        with self._database.connection() as connection:
+            try:
+                connection.execute(
+                    f"INSERT INTO {self._table} (_id, document) VALUES (?, ?)",
+                    (encode(document['_id']), encode(document)))
+            except sqlite3.IntegrityError as e:
+                raise duplicate_key(self.name, str(e), document['_id'])
+
+    def _replace(self, before, after):
+        with self._database.connection() as connection:
+            try:
+                connection.execute(
+                    f"UPDATE {self._table} SET document = ? WHERE _id = ?",
+                    (encode(after), encode(before['_id'])))
+            except sqlite3.IntegrityError as e:
+                raise duplicate_key(self.name, str(e), after['_id'])
+
+    def _delete(self, documents):
+        ids = [encode(document['_id']) for document in documents]
+        with self._database.connection() as connection:
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                connection.execute(
+                    f"DELETE FROM {self._table} WHERE _id IN ({', '.join('?' * len(chunk))})", chunk)
+
+
+class SqliteDatabase:
+    """Collections stored in a SQLite database file in WAL mode
+
+    Connections are pooled and shared between threads, one at a time.
+    Writes run in BEGIN IMMEDIATE transactions, so a read-modify-write
+    such as an upsert is atomic, while readers keep reading the last
+    committed state.
+    """
+
+    def __init__(self, path, timeout=5):
+        self._path = path
+        self._timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._local = threading.local()
+        self._collections = {}
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        connection = sqlite3.connect(
+            self._path, timeout=self._timeout, isolation_level=None, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    @contextmanager
+    def connection(self):
+        """Yields this thread's connection, from the pool unless it already holds one"""
+        current = getattr(self._local, 'connection', None)
+        if current is not None:
+            yield current
+            return
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            connection = self._connect()
+        self._local.connection = connection
+        try:
+            yield connection
+        finally:
+            self._local.connection = None
+            self._idle.put(connection)
+
+    @contextmanager
+    def transaction(self):
+        with self.connection() as connection:
+            if connection.in_transaction:
+                yield connection
+                return
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+                connection.execute("COMMIT")
+            except BaseException:
+                if connection.in_transaction:
+                    connection.execute("ROLLBACK")
+                raise
+
+    def __getitem__(self, name):
+        with self._lock:
+            if name not in self._collections:
+                with self.transaction() as connection:
+                    connection.execute(
+                        f"CREATE TABLE IF NOT EXISTS {_quote(name)} "
+                        "(_id TEXT PRIMARY KEY, document TEXT NOT NULL)")
+                self._collections[name] = SqliteCollection(self, name)
+            return self._collections[name]
+
+
+if config.storageBackend == "memory":
+    backend = MemoryDatabase()
+elif config.storageBackend == "sqlite":
+    backend = SqliteDatabase(config.sqlitePath)
+    logger.info(f"Storing collections in SQLite database: {config.sqlitePath}")
+else:
+    backend = None
+
+
+def database():
+    """Returns the configured database, which hands out collections by name"""
+    if backend is None:
+        return config.mongodbClient[config.mongodbDatabaseName]
+    return backend
@@ -0,0 +1,43 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import unittest
+
+from swagger_server.backup_buffer import BackupWriteBehind
+
+
+class TestBackupWriteBehind(unittest.TestCase):
+    """BackupWriteBehind unit tests"""
+
+    def test_only_latest_state_is_flushed(self):
+        written = []
+        buffer = BackupWriteBehind(
+            lambda meet, state: written.append((meet, state)), 60)
+        buffer.submit('meet', {'version': 1})
+        buffer.submit('meet', {'version': 2})
+        buffer.submit('other', {'version': 1})
+        self.assertEqual(buffer.pending('meet'), {'version': 2})
+        buffer.flush()
+        self.assertEqual(sorted(written), [('meet', {'version': 2}), ('other', {'version': 1})])
+        self.assertIsNone(buffer.pending('meet'))
+
+    def test_failed_flush_is_retried(self):
+        attempts = []
+
+        def write(meet, state):
+            attempts.append(state)
+            if len(attempts) == 1:
+                raise RuntimeError("MongoDB unavailable")
+
+        buffer = BackupWriteBehind(write, 60)
+        buffer.submit('meet', {'version': 1})
+        buffer.flush()
+        self.assertEqual(buffer.pending('meet'), {'version': 1})
+        buffer.flush()
+        self.assertEqual(len(attempts), 2)
+        self.assertIsNone(buffer.pending('meet'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,10 +2,18 @@
 
 from __future__ import absolute_import
 
+import unittest
+from unittest import mock
+
+import flask
 from flask import json
 from six import BytesIO
 
 from swagger_server.models.any_value import AnyValue  # noqa: E501
+from swagger_server import encoded_body, storage
+from swagger_server.backup_buffer import BackupWriteBehind
+from swagger_server.controllers import backup_controller
+from swagger_server.payload_digest import PayloadDigests
 from swagger_server.test import BaseTestCase
 
 
@@ -37,6 +45,75 @@ class TestBackupController(BaseTestCase):
         self.assert200(response,
                        'Response body is : ' + response.data.decode('utf-8'))
 
+    def test_backup_meet_versions_get(self):
+        """Test case for backup_meet_versions_get
+
+        Lists the stored backup versions for a meet
+        """
+        response = self.client.open(
+            '/theonlyway/Openlifter/1.0.0/backup/{meet}/versions'.format(meet='meet_example'),
+            method='GET')
+        self.assert200(response,
+                       'Response body is : ' + response.data.decode('utf-8'))
+
+
+class TestBackupWrites(unittest.TestCase):
+    """Backup POST against the memory storage backend"""
+
+    meet = "meet"
+
+    def setUp(self):
+        self.app = flask.Flask(__name__)
+        for target, name, value in ((backup_controller, 'backupDigests', PayloadDigests()),
+                                    (backup_controller, 'backupBuffer', None),
+                                    (backup_controller, 'backupBodies', encoded_body.EncodedBodyCache(4)),
+                                    (backup_controller.config, 'backupHistoryEnabled', False),
+                                    (storage, 'backend', storage.MemoryDatabase())):
+            patcher = mock.patch.object(target, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def post(self, state):
+        with self.app.test_request_context(method="POST", json=state):
+            return backup_controller.backup_meet_post(self.meet)
+
+    def test_identical_post_skips_the_write(self):
+        self.assertFalse(self.post({'meetSetup': {'name': "Meet"}})['unchanged'])
+        with mock.patch.object(backup_controller, 'write_backup') as write:
+            self.assertTrue(self.post({'meetSetup': {'name': "Meet"}})['unchanged'])
+            write.assert_not_called()
+            self.assertFalse(self.post({'meetSetup': {'name': "Other"}})['unchanged'])
+            write.assert_called_once()
+
+    def test_failed_write_is_retried(self):
+        state = {'meetSetup': {'name': "Meet"}}
+        with mock.patch.object(storage.MemoryCollection, 'update_one', side_effect=RuntimeError("down")):
+            with self.assertRaises(RuntimeError):
+                self.post(state)
+        self.assertIsNone(backup_controller.backupDigests.latest(self.meet))
+        self.assertFalse(self.post(state)['unchanged'])
+        self.assertEqual(storage.database()["backup"].find_one({'id': self.meet})['globalState'], state)
+
+    def test_failed_flush_is_retried(self):
+        buffer = BackupWriteBehind(backup_controller.write_backup, 60)
+        state = {'meetSetup': {'name': "Meet"}}
+        with mock.patch.object(backup_controller, 'backupBuffer', buffer):
+            self.post(state)
+            with mock.patch.object(storage.MemoryCollection, 'update_one', side_effect=RuntimeError("down")):
+                buffer.flush()
+            self.assertIsNone(backup_controller.backupDigests.latest(self.meet))
+            self.assertFalse(self.post(state)['unchanged'])
+            buffer.flush()
+        self.assertEqual(storage.database()["backup"].find_one({'id': self.meet})['globalState'], state)
+        self.assertTrue(self.post(state)['unchanged'])
+
+    def test_history_failure_does_not_fail_the_post(self):
+        state = {'meetSetup': {'name': "Meet"}}
+        with mock.patch.object(backup_controller.config, 'backupHistoryEnabled', True), \
+                mock.patch.object(backup_controller.backupHistory, 'record', side_effect=RuntimeError("down")):
+            self.assertEqual(self.post(state)['status'], "ok")
+        self.assertEqual(storage.database()["backup"].find_one({'id': self.meet})['globalState'], state)
+
 
 if __name__ == '__main__':
     import unittest
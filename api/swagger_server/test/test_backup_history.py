@@ -0,0 +1,118 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import copy
+import unittest
+from unittest import mock
+
+from swagger_server import backup_history
+from swagger_server.backup_history import BackupHistory, apply_delta, compute_delta, decode, encode
+from swagger_server.exceptions import DocumentNotFound
+from swagger_server.storage import MemoryDatabase
+
+
+class TestBackupHistoryDelta(unittest.TestCase):
+    """compute_delta / apply_delta unit tests"""
+
+    def setUp(self):
+        self.state = {
+            'meta': {'name': 'Test meet', 'inKg': True},
+            'registration': {'entries': [
+                {'id': 1, 'squatKg': [100, 0, 0], 'squatStatus': [1, 0, 0]},
+                {'id': 2, 'squatKg': [110, 0, 0], 'squatStatus': [0, 0, 0]},
+            ]},
+        }
+
+    def assertRoundTrip(self, old, new):
+        operations = decode(encode(compute_delta(old, new)))
+        self.assertEqual(apply_delta(copy.deepcopy(old), operations), new)
+
+    def test_nested_change_is_a_single_operation(self):
+        new = copy.deepcopy(self.state)
+        new['registration']['entries'][1]['squatStatus'][0] = 1
+        operations = compute_delta(self.state, new)
+        self.assertEqual(operations, [["set", ['registration', 'entries', 1, 'squatStatus', 0], 1]])
+        self.assertRoundTrip(self.state, new)
+
+    def test_added_and_removed_keys(self):
+        new = copy.deepcopy(self.state)
+        del new['meta']['inKg']
+        new['meta']['date'] = '2023-01-01'
+        self.assertRoundTrip(self.state, new)
+
+    def test_resized_list_is_replaced(self):
+        new = copy.deepcopy(self.state)
+        new['registration']['entries'].append({'id': 3})
+        operations = compute_delta(self.state, new)
+        self.assertEqual(operations, [["set", ['registration', 'entries'], new['registration']['entries']]])
+        self.assertRoundTrip(self.state, new)
+
+    def test_unchanged_state_has_no_operations(self):
+        self.assertEqual(compute_delta(self.state, copy.deepcopy(self.state)), [])
+
+
+class TestBackupHistory(unittest.TestCase):
+    """BackupHistory unit tests"""
+
+    def setUp(self):
+        self.collection = MemoryDatabase()["backup_history"]
+        self.now = 1000.0
+        patcher = mock.patch.object(backup_history.time, 'time', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_history(self, snapshot_interval=3, retention_seconds=3600, max_versions=100):
+        return BackupHistory(lambda: self.collection, snapshot_interval, retention_seconds, max_versions)
+
+    def record_states(self, history, count):
+        states = {}
+        for version in range(1, count + 1):
+            states[version] = {'meta': {'name': "Meet"}, 'version': version, 'entries': [version] * (version % 3)}
+            self.assertEqual(history.record("meet", copy.deepcopy(states[version]), f"v{version}"), version)
+            self.now += 1
+        return states
+
+    def test_every_version_restores(self):
+        history = self.make_history()
+        states = self.record_states(history, 8)
+        self.assertEqual([(version['version'], version['kind']) for version in history.versions("meet")],
+                         [(1, "snapshot"), (2, "delta"), (3, "delta"), (4, "snapshot"),
+                          (5, "delta"), (6, "delta"), (7, "snapshot"), (8, "delta")])
+        for version, state in states.items():
+            self.assertEqual(history.restore("meet", version), state)
+        with self.assertRaises(DocumentNotFound):
+            history.restore("meet", 9)
+
+    def test_unchanged_state_is_not_a_new_version(self):
+        history = self.make_history()
+        history.record("meet", {'a': 1}, "v1")
+        self.assertEqual(history.record("meet", {'a': 1}, "v1"), 1)
+        self.assertEqual(len(history.versions("meet")), 1)
+
+    def test_versions_continue_after_a_restart(self):
+        self.record_states(self.make_history(), 2)
+        history = self.make_history()
+        self.assertEqual(history.record("meet", {'a': 1}, "v3"), 3)
+        self.assertEqual(history.restore("meet", 3), {'a': 1})
+
+    def test_prune_keeps_whole_snapshot_chains(self):
+        history = self.make_history(max_versions=4)
+        states = self.record_states(history, 10)
+        self.assertEqual([(version['version'], version['kind']) for version in history.versions("meet")],
+                         [(7, "snapshot"), (8, "delta"), (9, "delta"), (10, "snapshot")])
+        self.assertEqual(history.restore("meet", 8), states[8])
+        with self.assertRaises(DocumentNotFound):
+            history.restore("meet", 6)
+
+    def test_prune_removes_expired_versions(self):
+        history = self.make_history(retention_seconds=60)
+        self.record_states(history, 6)
+        self.now += 120
+        history.record("meet", {'a': 1}, "v7")
+        self.assertEqual([version['version'] for version in history.versions("meet")], [7])
+        self.assertEqual(history.restore("meet", 7), {'a': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import unittest
+
+from swagger_server.division_place import DivisionPlacings, weight_class_str
+
+
+class FakeCollection:
+
+    def __init__(self, documents):
+        self.documents = documents
+
+    def find(self, filter):
+        return list(self.documents)
+
+
+def make_entry(entry_id, sex="M", bodyweight_kg=90, squat=200, bench=120, deadlift=250,
+               divisions=None, equipment="Sleeves", guest=False):
+    return {
+        'id': entry_id,
+        'name': f"Lifter {entry_id}",
+        'sex': sex,
+        'bodyweightKg': bodyweight_kg,
+        'equipment': equipment,
+        'divisions': divisions if divisions is not None else ["Open"],
+        'events': ["SBD"],
+        'guest': guest,
+        'lot': 0,
+        'squatKg': [squat, 0, 0, 0, 0], 'squatStatus': [1, 0, 0, 0, 0],
+        'benchKg': [bench, 0, 0, 0, 0], 'benchStatus': [1, 0, 0, 0, 0],
+        'deadliftKg': [deadlift, 0, 0, 0, 0], 'deadliftStatus': [1, 0, 0, 0, 0],
+    }
+
+
+def make_document(platform, entries):
+    return {
+        'platform': platform,
+        'meetData': {
+            'weightClassesKgMen': [83, 93, 105],
+            'weightClassesKgWomen': [63, 72],
+            'weightClassesKgMx': [],
+            'combineSleevesAndWraps': False,
+            'combineSingleAndMulti': False,
+        },
+        'order': {
+            'orderedEntries': entries,
+            'attemptOneIndexed': 1,
+            'platformDetails': {'lift': "D"},
+        }
+    }
+
+
+class TestDivisionPlacings(unittest.TestCase):
+    """DivisionPlacings unit tests"""
+
+    def setUp(self):
+        self.placings = DivisionPlacings(lambda: FakeCollection([]))
+
+    def write(self, platform, document):
+        self.placings.place(platform, document)
+        return self.placings.commit(platform, document)
+
+    def test_weight_class_str(self):
+        self.assertEqual(weight_class_str([82.5, 90], 82.5), "82.5")
+        self.assertEqual(weight_class_str([82.5, 90], 95), "90+")
+        self.assertEqual(weight_class_str([], 95), "")
+
+    def test_places_by_total_then_bodyweight(self):
+        entries = [make_entry(1, bodyweight_kg=92), make_entry(2, deadlift=270),
+                   make_entry(3, bodyweight_kg=88)]
+        self.write(1, make_document(1, entries))
+        self.assertEqual([entry['place'] for entry in entries], [3, 1, 2])
+
+    def test_guests_and_bombs(self):
+        entries = [make_entry(1, guest=True, deadlift=300), make_entry(2), make_entry(3, divisions=[])]
+        entries.append(make_entry(4))
+        entries[3]['benchStatus'] = [-1, -1, -1, 0, 0]
+        self.write(1, make_document(1, entries))
+        self.assertEqual([entry['place'] for entry in entries], ["GUEST", 1, "-", "-"])
+        standings = self.placings.standings("Open")[0]['standings']
+        self.assertEqual([standing['place'] for standing in standings], [1, "-", "GUEST"])
+
+    def test_only_touched_categories_are_resorted(self):
+        entries = [make_entry(1), make_entry(2, bodyweight_kg=100), make_entry(3, sex="F", bodyweight_kg=60)]
+        self.assertEqual(self.placings.commit(1, make_document(1, entries)), 3)
+        entries = [dict(entry) for entry in entries]
+        entries[1]['deadliftKg'] = [280, 0, 0, 0, 0]
+        entries[2]['notes'] = "changed, but not in a way that matters"
+        self.assertEqual(self.placings.commit(1, make_document(1, entries)), 1)
+
+    def test_platforms_are_ranked_together(self):
+        self.placings.commit(1, make_document(1, [make_entry(1)]))
+        entries = [make_entry(2, deadlift=300)]
+        self.write(2, make_document(2, entries))
+        self.assertEqual(entries[0]['place'], 1)
+        standings = self.placings.standings()[0]['standings']
+        self.assertEqual([(standing['platform'], standing['entry']['id']) for standing in standings],
+                         [(2, 2), (1, 1)])
+
+    def test_category_presentation_order(self):
+        entries = [make_entry(1, bodyweight_kg=110), make_entry(2, bodyweight_kg=80),
+                   make_entry(3, sex="F", bodyweight_kg=60)]
+        self.placings.commit(1, make_document(1, entries))
+        self.assertEqual([(result['category']['sex'], result['category']['weightClassStr'])
+                          for result in self.placings.standings()],
+                         [("F", "63"), ("M", "83"), ("M", "105+")])
+
+    def test_loads_stored_orders(self):
+        placings = DivisionPlacings(lambda: FakeCollection(
+            [make_document(1, [make_entry(1, deadlift=300)])]))
+        entries = [make_entry(2)]
+        placings.place(2, make_document(2, entries))
+        self.assertEqual(entries[0]['place'], 2)
+
+    def test_place_leaves_placings_unchanged(self):
+        self.placings.commit(1, make_document(1, [make_entry(1), make_entry(2, deadlift=260)]))
+        before = self.placings.standings()
+        entries = [make_entry(1, deadlift=300), make_entry(2, deadlift=260), make_entry(3, sex="F")]
+        document = make_document(1, entries)
+        document['meetData']['weightClassesKgMen'] = [120]
+        self.placings.place(1, document)
+        self.assertEqual([entry['place'] for entry in entries], [1, 2, 1])
+        self.assertEqual(self.placings.standings(), before)
+        entries = [make_entry(4, deadlift=300)]
+        self.placings.place(2, make_document(2, entries))
+        self.assertEqual(entries[0]['place'], 1)
+        self.assertEqual(self.placings.standings(), before)
+
+    def test_older_version_is_not_committed(self):
+        newer = make_document(1, [make_entry(1, deadlift=300)])
+        newer['version'] = 3
+        older = make_document(1, [make_entry(1)])
+        older['version'] = 2
+        self.placings.commit(1, newer)
+        self.assertEqual(self.placings.commit(1, older), 0)
+        self.assertEqual(self.placings.standings()[0]['standings'][0]['entry']['deadliftKg'][0], 300)
+
+    def test_projected_totals_are_per_platform(self):
+        # Platform 1 is on 2nd attempt deadlifts, so its totals are final
+        # and its entry with an untaken opener bombs; platform 2's is projected
+        finished = make_entry(1, deadlift=400)
+        finished['deadliftStatus'] = [0, 0, 0, 0, 0]
+        document = make_document(1, [finished, make_entry(2)])
+        document['order']['platformDetails'] = {'lift': "D"}
+        document['order']['attemptOneIndexed'] = 2
+        self.placings.commit(1, document)
+        waiting = make_entry(3, deadlift=400)
+        waiting['deadliftStatus'] = [0, 0, 0, 0, 0]
+        self.assertEqual(self.placings.commit(2, make_document(2, [waiting])), 1)
+        standings = self.placings.standings()[0]['standings']
+        self.assertEqual([(standing['entry']['id'], standing['place']) for standing in standings],
+                         [(3, 1), (2, 2), (1, "-")])
+        self.assertEqual(self.placings.commit(2, make_document(2, [dict(waiting, notes="x")])), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
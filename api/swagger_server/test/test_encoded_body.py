@@ -0,0 +1,80 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import gzip
+import json
+import unittest
+from unittest import mock
+
+import flask
+
+from swagger_server import encoded_body
+from swagger_server.encoded_body import EncodedBodyCache
+
+
+class TestEncodedBody(unittest.TestCase):
+    """encoded_body unit tests"""
+
+    def setUp(self):
+        self.app = flask.Flask(__name__)
+        self.payload = json.dumps({'entries': [{'id': index} for index in range(2000)]}).encode()
+        self.gzipped = encoded_body.compress(self.payload)
+
+    def get(self, headers):
+        with self.app.test_request_context(headers=headers):
+            response = encoded_body.response("digest", self.gzipped)
+            return response, b"".join(response.response)
+
+    def test_gzip_is_streamed_in_chunks(self):
+        with mock.patch.object(encoded_body, 'chunkSize', 100):
+            with self.app.test_request_context(headers={'Accept-Encoding': "gzip, deflate"}):
+                chunks = list(encoded_body.response("digest", self.gzipped).response)
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(len(chunk) <= 100 for chunk in chunks))
+        self.assertEqual(gzip.decompress(b"".join(chunks)), self.payload)
+
+    def test_representations_have_their_own_tags(self):
+        response, body = self.get({'Accept-Encoding': "gzip"})
+        self.assertEqual(body, self.gzipped)
+        self.assertEqual(response.headers['Content-Encoding'], "gzip")
+        self.assertEqual(response.headers['ETag'], '"digest-gz"')
+        self.assertEqual(response.headers['Vary'], "Accept-Encoding")
+        with mock.patch.object(encoded_body, 'chunkSize', 100):
+            response, body = self.get({'Accept-Encoding': "identity"})
+        self.assertEqual(body, self.payload)
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(response.headers['ETag'], '"digest"')
+
+    def test_gzip_refused_with_zero_quality(self):
+        response, body = self.get({'Accept-Encoding': "gzip;q=0"})
+        self.assertEqual(body, self.payload)
+
+    def test_if_none_match_only_matches_the_same_representation(self):
+        response, _ = self.get({'Accept-Encoding': "gzip", 'If-None-Match': '"digest-gz"'})
+        self.assertEqual(response.status_code, 304)
+        response, body = self.get({'If-None-Match': '"digest-gz"'})
+        self.assertEqual((response.status_code, body), (200, self.payload))
+        response, _ = self.get({'Accept-Encoding': "gzip", 'If-None-Match': '"digest"'})
+        self.assertEqual(response.status_code, 200)
+
+
+class TestEncodedBodyCache(unittest.TestCase):
+    """EncodedBodyCache unit tests"""
+
+    def test_least_recently_used_is_evicted(self):
+        cache = EncodedBodyCache(2)
+        cache.put("a", "1", b"a")
+        cache.put("b", "2", b"b")
+        self.assertEqual(cache.get("a"), ("1", b"a"))
+        cache.put("c", "3", b"c")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), ("1", b"a"))
+        cache.put("a", "4", b"d")
+        cache.put("d", "5", b"e")
+        self.assertIsNone(cache.get("c"))
+        self.assertEqual(cache.get("a"), ("4", b"d"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import threading
+import unittest
+
+from swagger_server.events import EventChannel, EventHub, event_stream
+
+
+class TestEventChannel(unittest.TestCase):
+    """EventChannel unit tests"""
+
+    def test_unchanged_data_is_not_published(self):
+        channel = EventChannel(4)
+        self.assertIsNone(channel.latest())
+        self.assertTrue(channel.publish("lifters", "a"))
+        self.assertFalse(channel.publish("lifters", "a"))
+        self.assertEqual(len(channel.since(None)), 1)
+
+    def test_reconnect_replays_missed_events(self):
+        channel = EventChannel(4)
+        eventIds = []
+        for data in "abc":
+            channel.publish("lifters", data)
+            eventIds.append(channel.latest()[0])
+        self.assertEqual(len(set(eventIds)), 3)
+        self.assertEqual([data for _, _, data in channel.since(None)], ["c"])
+        self.assertEqual([data for _, _, data in channel.since(eventIds[0])], ["b", "c"])
+        self.assertEqual(channel.since(eventIds[2]), [])
+
+    def test_expired_or_unknown_id_gets_latest_event(self):
+        channel = EventChannel(2)
+        channel.publish("lifters", "a")
+        expiredId = channel.latest()[0]
+        for data in "bcd":
+            channel.publish("lifters", data)
+        self.assertEqual([data for _, _, data in channel.since(expiredId)], ["d"])
+        self.assertEqual([data for _, _, data in channel.since("unknown-1")], ["d"])
+
+    def test_wait_returns_published_event(self):
+        channel = EventChannel(4)
+        channel.publish("lifters", "a")
+        lastEventId = channel.latest()[0]
+        self.assertEqual(channel.wait(lastEventId, 0.01), [])
+        publisher = threading.Timer(0.05, channel.publish, ("lifters", "b"))
+        publisher.start()
+        events = channel.wait(lastEventId, 5)
+        publisher.join()
+        self.assertEqual([data for _, _, data in events], ["b"])
+
+
+class TestEventHub(unittest.TestCase):
+    """EventHub unit tests"""
+
+    def test_channel_per_topic(self):
+        hub = EventHub(4)
+        self.assertIs(hub.channel(1), hub.channel(1))
+        self.assertIsNot(hub.channel(1), hub.channel(2))
+
+
+class TestEventStream(unittest.TestCase):
+    """event_stream unit tests"""
+
+    def test_replays_from_last_event_id_and_keeps_alive(self):
+        channel = EventChannel(4)
+        channel.publish("lifters", "a")
+        lastEventId = channel.latest()[0]
+        channel.publish("lifters", "b")
+        stream = event_stream(channel, lastEventId, 0.01)
+        self.assertEqual(next(stream), "retry: 2000\n\n")
+        eventId = channel.latest()[0]
+        self.assertEqual(next(stream), f"id: {eventId}\nevent: lifters\ndata: b\n\n")
+        self.assertEqual(next(stream), ": keep-alive\n\n")
+        channel.publish("lifters", "c")
+        self.assertTrue(next(stream).endswith("data: c\n\n"))
+        stream.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
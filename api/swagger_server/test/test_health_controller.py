@@ -23,6 +23,17 @@ class TestHealthController(BaseTestCase):
         self.assert200(response,
                        'Response body is : ' + response.data.decode('utf-8'))
 
+    def test_metrics_get(self):
+        """Test case for metrics_get
+
+        Returns API metrics for Prometheus
+        """
+        response = self.client.open(
+            '/theonlyway/Openlifter/1.0.0/metrics',
+            method='GET')
+        self.assert200(response,
+                       'Response body is : ' + response.data.decode('utf-8'))
+
 
 if __name__ == '__main__':
     import unittest
@@ -0,0 +1,73 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import unittest
+
+from swagger_server.controllers.helpers import (WeightClassBoundaries, find_weight_class_index,
+                                                kg2lbs, leaderboard_results)
+
+
+class TestWeightClassBoundaries(unittest.TestCase):
+    """WeightClassBoundaries unit tests"""
+
+    def test_bisect_matches_linear_walk(self):
+        weightClasses = [59, 66, 74, 83, 93, 105, 120]
+        for in_kg in (True, False):
+            boundaries = WeightClassBoundaries(weightClasses, in_kg)
+            self.assertTrue(boundaries.ascending)
+            for tenths in range(400, 1400):
+                bodyweight = tenths / 10
+                self.assertEqual(boundaries.index(bodyweight),
+                                 find_weight_class_index(bodyweight, weightClasses, in_kg))
+
+    def test_unsorted_classes_use_linear_walk(self):
+        boundaries = WeightClassBoundaries([93, 100, 80], True)
+        self.assertFalse(boundaries.ascending)
+        self.assertEqual(boundaries.index(99), 3)
+        self.assertEqual(boundaries.index(75), 0)
+
+    def test_labels(self):
+        self.assertEqual(WeightClassBoundaries([83, 93], True).labels,
+                         [83, 93, "93+"])
+        self.assertEqual(WeightClassBoundaries([83, 93], False).labels,
+                         [kg2lbs(83), kg2lbs(93), str(kg2lbs(93)) + "+"])
+
+
+class TestLeaderboardResults(unittest.TestCase):
+    """leaderboard_results unit tests"""
+
+    def setUp(self):
+        self.data = {
+            'meetData': {
+                'inKg': True,
+                'weightClassesKgMen': [83, 93],
+                'weightClassesKgWomen': [],
+                'weightClassesKgMx': [60],
+            },
+            'entries': [
+                {'id': 1, 'sex': 'M', 'bodyweightKg': 80, 'points': 300},
+                {'id': 2, 'sex': 'M', 'bodyweightKg': 101, 'points': 450},
+                {'id': 3, 'sex': 'M', 'bodyweightKg': 82.5, 'points': 400},
+                {'id': 4, 'sex': 'F', 'bodyweightKg': 60, 'points': 350},
+                {'id': 5, 'sex': 'Mx', 'bodyweightKg': 60, 'points': 200},
+            ]
+        }
+
+    def test_class(self):
+        results = leaderboard_results(self.data, "class")
+        self.assertEqual([group['weightClass'] for group in results['male']], [83, "93+"])
+        self.assertEqual([entry['id'] for entry in results['male'][0]['entries']], [3, 1])
+        self.assertTrue(results['male'][1]['outsideMax'])
+        self.assertIsNone(results['female'])
+        self.assertEqual(results['mx'][0]['weightClass'], 60)
+
+    def test_points(self):
+        results = leaderboard_results(self.data, "points")
+        self.assertEqual([entry['id'] for entry in results['male']], [2, 3, 1])
+        self.assertEqual([entry['weightClass'] for entry in results['male']], ["93+", 83, 83])
+        self.assertTrue(results['inKg'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import random
+import unittest
+from unittest import mock
+
+from swagger_server import leaderboard
+from swagger_server.controllers.helpers import leaderboard_results, load_numpy
+from swagger_server.leaderboard import LeaderboardEngine
+
+
+class FakeCollection:
+
+    def __init__(self, documents):
+        self.documents = documents
+
+    def find(self, filter):
+        return list(self.documents)
+
+
+def make_meet_data(in_kg=True):
+    return {
+        'inKg': in_kg,
+        'weightClassesKgMen': [59, 66, 74, 83, 93, 105, 120],
+        'weightClassesKgWomen': [47, 52, 57, 63, 69, 76, 84],
+        'weightClassesKgMx': [],
+    }
+
+
+def make_entries(platform, count, seed):
+    generator = random.Random(seed)
+    return [{
+        'id': platform * 1000 + index,
+        'sex': generator.choice(['M', 'F', 'Mx']),
+        'bodyweightKg': generator.uniform(40, 140),
+        'points': generator.uniform(100, 600),
+    } for index in range(count)]
+
+
+def make_document(platform, entries, meet_data):
+    return {
+        'platform': platform,
+        'meetData': meet_data,
+        'order': {'orderedEntries': entries},
+    }
+
+
+def expected(documents, entries_filter):
+    data = {'meetData': None, 'entries': []}
+    for document in documents:
+        data['meetData'] = document['meetData']
+        data['entries'].extend(document['order']['orderedEntries'])
+    return leaderboard_results(data, entries_filter)
+
+
+class TestLeaderboardEngine(unittest.TestCase):
+    """LeaderboardEngine unit tests"""
+
+    def setUp(self):
+        self.documents = [
+            make_document(1, make_entries(1, 60, 1), make_meet_data()),
+            make_document(2, make_entries(2, 60, 2), make_meet_data()),
+        ]
+        self.engine = LeaderboardEngine(
+            lambda: FakeCollection(self.documents))
+
+    def assertMatchesHelpers(self):
+        for entries_filter in ("class", "points"):
+            self.assertEqual(self.engine.results(entries_filter),
+                             expected(self.documents, entries_filter))
+
+    def test_loaded_results_match_helpers(self):
+        self.assertMatchesHelpers()
+
+    def test_updated_entries_are_rebucketed(self):
+        self.assertMatchesHelpers()
+        entries = [dict(entry) for entry in self.documents[0]['order']['orderedEntries']]
+        entries[0]['points'] = 1000
+        entries[1]['bodyweightKg'] = 150
+        entries[2]['sex'] = 'F' if entries[2]['sex'] == 'M' else 'M'
+        del entries[3]
+        entries.append({'id': 1999, 'sex': 'M', 'bodyweightKg': 70, 'points': 50})
+        self.documents[0] = make_document(1, entries, make_meet_data())
+        self.engine.update(1, self.documents[0])
+        self.assertMatchesHelpers()
+
+    def test_changed_weight_classes_rebuild(self):
+        self.assertMatchesHelpers()
+        for document in self.documents:
+            document['meetData'] = make_meet_data(in_kg=False)
+        self.engine.update(2, self.documents[1])
+        self.assertMatchesHelpers()
+
+    def test_unknown_filter(self):
+        self.assertEqual(self.engine.results("other"),
+                         {'male': None, 'female': None, 'mx': None, 'inKg': True})
+
+
+@unittest.skipIf(load_numpy() is None, "NumPy is not installed")
+class TestLeaderboardEngineNumpy(unittest.TestCase):
+    """LeaderboardEngine rebuilt with NumPy against the pure Python rebuild"""
+
+    def make_documents(self, in_kg):
+        documents = [make_document(platform, make_entries(platform, 300, platform),
+                                   make_meet_data(in_kg))
+                     for platform in (1, 2)]
+        for entry in documents[0]['order']['orderedEntries'][:20]:
+            entry['points'] = 400
+            entry['bodyweightKg'] = 83
+        documents[1]['order']['orderedEntries'][0]['points'] = None
+        return documents
+
+    def build(self, documents, use_numpy):
+        with mock.patch.multiple(leaderboard.config, leaderboardNumpy=use_numpy,
+                                 leaderboardNumpyMinEntries=0):
+            engine = LeaderboardEngine(lambda: FakeCollection(documents))
+            views = {entries_filter: engine.results(entries_filter)
+                     for entries_filter in ("class", "points", "other")}
+        return engine, views
+
+    def test_identical_results(self):
+        for in_kg in (True, False):
+            documents = self.make_documents(in_kg)
+            python, pythonViews = self.build(documents, False)
+            numpy, numpyViews = self.build(documents, True)
+            self.assertEqual(numpyViews, pythonViews)
+            self.assertEqual(repr(numpyViews), repr(pythonViews))
+            self.assertEqual(numpy._buckets, python._buckets)
+            self.assertEqual(numpy._placement, python._placement)
+
+    def test_updates_after_numpy_rebuild(self):
+        documents = self.make_documents(True)
+        python, _ = self.build(documents, False)
+        numpy, _ = self.build(documents, True)
+        entries = [dict(entry) for entry in documents[0]['order']['orderedEntries']]
+        entries[0]['points'] = 1000
+        entries[1]['bodyweightKg'] = 150
+        del entries[2]
+        document = make_document(1, entries, make_meet_data())
+        python.update(1, document)
+        numpy.update(1, document)
+        for entries_filter in ("class", "points"):
+            self.assertEqual(numpy.results(entries_filter), python.results(entries_filter))
+        self.assertEqual(numpy._buckets, python._buckets)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,12 +2,25 @@
 
 from __future__ import absolute_import
 
+import unittest
+from unittest import mock
+
+import flask
 from flask import json
 from six import BytesIO
 
 from swagger_server.models.any_value import AnyValue  # noqa: E501
 from swagger_server.models.lifter_order import LifterOrder  # noqa: E501
+from swagger_server.models.lifter_order_delta import LifterOrderDelta  # noqa: E501
 from swagger_server.models.order_response import OrderResponse  # noqa: E501
+from swagger_server import storage
+from swagger_server.conditional import versions
+from swagger_server.controllers import lifters_controller
+from swagger_server.division_place import DivisionPlacings
+from swagger_server.events import EventHub
+from swagger_server.exceptions import OrderVersionConflict
+from swagger_server.order_store import stored_orders
+from swagger_server.payload_digest import PayloadDigests
 from swagger_server.test import BaseTestCase
 
 
@@ -36,6 +49,17 @@ class TestLiftersController(BaseTestCase):
         self.assert200(response,
                        'Response body is : ' + response.data.decode('utf-8'))
 
+    def test_lifter_platform_projection_get(self):
+        """Test case for lifter_platform_projection_get
+
+        Checks the in-memory order projection against the stored order
+        """
+        response = self.client.open(
+            '/theonlyway/Openlifter/1.0.0/lifter/{platform}/projection'.format(platform=56),
+            method='GET')
+        self.assert200(response,
+                       'Response body is : ' + response.data.decode('utf-8'))
+
     def test_lifter_platform_order_post(self):
         """Test case for lifter_platform_order_post
 
@@ -50,6 +74,107 @@ class TestLiftersController(BaseTestCase):
         self.assert200(response,
                        'Response body is : ' + response.data.decode('utf-8'))
 
+    def test_lifter_platform_order_patch(self):
+        """Test case for lifter_platform_order_patch
+
+        Apply a delta to the lifter order
+        """
+        body = LifterOrderDelta()
+        response = self.client.open(
+            '/theonlyway/Openlifter/1.0.0/lifter/{platform}/order'.format(platform=56),
+            method='PATCH',
+            data=json.dumps(body),
+            content_type='application/json')
+        self.assert200(response,
+                       'Response body is : ' + response.data.decode('utf-8'))
+
+
+def make_entry(entry_id, squat=200):
+    return {
+        'id': entry_id, 'name': f"Lifter {entry_id}", 'sex': "M", 'bodyweightKg': 90,
+        'equipment': "Sleeves", 'divisions': ["Open"], 'events': ["SBD"], 'guest': False,
+        'squatKg': [squat, 0, 0], 'squatStatus': [1, 0, 0],
+        'benchKg': [0, 0, 0], 'benchStatus': [0, 0, 0],
+        'deadliftKg': [0, 0, 0], 'deadliftStatus': [0, 0, 0],
+    }
+
+
+def make_order(entries):
+    return {
+        'meetData': {'name': "Meet", 'inKg': True, 'weightClassesKgMen': [93],
+                     'weightClassesKgWomen': [], 'weightClassesKgMx': []},
+        'lightsCode': None,
+        'order': {'orderedEntries': entries, 'attemptOneIndexed': 1, 'currentEntryId': entries[0]['id'],
+                  'platformDetails': {'lift': "S"}}
+    }
+
+
+class TestOrderWrites(unittest.TestCase):
+    """Order POST and PATCH against the memory storage backend"""
+
+    platform = 901
+
+    def setUp(self):
+        self.app = flask.Flask(__name__)
+        for target, name, value in ((storage, 'backend', storage.MemoryDatabase()),
+                                    (lifters_controller, 'orderDigests', PayloadDigests()),
+                                    (lifters_controller, 'divisionPlacings', DivisionPlacings(stored_orders))):
+            patcher = mock.patch.object(target, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def post(self, order):
+        with self.app.test_request_context(method="POST", json=order):
+            return lifters_controller.lifter_platform_order_post(self.platform)
+
+    def patch(self, delta):
+        with self.app.test_request_context(method="PATCH", json=delta):
+            return lifters_controller.lifter_platform_order_patch(self.platform)
+
+    def stored_version(self):
+        return storage.database()["order"].find_one({'platform': self.platform})['version']
+
+    def test_identical_post_skips_the_write(self):
+        order = make_order([make_entry(1), make_entry(2)])
+        self.assertEqual(self.post(order)['version'], 1)
+        response = self.post(order)
+        self.assertTrue(response['unchanged'])
+        self.assertEqual(response['version'], 1)
+        self.assertEqual(self.stored_version(), 1)
+
+    def test_post_after_patch_is_written(self):
+        order = make_order([make_entry(1), make_entry(2)])
+        self.post(order)
+        self.assertEqual(self.patch({'baseVersion': 1, 'entries': [make_entry(2, squat=210)]})['version'], 2)
+        response = self.post(order)
+        self.assertFalse(response['unchanged'])
+        self.assertEqual(response['version'], 3)
+        self.assertEqual(storage.database()["order"].find_one(
+            {'platform': self.platform})['order']['orderedEntries'][1]['squatKg'][0], 200)
+
+    def test_first_event_subscriber_has_no_side_effects(self):
+        self.post(make_order([make_entry(1), make_entry(2)]))
+        tag = versions.tag(f"order/{self.platform}/current")
+        with mock.patch.object(lifters_controller, 'lifterEvents', EventHub(4)):
+            with self.app.test_request_context():
+                lifters_controller.lifter_platform_events_get(self.platform)
+            _, event, data = lifters_controller.lifterEvents.channel(self.platform).latest()
+        self.assertEqual((event, json.loads(data)['current']['entry']['id']), ("lifters", 1))
+        self.assertEqual(versions.tag(f"order/{self.platform}/current"), tag)
+
+    def test_conflicting_patch_leaves_standings_unchanged(self):
+        self.post(make_order([make_entry(1), make_entry(2, squat=210)]))
+        standings = lifters_controller.divisionPlacings.standings()
+        self.assertEqual([standing['entry']['id'] for standing in standings[0]['standings']], [2, 1])
+        # Another write got in between reading the stored order and updating it
+        with mock.patch.object(lifters_controller.orderStore, 'update', return_value=False):
+            with self.assertRaises(OrderVersionConflict):
+                self.patch({'baseVersion': 1, 'entries': [make_entry(1, squat=300)]})
+        self.assertEqual(lifters_controller.divisionPlacings.standings(), standings)
+        self.patch({'baseVersion': 1, 'entries': [make_entry(1, squat=300)]})
+        self.assertEqual([standing['entry']['id'] for standing in
+                          lifters_controller.divisionPlacings.standings()[0]['standings']], [1, 2])
+
 
 if __name__ == '__main__':
     import unittest
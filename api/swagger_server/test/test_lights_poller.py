@@ -0,0 +1,136 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import unittest
+
+import requests
+
+from swagger_server.exceptions import LightsUnavailable
+from swagger_server.lights_poller import LightsPoller
+
+
+class FakeProxy:
+
+    def __init__(self):
+        self.states = {}
+        self.calls = []
+
+    def refresh(self, code):
+        self.calls.append(code)
+        state = self.states.get(code)
+        if state is None:
+            raise LightsUnavailable(code, requests.ConnectTimeout("upstream down"))
+        return state
+
+
+class TestLightsPoller(unittest.TestCase):
+    """LightsPoller unit tests"""
+
+    def setUp(self):
+        self.now = 0.0
+        self.proxy = FakeProxy()
+        self.orders = [(1, "abc"), (2, "abc"), (3, "xyz")]
+        self.published = []
+        self.poller = LightsPoller(
+            self.proxy, lambda: self.orders,
+            lambda platform, state: self.published.append((platform, state)),
+            1, 8, 30, clock=lambda: self.now)
+
+    def test_polls_each_code_once_and_publishes_every_platform(self):
+        self.proxy.states = {"abc": {'lights': 1}, "xyz": {'lights': 2}}
+        self.poller.discover()
+        self.assertEqual(self.poller.poll_due(), 1)
+        self.assertEqual(sorted(self.proxy.calls), ["abc", "xyz"])
+        self.assertEqual(sorted(self.published), [
+            (1, {'lights': 1}), (2, {'lights': 1}), (3, {'lights': 2})])
+        self.assertEqual(self.poller.lookup(2), (True, {'lights': 1}))
+        self.assertEqual(self.poller.lookup(4), (False, None))
+
+    def test_backs_off_while_unchanged(self):
+        self.orders = [(1, "abc")]
+        self.proxy.states = {"abc": {'lights': 1}}
+        self.poller.discover()
+        waits = []
+        for _ in range(5):
+            waits.append(self.poller.poll_due())
+            self.now += waits[-1]
+        self.assertEqual(waits, [1, 2, 4, 8, 8])
+        self.assertEqual(len(self.published), 1)
+
+    def test_change_resets_interval(self):
+        self.orders = [(1, "abc")]
+        self.proxy.states = {"abc": {'lights': 1}}
+        self.poller.discover()
+        self.poller.poll_due()
+        self.now = 1
+        self.assertEqual(self.poller.poll_due(), 2)
+        self.now = 3
+        self.proxy.states = {"abc": {'lights': 2}}
+        self.assertEqual(self.poller.poll_due(), 1)
+        self.assertEqual(self.published, [(1, {'lights': 1}), (1, {'lights': 2})])
+
+    def test_not_due_is_not_polled(self):
+        self.orders = [(1, "abc")]
+        self.proxy.states = {"abc": {'lights': 1}}
+        self.poller.discover()
+        self.poller.poll_due()
+        self.now = 0.5
+        self.assertEqual(self.poller.poll_due(), 0.5)
+        self.assertEqual(self.proxy.calls, ["abc"])
+
+    def test_errors_back_off_and_keep_last_state(self):
+        self.orders = [(1, "abc")]
+        self.proxy.states = {"abc": {'lights': 1}}
+        self.poller.discover()
+        self.poller.poll_due()
+        self.proxy.states = {}
+        self.now = 1
+        self.assertEqual(self.poller.poll_due(), 2)
+        self.assertEqual(self.poller.lookup(1), (True, {'lights': 1}))
+
+    def test_discovery_drops_unused_codes(self):
+        self.proxy.states = {"abc": {'lights': 1}, "xyz": {'lights': 2}}
+        self.poller.discover()
+        self.poller.poll_due()
+        self.orders = [(1, "abc")]
+        self.poller.discover()
+        self.assertEqual(self.poller.lookup(3), (False, None))
+        self.now = 1
+        self.poller.poll_due()
+        self.assertEqual(self.proxy.calls.count("xyz"), 1)
+
+    def test_track_switches_platform_code(self):
+        self.orders = []
+        self.proxy.states = {"abc": {'lights': 1}, "xyz": {'lights': 2}}
+        self.poller.track(1, "abc")
+        self.poller.poll_due()
+        self.poller.track(1, "xyz")
+        self.assertEqual(self.poller.lookup(1), (False, None))
+        self.poller.poll_due()
+        self.assertEqual(self.poller.lookup(1), (True, {'lights': 2}))
+        self.poller.track(1, None)
+        self.assertEqual(self.poller.lookup(1), (False, None))
+
+    def test_order_write_resets_interval(self):
+        self.orders = [(1, "abc")]
+        self.proxy.states = {"abc": {'lights': 1}}
+        self.poller.discover()
+        for _ in range(4):
+            self.now += self.poller.poll_due()
+        self.assertEqual(self.poller.poll_due(), 8)
+        self.now += 1
+        self.poller.track(1, "abc")
+        self.assertEqual(self.poller.poll_due(), 7)
+        self.poller.order_written(1, "abc")
+        self.assertEqual(self.poller.poll_due(), 1)
+        self.now += 1
+        self.assertEqual(self.poller.poll_due(), 2)
+        self.poller.order_written(2, "xyz")
+        self.proxy.states["xyz"] = {'lights': 2}
+        self.assertEqual(self.poller.poll_due(), 1)
+        self.assertEqual(self.proxy.calls[-1], "xyz")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import threading
+import unittest
+
+import requests
+
+from swagger_server.exceptions import LightsUnavailable
+from swagger_server.lights_proxy import LightsProxy
+
+
+class FakeResponse:
+
+    def __init__(self, value):
+        self.value = value
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.value
+
+
+class FakeSession:
+
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+        self.release.set()
+        self.fail = False
+
+    def get(self, url, timeout):
+        self.calls.append((url, timeout))
+        self.release.wait()
+        if self.fail:
+            raise requests.ConnectTimeout("upstream down")
+        return FakeResponse({'call': len(self.calls)})
+
+
+class TestLightsProxy(unittest.TestCase):
+    """LightsProxy unit tests"""
+
+    def setUp(self):
+        self.now = 0.0
+        self.session = FakeSession()
+        self.proxy = LightsProxy("http://lights", self.session, 1, 30, (1, 2), clock=lambda: self.now)
+
+    def test_cached_within_ttl(self):
+        self.assertEqual(self.proxy.get("abc"), {'call': 1})
+        self.now = 0.5
+        self.assertEqual(self.proxy.get("abc"), {'call': 1})
+        self.assertEqual(self.session.calls, [("http://lights/abc", (1, 2))])
+
+    def test_concurrent_misses_share_one_fetch(self):
+        self.session.release.clear()
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.proxy.get("abc")))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        while len(self.session.calls) == 0:
+            pass
+        self.session.release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self.session.calls), 1)
+        self.assertEqual(results, [{'call': 1}] * 5)
+
+    def test_stale_while_revalidate(self):
+        self.proxy.get("abc")
+        self.now = 5
+        self.session.release.clear()
+        self.assertEqual(self.proxy.get("abc"), {'call': 1})
+        self.assertEqual(self.proxy.get("abc"), {'call': 1})
+        self.session.release.set()
+        while self.proxy.get("abc") != {'call': 2}:
+            pass
+        self.assertEqual(len(self.session.calls), 2)
+
+    def test_upstream_failure(self):
+        self.proxy.get("abc")
+        self.session.fail = True
+        self.now = 5
+        self.assertEqual(self.proxy.get("abc"), {'call': 1})
+        self.now = 100
+        with self.assertRaises(LightsUnavailable):
+            self.proxy.get("abc")
+
+    def test_nothing_served_past_stale_ttl(self):
+        self.proxy.get("abc")
+        self.session.fail = True
+        self.now = 31
+        with self.assertRaises(LightsUnavailable):
+            self.proxy.get("abc")
+        self.session.fail = False
+        self.assertEqual(self.proxy.get("abc"), {'call': 3})
+
+    def test_refresh_ignores_cache_and_updates_it(self):
+        self.proxy.get("abc")
+        self.assertEqual(self.proxy.refresh("abc"), {'call': 2})
+        self.assertEqual(self.proxy.get("abc"), {'call': 2})
+        self.session.fail = True
+        with self.assertRaises(LightsUnavailable):
+            self.proxy.refresh("abc")
+        self.assertEqual(self.proxy.get("abc"), {'call': 2})
+
+
+if __name__ == '__main__':
+    unittest.main()
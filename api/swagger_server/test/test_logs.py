@@ -0,0 +1,66 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import io
+import logging
+import unittest
+
+from swagger_server import logs
+
+
+class FakeConfig:
+    logQueue = True
+    logQueueSize = 100
+    logSampleRate = 1.0
+    logSampleRates = "lifter_results_get=0"
+    logRateLimit = 2
+
+
+def make_record(route=None, sampled=True):
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "message", (), None)
+    record.sampled = sampled
+    if route is not None:
+        record.route = route
+    return record
+
+
+class TestLogs(unittest.TestCase):
+    """logs unit tests"""
+
+    def test_lazy_is_only_built_when_formatted(self):
+        calls = []
+        logger = logging.getLogger("test_logs.lazy")
+        logger.setLevel(logging.INFO)
+        logger.debug("Payload: %s", logs.Lazy(calls.append, "built"))
+        self.assertEqual(calls, [])
+        self.assertEqual(str(logs.body(b'{"a": 1}')), '{"a": 1}')
+
+    def test_sampling_and_rate_limit_per_route(self):
+        samplingFilter = logs.SamplingFilter(1.0, logs.parse_sample_rates("muted=0,"), 2)
+        self.assertFalse(samplingFilter.filter(make_record("muted")))
+        self.assertEqual([samplingFilter.filter(make_record("busy")) for _ in range(3)],
+                         [True, True, False])
+        self.assertTrue(samplingFilter.filter(make_record("other")))
+        self.assertTrue(samplingFilter.filter(make_record("busy", sampled=False)))
+
+    def test_queue_moves_formatting_to_listener(self):
+        stream = io.StringIO()
+        logger = logging.getLogger("test_logs.queue")
+        logger.propagate = False
+        logger.setLevel(logging.DEBUG)
+        logger.addHandler(logging.StreamHandler(stream))
+        logs.configure(logger, FakeConfig())
+        try:
+            self.assertIsInstance(logger.handlers[0], logs.DeferredQueueHandler)
+            logger.info("Order for platform: %s", 1)
+            for entryId in range(5):
+                logger.debug("Entry: %s", entryId, extra=dict(logs.sampled, route="order"))
+        finally:
+            logs.stop()
+        self.assertEqual(stream.getvalue().splitlines(),
+                         ["Order for platform: 1", "Entry: 0", "Entry: 1"])
+
+
+if __name__ == '__main__':
+    unittest.main()
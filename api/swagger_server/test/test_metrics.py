@@ -0,0 +1,49 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import unittest
+
+from swagger_server import metrics
+from swagger_server.request_metrics import operation_id
+
+
+class TestMetrics(unittest.TestCase):
+    """metrics unit tests"""
+
+    def setUp(self):
+        self.registry = list(metrics.registry)
+
+    def tearDown(self):
+        metrics.registry[:] = self.registry
+
+    def test_render_histogram(self):
+        histogram = metrics.Histogram("test_seconds", "Test", ["operation"], buckets=(0.1, 1))
+        histogram.observe(0.05, operation='say "hi"')
+        histogram.observe(2, operation='say "hi"')
+        self.assertEqual(histogram.render(), [
+            "# HELP test_seconds Test",
+            "# TYPE test_seconds histogram",
+            'test_seconds_bucket{operation="say \\"hi\\"",le="0.1"} 1',
+            'test_seconds_bucket{operation="say \\"hi\\"",le="1.0"} 1',
+            'test_seconds_bucket{operation="say \\"hi\\"",le="+Inf"} 2',
+            'test_seconds_sum{operation="say \\"hi\\""} 2.05',
+            'test_seconds_count{operation="say \\"hi\\""} 2',
+        ])
+
+    def test_render_counter(self):
+        counter = metrics.Counter("test_total", "Test")
+        self.assertIn("test_total 0", metrics.render().splitlines())
+        counter.inc(3)
+        self.assertEqual(counter.render()[-1], "test_total 3")
+
+    def test_operation_id(self):
+        self.assertEqual(operation_id(
+            "/theonlyway/Openlifter/1_0_0.swagger_server_controllers_lifters_controller_lifter_platform_order_post"),
+            "lifter_platform_order_post")
+        self.assertEqual(operation_id("static"), "static")
+        self.assertIsNone(operation_id(None))
+
+
+if __name__ == '__main__':
+    unittest.main()
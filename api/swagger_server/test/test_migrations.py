@@ -0,0 +1,133 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import os
+import unittest
+import uuid
+
+from pymongo import DESCENDING, MongoClient, errors
+
+from swagger_server import migrations
+
+
+class FakeCollection:
+
+    def __init__(self):
+        self.indexes = []
+        self.documents = {}
+
+    def create_index(self, keys, name, unique=False):
+        if name not in [index[1] for index in self.indexes]:
+            self.indexes.append((keys, name, unique))
+
+    def find_one(self, filter):
+        return self.documents.get(filter['_id'])
+
+    def update_one(self, filter, update, upsert=False):
+        document = self.documents.setdefault(filter['_id'], {'version': 0, 'applied': []})
+        document['version'] = max(document['version'], update['$max']['version'])
+        document['applied'].append(update['$push']['applied'])
+
+
+class FakeDatabase(dict):
+
+    def __missing__(self, name):
+        self[name] = FakeCollection()
+        return self[name]
+
+
+class TestMigrations(unittest.TestCase):
+    """migrations unit tests"""
+
+    def test_migrations_are_ordered(self):
+        versions = [version for version, _, _ in migrations.migrations]
+        self.assertEqual(versions, sorted(set(versions)))
+
+    def test_migrate_is_versioned_and_idempotent(self):
+        database = FakeDatabase()
+        self.assertEqual(migrations.migrate(database),
+                         [version for version, _, _ in migrations.migrations])
+        self.assertEqual(migrations.current_version(database), migrations.latestVersion)
+        self.assertEqual(database["order"].indexes, [([('platform', 1)], "platform_unique", True)])
+        self.assertEqual(database["backup_history"].indexes,
+                         [([('id', 1), ('version', 1)], "id_version_unique", True)])
+        self.assertEqual(migrations.migrate(database), [])
+
+    def test_migrate_resumes_from_stored_version(self):
+        database = FakeDatabase()
+        database["migrations"].documents[migrations.stateId] = {'version': 2, 'applied': []}
+        self.assertEqual(migrations.migrate(database), [3, 4, 5])
+        self.assertEqual(database["order"].indexes, [])
+
+
+def contains_stage(plan, stage):
+    if isinstance(plan, dict):
+        if plan.get('stage') == stage:
+            return True
+        return any(contains_stage(value, stage) for value in plan.values())
+    if isinstance(plan, list):
+        return any(contains_stage(value, stage) for value in plan)
+    return False
+
+
+class TestIndexUsage(unittest.TestCase):
+    """Checks the hot queries use an index, against MONGODB_TEST_URL or a local MongoDB"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = MongoClient(os.environ.get('MONGODB_TEST_URL', "mongodb://localhost:27017"),
+                                 serverSelectionTimeoutMS=500)
+        try:
+            cls.client.admin.command("ping")
+        except errors.PyMongoError:
+            raise unittest.SkipTest("MongoDB is not available")
+        cls.databaseName = f"openlifter_test_{uuid.uuid4().hex[:8]}"
+        cls.database = cls.client[cls.databaseName]
+        migrations.migrate(cls.database)
+        cls.database["order"].insert_many([{'platform': platform} for platform in range(1, 5)])
+        cls.database["backup"].insert_many([{'id': f"meet-{meet}"} for meet in range(5)])
+        cls.database["registrations"].insert_many([{'id': f"lifter-{lifter}"} for lifter in range(5)])
+        cls.database["order_entries"].insert_many(
+            [{'meet': "Meet", 'platform': 1, 'entryId': entryId, 'entry': {}} for entryId in range(20)])
+        cls.database["backup_history"].insert_many(
+            [{'id': "meet-1", 'version': version, 'kind': "delta"} for version in range(1, 20)])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.drop_database(cls.databaseName)
+
+    def assertUsesIndex(self, cursor):
+        plan = cursor.explain()['queryPlanner']['winningPlan']
+        self.assertTrue(contains_stage(plan, "IXSCAN"), plan)
+        self.assertFalse(contains_stage(plan, "COLLSCAN"), plan)
+
+    def test_order_by_platform(self):
+        self.assertUsesIndex(self.database["order"].find({'platform': 1}).limit(1))
+
+    def test_backup_by_id(self):
+        self.assertUsesIndex(self.database["backup"].find({'id': "meet-1"}).limit(1))
+
+    def test_registrations_by_id(self):
+        self.assertUsesIndex(self.database["registrations"].find({'id': "lifter-1"}))
+
+    def test_order_entry_by_id(self):
+        self.assertUsesIndex(self.database["order_entries"].find(
+            {'meet': "Meet", 'platform': 1, 'entryId': 3}).limit(1))
+
+    def test_order_entries_by_platform(self):
+        self.assertUsesIndex(self.database["order_entries"].find({'platform': {'$in': [1, 2]}}))
+
+    def test_backup_history_latest_snapshot(self):
+        self.assertUsesIndex(self.database["backup_history"].find(
+            {'id': "meet-1", 'kind': "snapshot", 'version': {'$lte': 10}}
+        ).sort([('version', DESCENDING)]).limit(1))
+
+    def test_migrations_are_idempotent(self):
+        self.assertEqual(migrations.migrate(self.database), [])
+        for _, _, migration in migrations.migrations:
+            migration(self.database)
+
+
+if __name__ == '__main__':
+    unittest.main()
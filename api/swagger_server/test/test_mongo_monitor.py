@@ -0,0 +1,69 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import unittest
+from types import SimpleNamespace
+
+from swagger_server import metrics, mongo_monitor
+from swagger_server.mongo_monitor import CommandMonitor, command_filter, redact
+from swagger_server.request_metrics import server_timing
+
+
+def run_command(monitor, command_name, command, duration_micros, request_id=1):
+    connectionId = ("localhost", 27017)
+    monitor.started(SimpleNamespace(
+        command_name=command_name, command=command,
+        connection_id=connectionId, request_id=request_id))
+    monitor.succeeded(SimpleNamespace(
+        command_name=command_name, duration_micros=duration_micros,
+        connection_id=connectionId, request_id=request_id))
+
+
+class TestMongoMonitor(unittest.TestCase):
+    """mongo_monitor unit tests"""
+
+    def tearDown(self):
+        mongo_monitor.end_request()
+
+    def test_latency_per_collection(self):
+        monitor = CommandMonitor(100)
+        before = metrics.mongodbLatency.snapshot().get("order/find", {'count': 0})['count']
+        run_command(monitor, "find", {'find': "order", 'filter': {'platform': 1}}, 1500)
+        self.assertEqual(metrics.mongodbLatency.snapshot()["order/find"]['count'], before + 1)
+        self.assertNotIn("mongodb/order/find", metrics.storageLatency.snapshot())
+
+    def test_request_timing(self):
+        monitor = CommandMonitor(100)
+        run_command(monitor, "find", {'find': "order"}, 1000)
+        mongo_monitor.begin_request()
+        run_command(monitor, "find", {'find': "order"}, 2000, request_id=2)
+        run_command(monitor, "update", {'update': "order", 'updates': []}, 3000, request_id=3)
+        run_command(monitor, "find", {'find': "backup"}, 4000, request_id=4)
+        timing = mongo_monitor.end_request()
+        self.assertAlmostEqual(timing.seconds, 0.009)
+        self.assertEqual(timing.describe(), "2 find, 1 update")
+        self.assertEqual(server_timing(0.02, timing, 0.001),
+                         'db;dur=9.00;desc="2 find, 1 update", compute;dur=10.00, serialize;dur=1.00')
+        self.assertIsNone(mongo_monitor.end_request())
+
+    def test_slow_commands_are_logged_redacted(self):
+        monitor = CommandMonitor(5)
+        command = {'update': "backup", 'updates': [
+            {'q': {'id': "secret-meet", 'version': {'$lt': 3}}, 'u': {'$set': {'globalState': {}}}}]}
+        with self.assertLogs(level="WARNING") as logs:
+            run_command(monitor, "update", command, 6000)
+        self.assertIn("backup", logs.output[0])
+        self.assertIn("[{'id': '?', 'version': {'$lt': '?'}}]", logs.output[0])
+        self.assertNotIn("secret-meet", logs.output[0])
+
+    def test_command_filter(self):
+        self.assertEqual(command_filter("find", {'find': "order", 'filter': {'platform': 1}}),
+                         {'platform': 1})
+        self.assertEqual(command_filter("delete", {'delete': "order", 'deletes': [{'q': {'a': 1}}]}),
+                         [{'a': 1}])
+        self.assertEqual(redact({'$in': [1, 2], 'name': None}), {'$in': ["?", "?"], 'name': None})
+
+
+if __name__ == '__main__':
+    unittest.main()
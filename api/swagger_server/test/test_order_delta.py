@@ -0,0 +1,63 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import unittest
+
+from swagger_server.exceptions import OrderVersionConflict
+from swagger_server.order_delta import apply_order_delta
+
+
+def make_document(version=3):
+    return {
+        'platform': 1,
+        'version': version,
+        'meetData': {'name': 'Test meet'},
+        'lightsCode': 'abc',
+        'order': {
+            'orderedEntries': [
+                {'id': 1, 'name': 'A', 'squatKg': [100, 0, 0]},
+                {'id': 2, 'name': 'B', 'squatKg': [110, 0, 0]},
+            ],
+            'attemptOneIndexed': 1,
+            'currentEntryId': 1,
+            'nextAttemptOneIndexed': 1,
+            'nextEntryId': 2,
+        }
+    }
+
+
+class TestOrderDelta(unittest.TestCase):
+    """apply_order_delta unit tests"""
+
+    def test_changed_entries_and_fields_are_applied(self):
+        delta = {
+            'baseVersion': 3,
+            'entries': [{'id': 1, 'name': 'A', 'squatKg': [100, 105, 0]}],
+            'entryOrder': [2, 1],
+            'order': {'currentEntryId': 2, 'nextEntryId': 1},
+        }
+        update = apply_order_delta(1, make_document(), delta)
+        self.assertEqual(update['version'], 4)
+        self.assertEqual([entry['id'] for entry in update['order']['orderedEntries']], [2, 1])
+        self.assertEqual(update['order']['orderedEntries'][1]['squatKg'], [100, 105, 0])
+        self.assertEqual(update['order']['currentEntryId'], 2)
+        self.assertEqual(update['order']['attemptOneIndexed'], 1)
+        self.assertNotIn('meetData', update)
+
+    def test_version_mismatch_requires_resync(self):
+        with self.assertRaises(OrderVersionConflict) as context:
+            apply_order_delta(1, make_document(), {'baseVersion': 2})
+        self.assertEqual(context.exception.version, 3)
+
+    def test_missing_document_requires_resync(self):
+        with self.assertRaises(OrderVersionConflict):
+            apply_order_delta(1, None, {'baseVersion': 1})
+
+    def test_unknown_entry_id_requires_resync(self):
+        with self.assertRaises(OrderVersionConflict):
+            apply_order_delta(1, make_document(), {'baseVersion': 3, 'entryOrder': [1, 2, 3]})
+
+
+if __name__ == '__main__':
+    unittest.main()
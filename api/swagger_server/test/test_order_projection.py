@@ -0,0 +1,108 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import unittest
+
+from swagger_server.order_projection import OrderProjection, build_projection
+
+
+def make_entry(entry_id):
+    return {
+        'id': entry_id,
+        'squatKg': [100, 0, 0], 'squatStatus': [1, 0, 0],
+        'benchKg': [0, 0, 0], 'benchStatus': [0, 0, 0],
+        'deadliftKg': [0, 0, 0], 'deadliftStatus': [0, 0, 0],
+    }
+
+
+def make_document(version, current_entry_id):
+    return {
+        'platform': 1,
+        'version': version,
+        'order': {
+            'orderedEntries': [make_entry(1), make_entry(2)],
+            'attemptOneIndexed': 1,
+            'currentEntryId': current_entry_id,
+        }
+    }
+
+
+class FakeCollection:
+
+    def __init__(self, document):
+        self.document = document
+        self.reads = 0
+
+    def find_one(self, filter):
+        self.reads += 1
+        return self.document
+
+
+class TestOrderProjection(unittest.TestCase):
+    """build_projection unit tests"""
+
+    def test_current_and_next_are_resolved(self):
+        projection = build_projection({
+            'version': 4,
+            'order': {
+                'orderedEntries': [make_entry(3), make_entry(1), make_entry(2)],
+                'attemptOneIndexed': 2,
+                'currentEntryId': 1,
+                'nextAttemptOneIndexed': 2,
+                'nextEntryId': 2,
+                'platformDetails': {'platform': 1},
+            }
+        })
+        self.assertEqual(projection['version'], 4)
+        self.assertEqual(projection['current']['entry']['id'], 1)
+        self.assertEqual(projection['current']['attempt'], 2)
+        self.assertEqual(projection['current']['maxLift']['maxLifts']['squat'], 100)
+        self.assertEqual(projection['next']['entry']['id'], 2)
+        self.assertEqual(projection['next']['attempt'], 2)
+        self.assertEqual(sorted(projection['entriesById']), [1, 2, 3])
+
+    def test_finished_flight_falls_back_to_last_entry(self):
+        projection = build_projection({
+            'order': {
+                'orderedEntries': [make_entry(3), make_entry(1)],
+                'attemptOneIndexed': 3,
+                'currentEntryId': None,
+                'nextAttemptOneIndexed': None,
+                'nextEntryId': None,
+            }
+        })
+        self.assertEqual(projection['current']['entry']['id'], 1)
+        self.assertEqual(projection['next']['entry']['id'], 1)
+        self.assertEqual(projection['next']['attempt'], 3)
+
+
+class TestOrderProjectionUpdates(unittest.TestCase):
+    """OrderProjection unit tests"""
+
+    def setUp(self):
+        self.collection = FakeCollection(make_document(2, 2))
+        self.projection = OrderProjection(lambda: self.collection)
+
+    def test_older_document_is_dropped(self):
+        self.assertIsNotNone(self.projection.update(1, make_document(2, 2)))
+        self.assertIsNone(self.projection.update(1, make_document(1, 1)))
+        self.assertEqual(self.projection.current(1)['entry']['id'], 2)
+        self.assertEqual(self.projection.update(1, make_document(3, 1))['version'], 3)
+        self.assertEqual(self.projection.current(1)['entry']['id'], 1)
+
+    def test_verify_only_rebuilds_a_mismatch(self):
+        report = self.projection.verify(1)
+        self.assertEqual((report['consistent'], report['loaded']), (True, False))
+        self.projection.update(1, make_document(2, 2))
+        self.assertTrue(self.projection.verify(1)['consistent'])
+        self.projection.update(1, make_document(5, 1))
+        report = self.projection.verify(1)
+        self.assertEqual((report['consistent'], report['projectionVersion'], report['storedVersion']),
+                         (False, 5, 2))
+        self.assertEqual(self.projection.get(1)['version'], 2)
+        self.assertEqual(self.projection.current(1)['entry']['id'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
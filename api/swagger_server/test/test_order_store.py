@@ -0,0 +1,157 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import unittest
+from types import SimpleNamespace
+
+from swagger_server.order_store import NormalizedOrderStore
+
+
+def matches(document, filter):
+    for key, condition in filter.items():
+        if key == '$or':
+            if not any(matches(document, option) for option in condition):
+                return False
+            continue
+        value = document.get(key)
+        if not isinstance(condition, dict):
+            condition = {'$eq': condition}
+        for operator, operand in condition.items():
+            if not {'$eq': lambda: value == operand,
+                    '$ne': lambda: value != operand,
+                    '$in': lambda: value in operand,
+                    '$nin': lambda: value not in operand}[operator]():
+                return False
+    return True
+
+
+class FakeCollection:
+
+    def __init__(self):
+        self.documents = []
+        self.writes = []
+
+    def find(self, filter):
+        return [dict(document) for document in self.documents if matches(document, filter)]
+
+    def find_one(self, filter, projection=None):
+        found = [dict(document) for document in self.documents if matches(document, filter)]
+        if len(found) == 0:
+            return None
+        if projection is not None:
+            return {key: found[0].get(key) for key in projection}
+        return found[0]
+
+    def find_one_and_update(self, filter, update, projection, upsert, return_document):
+        document = next((document for document in self.documents if matches(document, filter)), None)
+        if document is None:
+            document = dict(filter)
+            self.documents.append(document)
+        document.update(update['$set'])
+        document['version'] = document.get('version', 0) + update['$inc']['version']
+        return document
+
+    def update_one(self, filter, update):
+        for document in self.documents:
+            if matches(document, filter):
+                document.update(update['$set'])
+                return SimpleNamespace(matched_count=1)
+        return SimpleNamespace(matched_count=0)
+
+    def bulk_write(self, operations, ordered):
+        self.writes.append(len(operations))
+        for operation in operations:
+            self.delete_many(operation._filter)
+            self.documents.append(operation._doc)
+
+    def delete_many(self, filter):
+        self.documents = [document for document in self.documents if not matches(document, filter)]
+
+
+def make_order(entries, current_entry_id=None, meet="Meet"):
+    return {
+        'platform': 1,
+        'meetData': {'name': meet},
+        'lightsCode': "abc",
+        'order': {
+            'orderedEntries': entries,
+            'attemptOneIndexed': 2,
+            'currentEntryId': current_entry_id,
+            'nextAttemptOneIndexed': None,
+            'nextEntryId': None,
+        }
+    }
+
+
+def make_entry(entry_id, squat=100):
+    return {
+        'id': entry_id,
+        'squatKg': [squat, 0, 0], 'squatStatus': [1, 0, 0],
+        'benchKg': [0, 0, 0], 'benchStatus': [0, 0, 0],
+        'deadliftKg': [0, 0, 0], 'deadliftStatus': [0, 0, 0],
+    }
+
+
+class TestNormalizedOrderStore(unittest.TestCase):
+    """NormalizedOrderStore unit tests"""
+
+    def setUp(self):
+        self.orders = FakeCollection()
+        self.entries = FakeCollection()
+        self.store = NormalizedOrderStore(lambda: self.orders, lambda: self.entries)
+
+    def test_round_trip(self):
+        order = make_order([make_entry(3), make_entry(1), make_entry(2)], current_entry_id=1)
+        self.assertEqual(self.store.replace(1, order), 1)
+        self.assertEqual(self.orders.documents[0]['order']['entryIds'], [3, 1, 2])
+        self.assertNotIn('orderedEntries', self.orders.documents[0]['order'])
+        self.assertEqual(self.store.find_one({'platform': 1})['order'], order['order'])
+        self.assertEqual([document['order'] for document in self.store.find({})], [order['order']])
+
+    def test_only_changed_entries_are_written(self):
+        self.store.replace(1, make_order([make_entry(1), make_entry(2), make_entry(3)]))
+        self.store.replace(1, make_order([make_entry(1), make_entry(2, squat=110), make_entry(3)]))
+        update = make_order([make_entry(1), make_entry(2, squat=110), make_entry(4)])
+        self.assertTrue(self.store.update(1, 2, {'order': update['order'], 'version': 3}, update['meetData']))
+        self.assertEqual(self.entries.writes, [3, 1, 1])
+        self.assertEqual(sorted(entry['entryId'] for entry in self.entries.documents), [1, 2, 4])
+        self.assertFalse(self.store.update(1, 2, {'order': update['order'], 'version': 3}, update['meetData']))
+
+    def test_stale_update_leaves_entries(self):
+        self.store.replace(1, make_order([make_entry(1), make_entry(2)]))
+        winner = make_order([make_entry(1, squat=110), make_entry(2)])
+        self.assertTrue(self.store.update(1, 1, {'order': winner['order'], 'version': 2}, winner['meetData']))
+        stored = [dict(entry) for entry in self.entries.documents]
+        stale = make_order([make_entry(1, squat=120), make_entry(3)])
+        self.assertFalse(self.store.update(1, 1, {'order': stale['order'], 'version': 2}, stale['meetData']))
+        self.assertEqual(self.entries.documents, stored)
+        self.assertEqual(self.store.find_one({'platform': 1})['order'], winner['order'])
+        self.store.update(1, 2, {'order': winner['order'], 'version': 3}, winner['meetData'])
+        self.assertEqual(self.entries.writes, [2, 1])
+
+    def test_lifter_reads_one_entry(self):
+        self.store.replace(1, make_order([make_entry(3), make_entry(1)], current_entry_id=3))
+        self.entries.find = None  # only find_one, for the lifter's own entry
+        current = self.store.lifter(1, "current")
+        self.assertEqual((current['entry']['id'], current['attempt']), (3, 2))
+        self.assertEqual(current['maxLift']['maxLifts']['squat'], 100)
+        nextLifter = self.store.lifter(1, "next")
+        self.assertEqual((nextLifter['entry']['id'], nextLifter['attempt']), (1, 3))
+
+    def test_meet_change_replaces_entries(self):
+        self.store.replace(1, make_order([make_entry(1), make_entry(2)]))
+        store = NormalizedOrderStore(lambda: self.orders, lambda: self.entries)
+        store.replace(1, make_order([make_entry(1)], meet="Other meet"))
+        self.assertEqual([(entry['meet'], entry['entryId']) for entry in self.entries.documents],
+                         [("Other meet", 1)])
+
+    def test_reads_embedded_documents(self):
+        order = make_order([make_entry(1)], current_entry_id=1)
+        self.orders.documents.append(dict(order, version=1))
+        self.assertEqual(self.store.find_one({'platform': 1})['order'], order['order'])
+        self.assertEqual(self.store.lifter(1, "current")['entry']['id'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import unittest
+
+from swagger_server.points import get_points, projected_total_kg, score_entries
+
+
+def make_entry(sex, bodyweight_kg, equipment="Sleeves", events=None):
+    return {
+        'sex': sex,
+        'bodyweightKg': bodyweight_kg,
+        'equipment': equipment,
+        'events': events if events is not None else ["SBD"],
+        'squatKg': [180, 190, 200], 'squatStatus': [1, 1, -1],
+        'benchKg': [120, 125, 0], 'benchStatus': [1, 0, 0],
+        'deadliftKg': [0, 0, 0], 'deadliftStatus': [0, 0, 0],
+    }
+
+
+class TestPoints(unittest.TestCase):
+    """points unit tests, expected values from src/logic/coefficients"""
+
+    def test_formulas_match_client(self):
+        cases = [
+            ("Wilks", make_entry("M", 83.2, "Raw"), "SBD", 500.5, 333.6083020574309),
+            ("Dots", make_entry("M", 83.2, "Raw"), "SBD", 500.5, 337.4253005202141),
+            ("Wilks2020", make_entry("M", 83.2, "Raw"), "SBD", 500.5, 400.6691098857406),
+            ("Glossbrenner", make_entry("M", 83.2, "Raw"), "SBD", 500.5, 320.87307945122546),
+            ("IPF GL Points", make_entry("M", 83.2, "Raw"), "SBD", 500.5, 0),
+            ("IPF GL Points", make_entry("F", 67.5), "SBD", 500.5, 104.98911978966407),
+            ("IPF Points", make_entry("F", 67.5), "SBD", 500.5, 843.7498009179384),
+            ("Reshel", make_entry("F", 67.5), "SBD", 500.5, 821.0127323742905),
+            ("Schwartz/Malone", make_entry("F", 67.5), "SBD", 500.5, 390.4092346546806),
+            ("AH", make_entry("F", 67.5), "SBD", 500.5, 465.22531592576377),
+            ("IPF GL Points", make_entry("Mx", 105, "Single-ply"), "B", 800, 248.40411599173177),
+            ("Schwartz/Malone", make_entry("Mx", 105, "Single-ply"), "B", 800, 0),
+            ("NASA Points", make_entry("Mx", 105), "B", 800, 9.27736838095238),
+            ("Bodyweight Multiple", make_entry("Mx", 105), "B", 800, 7.619047619047619),
+        ]
+        for formula, entry, event, total_kg, expected in cases:
+            self.assertAlmostEqual(get_points(formula, entry, event, total_kg, True),
+                                   expected, places=9, msg=formula)
+
+    def test_total_in_lbs(self):
+        self.assertAlmostEqual(get_points("Total", make_entry("M", 90), "SBD", 100, False),
+                               220.462262)
+
+    def test_projected_total(self):
+        self.assertEqual(projected_total_kg(make_entry("M", 90)), 190 + 120)
+        entry = make_entry("M", 90)
+        entry['benchStatus'] = [-1, 0, 0]
+        self.assertEqual(projected_total_kg(entry), 0)
+
+    def test_score_entries(self):
+        entries = [make_entry("M", 83.2), make_entry("F", 67.5, events=[])]
+        self.assertEqual(score_entries({'formula': "Dots", 'inKg': True}, entries), 2)
+        self.assertEqual(entries[0]['points'], round(get_points(
+            "Dots", entries[0], "SBD", 310, True), 2))
+        self.assertEqual(entries[1]['points'], round(get_points(
+            "Dots", entries[1], "SBD", 310, True), 2))
+
+    def test_score_entries_without_formula(self):
+        entries = [dict(make_entry("M", 83.2), points=12.5)]
+        self.assertEqual(score_entries({'inKg': True}, entries), 0)
+        self.assertEqual(entries[0]['points'], 12.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
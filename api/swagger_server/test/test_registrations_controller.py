@@ -5,7 +5,7 @@ from __future__ import absolute_import
 from flask import json
 from six import BytesIO
 
-from swagger_server.models.current_lifter import CurrentLifter  # noqa: E501
+from swagger_server.models.registrations_import_report import RegistrationsImportReport  # noqa: E501
 from swagger_server.test import BaseTestCase
 
 
@@ -15,9 +15,9 @@ class TestRegistrationsController(BaseTestCase):
     def test_registrations_put(self):
         """Test case for registrations_put
 
-        Returns the current lifter
+        Imports registrations
         """
-        body = Object()
+        body = [{'id': "1"}]
         response = self.client.open(
             '/theonlyway/Openlifter/1.0.0/registrations',
             method='PUT',
@@ -0,0 +1,103 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import io
+import json
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from pymongo.errors import BulkWriteError
+
+from swagger_server import registrations_import
+from swagger_server.registrations_import import import_registrations, iter_json_array, iter_json_lines
+
+
+class FakeCollection:
+
+    def __init__(self, existing=(), failing=()):
+        self.ids = set(existing)
+        self.failing = set(failing)
+        self.batches = []
+
+    def bulk_write(self, operations, ordered):
+        self.batches.append(len(operations))
+        upserted, matched, writeErrors = 0, 0, []
+        for index, operation in enumerate(operations):
+            registrationId = operation._filter['id']
+            if registrationId in self.failing:
+                writeErrors.append({'index': index, 'errmsg': "E11000 duplicate key"})
+            elif registrationId in self.ids:
+                matched += 1
+            else:
+                self.ids.add(registrationId)
+                upserted += 1
+        if len(writeErrors) > 0:
+            raise BulkWriteError({'nUpserted': upserted, 'nMatched': matched, 'writeErrors': writeErrors})
+        return SimpleNamespace(upserted_count=upserted, matched_count=matched)
+
+
+def stream(value):
+    return io.BytesIO(value.encode())
+
+
+class TestRegistrationsImport(unittest.TestCase):
+    """registrations_import unit tests"""
+
+    def test_json_array_across_chunks(self):
+        registrations = [{'id': index, 'name': f"Lifter {index} é", 'weights': [1.5, -20e3]}
+                         for index in range(30)] + [1234567, None, "text"]
+        with mock.patch.object(registrations_import, "chunkSize", 5):
+            self.assertEqual(list(iter_json_array(stream(json.dumps(registrations, indent=1)))),
+                             registrations)
+        self.assertEqual(list(iter_json_array(stream(" [ ] "))), [])
+
+    def test_malformed_json_array(self):
+        for body in ('{"id": 1}', '[{"id": 1}', '[1 2]', ''):
+            with self.assertRaises(ValueError, msg=body):
+                list(iter_json_array(stream(body)))
+
+    def test_tokens_cut_at_any_chunk_boundary(self):
+        body = '[{"a": true, "b": false, "c": null, "d": "\\ud83d\\ude00 \\"x\\"", "e": -1.5e-3}, "' + "y" * 40 + '"]'
+        for size in range(1, 16):
+            with mock.patch.object(registrations_import, "chunkSize", size):
+                self.assertEqual(list(iter_json_array(stream(body))), json.loads(body), msg=size)
+
+    def test_malformed_item_fails_without_reading_the_rest(self):
+        body = io.BytesIO(('[{"id": 1}, {"id": oops}, ' + ", ".join(['{"id": 2}'] * 5000) + ']').encode())
+        reads = []
+        read = body.read
+        body.read = lambda size: reads.append(size) or read(size)
+        with mock.patch.object(registrations_import, "chunkSize", 64):
+            items = iter_json_array(body)
+            self.assertEqual(next(items), {'id': 1})
+            with self.assertRaises(ValueError):
+                next(items)
+        self.assertLess(len(reads), 5)
+
+    def test_json_lines(self):
+        records = list(iter_json_lines(stream('{"id": 1}\n\nnot json\n{"id": 2}')))
+        self.assertEqual(records[0], {'id': 1})
+        self.assertIsInstance(records[1], ValueError)
+        self.assertEqual(records[2], {'id': 2})
+
+    def test_report(self):
+        collection = FakeCollection(existing=[1], failing=[4])
+        registrations = [{'id': index} for index in range(6)] + [{'name': "No id"}]
+        report = import_registrations(collection, iter(registrations), 3)
+        self.assertEqual(collection.batches, [3, 3])
+        self.assertEqual({key: report[key] for key in ('status', 'received', 'inserted', 'updated', 'failed')},
+                         {'status': "fail", 'received': 7, 'inserted': 4, 'updated': 1, 'failed': 2})
+        self.assertEqual([(error['index'], error['id']) for error in report['errors']],
+                         [(4, 4), (6, None)])
+
+    def test_malformed_body_keeps_what_was_read(self):
+        collection = FakeCollection()
+        report = import_registrations(collection, iter_json_array(stream('[{"id": 1}, {"id": 2}, oops]')), 10)
+        self.assertEqual((report['status'], report['inserted']), ("fail", 2))
+        self.assertIn("Malformed body after 2 registrations", report['message'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -25,6 +25,19 @@ class TestResultsController(BaseTestCase):
         self.assert200(response,
                        'Response body is : ' + response.data.decode('utf-8'))
 
+    def test_lifter_results_divisions_get(self):
+        """Test case for lifter_results_divisions_get
+
+        Get the division standings
+        """
+        query_string = [('division', 'division_example')]
+        response = self.client.open(
+            '/theonlyway/Openlifter/1.0.0/lifter/results/divisions',
+            method='GET',
+            query_string=query_string)
+        self.assert200(response,
+                       'Response body is : ' + response.data.decode('utf-8'))
+
 
 if __name__ == '__main__':
     import unittest
@@ -0,0 +1,73 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from swagger_server import startup
+from swagger_server.config import LazyClient
+
+
+class TestStartup(unittest.TestCase):
+    """startup unit tests"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, "swagger.yaml")
+        self.cachePath = os.path.join(self.directory, "swagger.json")
+        with open(self.path, "w") as specification:
+            specification.write("openapi: 3.0.0\ninfo:\n  title: {{ title }}\npaths: {}\n")
+
+    def test_specification_is_rendered_once(self):
+        rendered = startup.load_specification(self.path, {'title': "API"}, self.cachePath)
+        self.assertEqual(rendered['info'], {'title': "API"})
+        with mock.patch.object(startup, '_render_specification') as render:
+            self.assertEqual(startup.load_specification(self.path, {'title': "API"}, self.cachePath), rendered)
+        render.assert_not_called()
+
+    def test_changed_specification_or_arguments_render_again(self):
+        startup.load_specification(self.path, {'title': "API"}, self.cachePath)
+        self.assertEqual(startup.load_specification(
+            self.path, {'title': "Other"}, self.cachePath)['info']['title'], "Other")
+        with open(self.path, "a") as specification:
+            specification.write("servers: []\n")
+        self.assertEqual(startup.load_specification(
+            self.path, {'title': "Other"}, self.cachePath)['servers'], [])
+
+    def test_unreadable_or_disabled_cache(self):
+        with open(self.cachePath, "w") as cache:
+            cache.write("{not json")
+        self.assertEqual(startup.load_specification(
+            self.path, {'title': "API"}, self.cachePath)['info']['title'], "API")
+        self.assertEqual(startup.load_specification(
+            self.path, {'title': "API"}, "")['info']['title'], "API")
+        self.assertEqual(sorted(os.listdir(self.directory)), ["swagger.json", "swagger.yaml"])
+
+    def test_report_lists_nested_phases(self):
+        with mock.patch.object(startup, 'phases', []):
+            with startup.phase("migrations"):
+                with startup.phase("mongodb client"):
+                    pass
+            lines = startup.report().splitlines()
+        self.assertTrue(lines[1].startswith("  mongodb client"))
+        self.assertTrue(lines[2].startswith("migrations"))
+        self.assertTrue(lines[3].startswith("total"))
+
+    def test_lazy_client_is_created_once(self):
+        created = []
+
+        class Holder:
+            client = LazyClient(lambda: created.append(1) or object())
+
+        self.assertEqual(created, [])
+        self.assertIs(Holder().client, Holder.client)
+        self.assertEqual(created, [1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from bson import Binary
+from pymongo import DESCENDING, ReplaceOne, ReturnDocument, UpdateOne, errors
+
+from swagger_server import migrations
+from swagger_server.order_store import NormalizedOrderStore
+from swagger_server.storage import MemoryDatabase, SqliteDatabase
+
+
+class StorageCases:
+    """Cases every storage backend has to pass"""
+
+    def make_database(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.database = self.make_database()
+        self.collection = self.database["order"]
+
+    def test_upsert_then_update(self):
+        result = self.collection.update_one(
+            {'platform': 1}, {'$set': {'lightsCode': "abc"}}, upsert=True)
+        self.assertIsNotNone(result.upserted_id)
+        result = self.collection.update_one({'platform': 1}, {'$set': {'lightsCode': "xyz"}})
+        self.assertEqual((result.matched_count, result.modified_count), (1, 1))
+        result = self.collection.update_one({'platform': 1}, {'$set': {'lightsCode': "xyz"}})
+        self.assertEqual((result.matched_count, result.modified_count), (1, 0))
+        document = self.collection.find_one({'platform': 1}, {'_id': False})
+        self.assertEqual(document, {'platform': 1, 'lightsCode': "xyz"})
+        self.assertEqual(self.collection.update_one({'platform': 2}, {'$set': {'a': 1}}).matched_count, 0)
+
+    def test_find_one_and_update_versions(self):
+        for expected in (1, 2):
+            document = self.collection.find_one_and_update(
+                {'platform': 1}, {'$set': {'order': {'entryIds': [expected]}}, '$inc': {'version': 1}},
+                projection={'version': True}, upsert=True, return_document=ReturnDocument.AFTER)
+            self.assertEqual(document['version'], expected)
+            self.assertNotIn('order', document)
+        self.assertEqual(self.collection.update_one(
+            {'platform': 1, 'version': 1}, {'$set': {'order': {}}}).matched_count, 0)
+
+    def test_filters_projection_and_sort(self):
+        for version in range(1, 6):
+            self.collection.insert_one({'id': "meet", 'version': version,
+                                        'kind': "snapshot" if version % 2 else "delta"})
+        self.assertEqual(self.collection.find_one(
+            {'id': "meet", 'version': {'$lte': 4}, 'kind': "snapshot"},
+            {'version': True}, sort=[('version', DESCENDING)])['version'], 3)
+        self.assertEqual([document['version'] for document in self.collection.find(
+            {'$or': [{'version': {'$in': [1, 2]}}, {'kind': {'$ne': "snapshot"}}]},
+            sort=[('version', DESCENDING)])], [4, 2, 1])
+        self.assertEqual(sorted(self.collection.find({'version': {'$nin': [1, 2, 3]}}, {'_id': False, 'id': False})[0]),
+                         ['kind', 'version'])
+        result = self.collection.delete_many({'id': "meet", 'version': {'$lt': 3}})
+        self.assertEqual(result.deleted_count, 2)
+        self.assertEqual(len(self.collection.find({})), 3)
+
+    def test_migration_state_updates(self):
+        applied = migrations.migrate(self.database)
+        self.assertEqual(applied, [version for version, _, _ in migrations.migrations])
+        self.assertEqual(migrations.current_version(self.database), migrations.latestVersion)
+        self.assertEqual(migrations.migrate(self.database), [])
+        state = self.database["migrations"].find_one({'_id': migrations.stateId})
+        self.assertEqual(len(state['applied']), len(migrations.migrations))
+
+    def test_unique_index(self):
+        self.collection.create_index([('platform', 1)], name="platform_unique", unique=True)
+        self.collection.insert_one({'platform': 1})
+        with self.assertRaises(errors.DuplicateKeyError):
+            self.collection.insert_one({'platform': 1})
+        self.collection.insert_one({'platform': 2})
+        with self.assertRaises(errors.DuplicateKeyError):
+            self.collection.update_one({'platform': 2}, {'$set': {'platform': 1}})
+        self.assertEqual(self.collection.find_one({'platform': 2}, {'_id': False}), {'platform': 2})
+
+    def test_bulk_write_reports_duplicates(self):
+        registrations = self.database["registrations"]
+        registrations.create_index([('id', 1)], name="id_unique", unique=True)
+        registrations.create_index([('name', 1)], name="name_unique", unique=True)
+        registrations.insert_one({'id': 0, 'name': "taken"})
+        with self.assertRaises(errors.BulkWriteError) as raised:
+            registrations.bulk_write([
+                UpdateOne({'id': 1}, {'$set': {'id': 1, 'name': "a"}}, upsert=True),
+                UpdateOne({'id': 2}, {'$set': {'id': 2, 'name': "taken"}}, upsert=True),
+                UpdateOne({'id': 0}, {'$set': {'id': 0, 'name': "b"}}, upsert=True),
+            ], ordered=False)
+        details = raised.exception.details
+        self.assertEqual([error['index'] for error in details['writeErrors']], [1])
+        self.assertEqual((details['nUpserted'], details['nMatched']), (1, 1))
+        result = registrations.bulk_write([
+            ReplaceOne({'id': 3}, {'id': 3, 'name': "c"}, upsert=True),
+            ReplaceOne({'id': 3}, {'id': 3, 'name': "d"}, upsert=True)], ordered=False)
+        self.assertEqual((result.upserted_count, result.matched_count), (1, 1))
+        self.assertEqual(registrations.find_one({'id': 3})['name'], "d")
+
+    def test_binary_round_trip(self):
+        self.database["backup"].update_one(
+            {'id': "meet"}, {'$set': {'encoded': Binary(b"\x1f\x8b\x00")}}, upsert=True)
+        self.assertEqual(bytes(self.database["backup"].find_one({'id': "meet"})['encoded']), b"\x1f\x8b\x00")
+
+    def test_returned_documents_are_copies(self):
+        order = {'platform': 1, 'order': {'orderedEntries': [{'id': 1}]}}
+        self.collection.insert_one(order)
+        order['order']['orderedEntries'].append({'id': 2})
+        document = self.collection.find_one({'platform': 1})
+        document['order']['orderedEntries'].clear()
+        self.assertEqual(self.collection.find_one({'platform': 1})['order']['orderedEntries'], [{'id': 1}])
+
+    def test_concurrent_increments(self):
+        def increment():
+            for _ in range(50):
+                self.collection.find_one_and_update(
+                    {'platform': 1}, {'$inc': {'version': 1}}, upsert=True)
+        threads = [threading.Thread(target=increment) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.collection.find_one({'platform': 1})['version'], 200)
+
+    def test_normalized_order_store(self):
+        migrations.migrate(self.database)
+        store = NormalizedOrderStore(lambda: self.database["order"], lambda: self.database["order_entries"])
+        entries = [{'id': entryId, 'name': f"Lifter {entryId}"} for entryId in range(3)]
+        order = {'platform': 1, 'meetData': {'name': "Meet"}, 'lightsCode': None,
+                 'order': {'orderedEntries': entries, 'currentEntryId': 1}}
+        self.assertEqual(store.replace(1, order), 1)
+        self.assertEqual(store.find_one({'platform': 1})['order']['orderedEntries'], entries)
+        update = {'order': {'orderedEntries': entries[:2], 'currentEntryId': 0}, 'version': 2}
+        self.assertTrue(store.update(1, 1, update, order['meetData']))
+        self.assertFalse(store.update(1, 1, update, order['meetData']))
+        self.assertEqual(len(self.database["order_entries"].find({'platform': 1})), 2)
+
+
+class TestMemoryStorage(StorageCases, unittest.TestCase):
+    """MemoryDatabase unit tests"""
+
+    def make_database(self):
+        return MemoryDatabase()
+
+
+class TestSqliteStorage(StorageCases, unittest.TestCase):
+    """SqliteDatabase unit tests"""
+
+    def make_database(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        return SqliteDatabase(os.path.join(self.directory, "openlifter.db"))
+
+    def test_wal_mode_and_index_usage(self):
+        migrations.migrate(self.database)
+        with self.database.connection() as connection:
+            self.assertEqual(connection.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+            plan = connection.execute(
+                "EXPLAIN QUERY PLAN SELECT document FROM \"order\" "
+                "WHERE json_extract(document, '$.platform') = ?", (1,)).fetchall()
+        self.assertIn("platform_unique", " ".join(str(row) for row in plan))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import json
+import unittest
+from unittest import mock
+
+import flask
+
+from swagger_server.controllers import websocket_controller
+from swagger_server.websocket_hub import Subscriber, TopicHub
+
+
+class TestHandleMessage(unittest.TestCase):
+    """websocket_controller.handle_message unit tests"""
+
+    def setUp(self):
+        self.hub = TopicHub()
+        patcher = mock.patch.object(websocket_controller, 'hub', self.hub)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.subscriber = Subscriber()
+
+    def test_malformed_messages_are_ignored(self):
+        for message in ("not json", "[]", "1", "null", '{"subscribe": "lights/1"}',
+                        '{"subscribe": [1, null, {"topic": "lights/1"}]}', '{"unsubscribe": [[]]}'):
+            websocket_controller.handle_message(self.subscriber, message)
+        self.assertFalse(self.hub.has_subscribers("lights/1"))
+
+    def test_subscribe_and_unsubscribe(self):
+        self.hub.publish("lights/1", {'decision': "good lift"})
+        websocket_controller.handle_message(
+            self.subscriber, json.dumps({'subscribe': ["lights/1", "unknown/1"]}))
+        self.assertTrue(self.hub.has_subscribers("lights/1"))
+        self.assertEqual([json.loads(message)['topic'] for message in self.subscriber.take(0)], ["lights/1"])
+        websocket_controller.handle_message(self.subscriber, json.dumps({'unsubscribe': ["lights/1"]}))
+        self.assertFalse(self.hub.has_subscribers("lights/1"))
+
+
+class FakeWebSocket:
+
+    def __init__(self):
+        self.closed = None
+
+    def close(self, reason, message):
+        self.closed = reason
+
+    def receive(self):
+        raise ConnectionError("closed")
+
+    def send(self, message):
+        pass
+
+
+class TestServe(unittest.TestCase):
+    """websocket_controller.serve unit tests"""
+
+    def connect(self, api_key, query_string=None):
+        ws = FakeWebSocket()
+        with mock.patch.object(websocket_controller.config, 'apiKey', api_key):
+            with flask.Flask(__name__).test_request_context(query_string=query_string):
+                websocket_controller.serve(ws)
+        return ws.closed
+
+    def test_missing_or_wrong_key_is_rejected(self):
+        self.assertEqual(self.connect(None), 1008)
+        self.assertEqual(self.connect(None, {'api_key': ""}), 1008)
+        self.assertEqual(self.connect("secret"), 1008)
+        self.assertEqual(self.connect("secret", {'api_key': "wrong"}), 1008)
+
+    def test_matching_key_is_accepted(self):
+        self.assertIsNone(self.connect("secret", {'api_key': "secret"}))
+
+
+if __name__ == '__main__':
+    unittest.main()
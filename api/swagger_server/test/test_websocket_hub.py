@@ -0,0 +1,55 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import json
+import unittest
+
+from swagger_server.websocket_hub import Subscriber, TopicHub
+
+
+class TestTopicHub(unittest.TestCase):
+    """TopicHub unit tests"""
+
+    def test_slow_subscriber_only_gets_latest_state(self):
+        hub = TopicHub()
+        subscriber = Subscriber()
+        hub.subscribe(subscriber, "platform/1/current")
+        for attempt in range(1, 4):
+            hub.publish("platform/1/current", {'attempt': attempt})
+        messages = subscriber.take(0)
+        self.assertEqual([json.loads(message)['data'] for message in messages], [{'attempt': 3}])
+
+    def test_unchanged_state_is_not_broadcast(self):
+        hub = TopicHub()
+        subscriber = Subscriber()
+        hub.subscribe(subscriber, "lights/1")
+        self.assertTrue(hub.publish("lights/1", {'decision': None}))
+        subscriber.take(0)
+        self.assertFalse(hub.publish("lights/1", {'decision': None}))
+        self.assertEqual(subscriber.take(0), [])
+
+    def test_new_subscriber_gets_cached_or_loaded_state(self):
+        hub = TopicHub()
+        hub.set_loader("leaderboard", lambda topic: {'filter': topic.split("/")[1]})
+        hub.publish("platform/1/next", {'attempt': 2})
+        subscriber = Subscriber()
+        hub.subscribe(subscriber, "platform/1/next")
+        hub.subscribe(subscriber, "leaderboard/points")
+        messages = [json.loads(message) for message in subscriber.take(0)]
+        self.assertEqual(messages, [
+            {'topic': "platform/1/next", 'data': {'attempt': 2}},
+            {'topic': "leaderboard/points", 'data': {'filter': "points"}},
+        ])
+
+    def test_disconnected_subscriber_is_removed(self):
+        hub = TopicHub()
+        subscriber = Subscriber()
+        hub.subscribe(subscriber, "platform/1/current")
+        hub.disconnect(subscriber)
+        self.assertFalse(hub.has_subscribers("platform/1/current"))
+        self.assertTrue(subscriber.closed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import json
+import threading
+
+from swagger_server.config import logger
+from swagger_server import metrics
+
+
+class Subscriber:
+    """One WebSocket connection's view of the hub
+
+    Holds at most one undelivered message per topic. A newer message for a
+    topic replaces the undelivered one, so a slow screen skips straight to
+    the latest state instead of building up a queue.
+    """
+
+    def __init__(self):
+        self.topics = set()
+        self._pending = {}
+        self._condition = threading.Condition()
+        self._closed = False
+
+    def offer(self, topic, message):
+        with self._condition:
+            if topic in self._pending:
+                metrics.websocketDroppedMessages.inc()
+            self._pending[topic] = message
+            self._condition.notify()
+
+    def take(self, timeout):
+        """Waits for undelivered messages and returns them, oldest topic first
+
+        :rtype: list
+        """
+        with self._condition:
+            if len(self._pending) == 0 and not self._closed:
+                self._condition.wait(timeout)
+            messages = list(self._pending.values())
+            self._pending = {}
+            return messages
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+
+
+class TopicHub:
+    """Fans out topic updates to subscribed WebSocket connections
+
+    Each update is encoded once and handed to every subscriber of the
+    topic. The latest message per topic is kept so new subscribers get the
+    current state straight away. Topics without a cached message are
+    loaded on first subscription with the loader registered for the first
+    segment of the topic, e.g. "platform" for "platform/1/current".
+    """
+
+    def __init__(self):
+        self._latest = {}
+        self._subscribers = {}
+        self._loaders = {}
+        self._lock = threading.Lock()
+
+    def set_loader(self, kind, loader):
+        self._loaders[kind] = loader
+
+    def has_subscribers(self, topic):
+        return len(self._subscribers.get(topic, ())) > 0
+
+    def publish(self, topic, data):
+        """Publishes data to topic unless it is unchanged
+
+        :rtype: bool
+        """
+        message = json.dumps({'topic': topic, 'data': data},
+                             separators=(',', ':'), default=str)
+        with self._lock:
+            if self._latest.get(topic) == message:
+                return False
+            self._latest[topic] = message
+            subscribers = list(self._subscribers.get(topic, ()))
+        for subscriber in subscribers:
+            subscriber.offer(topic, message)
+        metrics.websocketBroadcasts.inc()
+        return True
+
+    def subscribe(self, subscriber, topic):
+        with self._lock:
+            self._subscribers.setdefault(topic, set()).add(subscriber)
+            subscriber.topics.add(topic)
+            message = self._latest.get(topic)
+        if message is not None:
+            subscriber.offer(topic, message)
+            return
+        loader = self._loaders.get(topic.split("/")[0])
+        if loader is None:
+            return
+        try:
+            data = loader(topic)
+        except Exception as e:
+            logger.info(f"Could not load initial state for topic: {topic}: {e}")
+            return
+        if data is not None and not self.publish(topic, data):
+            subscriber.offer(topic, self._latest[topic])
+
+    def unsubscribe(self, subscriber, topic):
+        with self._lock:
+            subscribers = self._subscribers.get(topic)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if len(subscribers) == 0:
+                    del self._subscribers[topic]
+            subscriber.topics.discard(topic)
+
+    def disconnect(self, subscriber):
+        for topic in list(subscriber.topics):
+            self.unsubscribe(subscriber, topic)
+        subscriber.close()
+
+
+hub = TopicHub()
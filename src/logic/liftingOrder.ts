@@ -295,6 +295,122 @@ const getNextEntryInfo = (
   return null;
 };
 
+// The last order acknowledged by the streaming API for each platform.
+// Kept so that later updates only need to send the entries that changed.
+type AcknowledgedOrder = {
+  version: number;
+  entries: Map<number, string>;
+  meetData: string;
+  lightsCode: string | null;
+};
+
+const acknowledgedOrders = new Map<number, AcknowledgedOrder>();
+
+// Order as posted to the streaming API.
+type StreamingOrder = LiftingOrder & {
+  platformDetails: LiftingState;
+};
+
+// Order delta as accepted by PATCH /lifter/{platform}/order.
+type StreamingOrderDelta = {
+  baseVersion: number;
+  entries: Array<Entry>;
+  entryOrder: Array<number>;
+  order: Omit<StreamingOrder, "orderedEntries">;
+  meetData?: MeetState;
+  lightsCode?: string | null;
+};
+
+// Sends the order to the streaming API.
+//
+// The first post for a platform sends everything. After that only the changed
+// entries are sent, based on the last version the API acknowledged. If the API
+// no longer has that version it answers with a conflict and we resync in full.
+const postStreamingOrder = (
+  streaming: StreamingState,
+  platform: number,
+  headers: HeadersInit,
+  meet: MeetState,
+  order: StreamingOrder
+): void => {
+  const url = streaming.apiUrl + "/lifter/" + platform + "/order";
+  const entries = new Map<number, string>();
+  for (let i = 0; i < order.orderedEntries.length; i++) {
+    entries.set(order.orderedEntries[i].id, JSON.stringify(order.orderedEntries[i]));
+  }
+  const meetData = JSON.stringify(meet);
+  const lightsCode = streaming.lightsCode;
+
+  const postFullOrder = () => {
+    acknowledgedOrders.delete(platform);
+    fetch(url, {
+      method: "POST",
+      headers: headers,
+      body: JSON.stringify({
+        meetData: meet,
+        lightsCode: lightsCode,
+        order: order,
+      }),
+    })
+      .then((response) => response.json())
+      .then((json) => {
+        if (typeof json.version === "number") {
+          acknowledgedOrders.set(platform, { version: json.version, entries, meetData, lightsCode });
+        }
+      })
+      .catch((error) => {
+        console.log(error);
+      });
+  };
+
+  const acknowledged = acknowledgedOrders.get(platform);
+  if (acknowledged === undefined) {
+    postFullOrder();
+    return;
+  }
+
+  const delta: StreamingOrderDelta = {
+    baseVersion: acknowledged.version,
+    entries: order.orderedEntries.filter((entry) => acknowledged.entries.get(entry.id) !== entries.get(entry.id)),
+    entryOrder: order.orderedEntries.map((entry) => entry.id),
+    order: {
+      attemptOneIndexed: order.attemptOneIndexed,
+      currentEntryId: order.currentEntryId,
+      nextAttemptOneIndexed: order.nextAttemptOneIndexed,
+      nextEntryId: order.nextEntryId,
+      platformDetails: order.platformDetails,
+    },
+  };
+  if (meetData !== acknowledged.meetData) {
+    delta.meetData = meet;
+  }
+  if (lightsCode !== acknowledged.lightsCode) {
+    delta.lightsCode = lightsCode;
+  }
+
+  // The API bumps the version by one for every delta it applies, so assume
+  // success to let the next update build on this one without waiting.
+  acknowledgedOrders.set(platform, { version: acknowledged.version + 1, entries, meetData, lightsCode });
+  fetch(url, {
+    method: "PATCH",
+    headers: headers,
+    body: JSON.stringify(delta),
+  })
+    .then((response) => {
+      if (response.status === 409) {
+        postFullOrder();
+      } else if (!response.ok) {
+        // The API never applied this delta, so the version assumed above is
+        // wrong. Start again from a full order next time.
+        acknowledgedOrders.delete(platform);
+      }
+    })
+    .catch((error) => {
+      acknowledgedOrders.delete(platform);
+      console.log(error);
+    });
+};
+
 // Main application logic. Resolves the LiftingState to a LiftingOrder.
 export const getLiftingOrder = (
   entriesInFlight: Array<Entry>,
@@ -321,26 +437,14 @@ export const getLiftingOrder = (
         "Content-Type": "application/json",
       };
     }
-    fetch(streaming.apiUrl + "/lifter/" + lifting.platform + "/order", {
-      method: "POST",
-      headers: fetchHeaders,
-      body: JSON.stringify({
-        meetData: meet,
-        lightsCode: streaming.lightsCode,
-        order: {
-          orderedEntries: orderedEntries,
-          attemptOneIndexed: attemptOneIndexed,
-          currentEntryId: currentEntryId,
-          nextAttemptOneIndexed: nextEntryInfo ? nextEntryInfo.attemptOneIndexed : null,
-          nextEntryId: nextEntryInfo ? nextEntryInfo.entryId : null,
-          platformDetails: lifting,
-        },
-      }),
-    })
-      .then((response) => response.json())
-      .catch((error) => {
-        console.log(error);
-      });
+    postStreamingOrder(streaming, lifting.platform, fetchHeaders, meet, {
+      orderedEntries: orderedEntries,
+      attemptOneIndexed: attemptOneIndexed,
+      currentEntryId: currentEntryId,
+      nextAttemptOneIndexed: nextEntryInfo ? nextEntryInfo.attemptOneIndexed : null,
+      nextEntryId: nextEntryInfo ? nextEntryInfo.entryId : null,
+      platformDetails: lifting,
+    });
 
     fetch(streaming.apiUrl + "/backup/" + meet.name, {
       method: "POST",
@@ -5,6 +5,7 @@ const lifterType = urlParams.get("lifter") || "current";
 const authRequired = JSON.parse(urlParams.get("auth") || true);
 const apiUrl = urlParams.get("apiurl") || "http://localhost:8080/theonlyway/Openlifter/1.0.0";
 const apiKey = urlParams.get("apikey") || "441b6244-8a4f-4e0f-8624-e5c665ecc901";
+const useEvents = JSON.parse(urlParams.get("events") || false);
 
 var timeInSecs;
 // eslint-disable-next-line @typescript-eslint/no-unused-vars
@@ -99,45 +100,67 @@ function getCurrentLifter() {
     headers: fetchHeaders,
   })
     .then((response) => response.json())
-    .then((data) => {
-      var lift;
+    .then((data) => renderLifter(data));
+}
 
-      switch (data.platformDetails.lift) {
-        case "S":
-          lift = "Squat";
-          lifterAttemptKgs1 = data.entry.squatKg[0] || "-";
-          lifterAttemptKgs2 = data.entry.squatKg[1] || "-";
-          lifterAttemptKgs3 = data.entry.squatKg[2] || "-";
+// Subscribes to lifter changes pushed by the API instead of polling for them.
+function subscribeToLifters() {
+  var eventsUrl = apiUrl + "/lifter/" + platform + "/events";
+  if (authRequired == true) {
+    eventsUrl += "?api_key=" + encodeURIComponent(apiKey);
+  }
+  var source = new EventSource(eventsUrl);
+  source.addEventListener("lifters", (event) => {
+    var data = JSON.parse(event.data)[lifterType];
+    if (data) {
+      renderLifter(data);
+    }
+  });
+}
 
-          break;
-        case "D":
-          lift = "Deadlift";
-          lifterAttemptKgs1 = data.entry.deadliftKg[0] || "-";
-          lifterAttemptKgs2 = data.entry.deadliftKg[1] || "-";
-          lifterAttemptKgs3 = data.entry.deadliftKg[2] || "-";
-          break;
-        case "B":
-          lift = "Bench";
-          lifterAttemptKgs1 = data.entry.benchKg[0] || "-";
-          lifterAttemptKgs2 = data.entry.benchKg[1] || "-";
-          lifterAttemptKgs3 = data.entry.benchKg[2] || "-";
-          break;
-      }
+function renderLifter(data) {
+  var lift;
+
+  switch (data.platformDetails.lift) {
+    case "S":
+      lift = "Squat";
+      lifterAttemptKgs1 = data.entry.squatKg[0] || "-";
+      lifterAttemptKgs2 = data.entry.squatKg[1] || "-";
+      lifterAttemptKgs3 = data.entry.squatKg[2] || "-";
+
+      break;
+    case "D":
+      lift = "Deadlift";
+      lifterAttemptKgs1 = data.entry.deadliftKg[0] || "-";
+      lifterAttemptKgs2 = data.entry.deadliftKg[1] || "-";
+      lifterAttemptKgs3 = data.entry.deadliftKg[2] || "-";
+      break;
+    case "B":
+      lift = "Bench";
+      lifterAttemptKgs1 = data.entry.benchKg[0] || "-";
+      lifterAttemptKgs2 = data.entry.benchKg[1] || "-";
+      lifterAttemptKgs3 = data.entry.benchKg[2] || "-";
+      break;
+  }
+
+  document.getElementById("lifterName").innerHTML = data.entry.name;
+  document.getElementById("lifterClass").innerHTML = data.entry.divisions.join(", ");
+  document.getElementById("lifterBodyWeight").innerHTML = data.entry.bodyweightKg;
+  document.getElementById("lifterEvent").innerHTML = lift;
+  document.getElementById("lifterAttempt1").innerHTML = lifterAttemptKgs1;
+  document.getElementById("lifterAttempt2").innerHTML = lifterAttemptKgs2;
+  document.getElementById("lifterAttempt3").innerHTML = lifterAttemptKgs3;
+  document.getElementById("lifterMaxWeightSquat").innerHTML = "S: " + data.maxLift.maxLifts.squat;
+  document.getElementById("lifterMaxWeightBench").innerHTML = "B: " + data.maxLift.maxLifts.bench;
+  document.getElementById("lifterMaxWeightDeadlift").innerHTML = "D: " + data.maxLift.maxLifts.deadlift;
+  document.getElementById("lifterResultPoints").innerHTML = data.entry.points;
+  document.getElementById("lifterResultPlace").innerHTML = data.entry.place != null ? data.entry.place : "-";
+  setAttemptColors(data);
+}
 
-      document.getElementById("lifterName").innerHTML = data.entry.name;
-      document.getElementById("lifterClass").innerHTML = data.entry.divisions.join(", ");
-      document.getElementById("lifterBodyWeight").innerHTML = data.entry.bodyweightKg;
-      document.getElementById("lifterEvent").innerHTML = lift;
-      document.getElementById("lifterAttempt1").innerHTML = lifterAttemptKgs1;
-      document.getElementById("lifterAttempt2").innerHTML = lifterAttemptKgs2;
-      document.getElementById("lifterAttempt3").innerHTML = lifterAttemptKgs3;
-      document.getElementById("lifterMaxWeightSquat").innerHTML = "S: " + data.maxLift.maxLifts.squat;
-      document.getElementById("lifterMaxWeightBench").innerHTML = "B: " + data.maxLift.maxLifts.bench;
-      document.getElementById("lifterMaxWeightDeadlift").innerHTML = "D: " + data.maxLift.maxLifts.deadlift;
-      document.getElementById("lifterResultPoints").innerHTML = data.entry.points;
-      document.getElementById("lifterResultPlace").innerHTML = data.entry.place != null ? data.entry.place : "-";
-      setAttemptColors(data);
-    });
+if (useEvents == true) {
+  subscribeToLifters();
+} else {
+  getCurrentLifter();
+  startTimer(refreshTimeSeconds);
 }
-getCurrentLifter();
-startTimer(refreshTimeSeconds);